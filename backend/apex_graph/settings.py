@@ -45,6 +45,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'ast_api.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,9 +81,23 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': DB_PATH,
+        'OPTIONS': {
+            # 后台分析线程和请求线程并发写入时等待锁的秒数
+            'timeout': int(os.environ.get('SQLITE_TIMEOUT', '20')),
+        },
     }
 }
 
+# SQLite PRAGMA，每个连接建立时执行（见 ast_api/sqlite_tuning.py）
+# WAL 需要共享内存，数据库必须位于本地磁盘（Cloud Storage 模式下见 cloud_storage.get_db_path）
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'cache_size': -int(os.environ.get('SQLITE_CACHE_KB', '20000')),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', str(128 * 1024 * 1024))),
+    'temp_store': 'MEMORY',
+}
+
 
 # Neo4j Configuration
 # 默认禁用 Neo4j，使用本地图数据库
@@ -127,6 +142,45 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CORS_ALLOW_ALL_ORIGINS = True  # For development only
 CORS_ALLOW_CREDENTIALS = True
 
+# Response compression (gzip / brotli)
+# 生产环境由 Nginx 压缩（见 nginx.conf），直接访问 Django 时可启用
+COMPRESS_RESPONSES = os.environ.get('COMPRESS_RESPONSES', 'false').lower() == 'true'
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+
+# Cloud Storage 模式下的本地磁盘缓存目录和后台同步间隔（秒），见 ast_api/storage.py
+LOCAL_CACHE_DIR = os.environ.get('LOCAL_CACHE_DIR', '/var/cache/pmd-analyzer')
+STORAGE_SYNC_INTERVAL = float(os.environ.get('STORAGE_SYNC_INTERVAL', '2'))
+
+# AST 解析结果缓存目录（可随时删除），见 ast_api/ir_cache.py
+IR_CACHE_DIR = os.environ.get(
+    'IR_CACHE_DIR',
+    os.path.join(LOCAL_CACHE_DIR, 'ir') if USE_CLOUD_STORAGE else str(BASE_DIR.parent / '.cache' / 'ir')
+)
+
+# LWC JavaScript AST 的输出格式（js_ast_parser.js）：json（默认，导入时直接加载）或 xml
+LWC_AST_FORMAT = os.environ.get('LWC_AST_FORMAT', 'json').lower()
+
+# 分析输出的存储格式：
+#   files - 散文件（默认）
+#   pack  - 按 仓库/组件类型 打包为单个 SQLite 文件，代替大量小文件，见 ast_api/ast_pack.py
+#   blobs - 内容寻址存储 + 仓库清单，跨仓库/分支相同的文件只分析和保存一次，见 ast_api/blob_store.py
+AST_OUTPUT_FORMAT = os.environ.get('AST_OUTPUT_FORMAT', 'files').lower()
+
+# 并行运行的 PMD 进程数（Apex 类和触发器共用），见 ast_api/git_service.py
+PMD_WORKERS = int(os.environ.get('PMD_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+# 克隆仓库时使用部分克隆（--filter=blob:none）+ 稀疏检出，只下载分析用到的元数据目录，见 ast_api/git_service.py
+GIT_SPARSE_CHECKOUT = os.environ.get('GIT_SPARSE_CHECKOUT', 'false').lower() == 'true'
+
+# 共享的 Git 镜像缓存目录（裸仓库，重新克隆和 fork 只获取新对象），设为空字符串时直接从远程克隆，见 ast_api/git_mirror.py
+GIT_MIRROR_DIR = os.environ.get(
+    'GIT_MIRROR_DIR',
+    os.path.join(LOCAL_CACHE_DIR, 'git-mirror') if USE_CLOUD_STORAGE else str(BASE_DIR.parent / '.cache' / 'git-mirror')
+)
+
+# 源代码缓存上限（字节数），见 ast_api/source_cache.py
+SOURCE_CACHE_MAX_BYTES = int(os.environ.get('SOURCE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
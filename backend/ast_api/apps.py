@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AstApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ast_api'
+    
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .sqlite_tuning import configure_sqlite_connection
+        connection_created.connect(configure_sqlite_connection)
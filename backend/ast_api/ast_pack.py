@@ -0,0 +1,277 @@
+"""
+AST 打包存储
+每个仓库的每种组件类型（apex / visualforce / lwc）打包成一个 SQLite 文件 <类型>.pack，
+代替成千上万个小文件（AST XML、源代码副本、LWC 组件目录）：
+- 条目按相对路径随机读取，内容用 zlib 压缩（压缩无收益时保存原文）
+- 读取接口同时支持原路径（output/ast/<仓库>/apex/Foo_ast.xml）和包内路径
+  （output/ast/<仓库>/apex.pack/Foo_ast.xml），散文件不存在时自动到包中查找，
+  调用方（导入、源代码接口、代码搜索、组件清单）无需关心文件是否已打包
+- 包也不存在时再查找内容寻址存储的仓库清单（见 blob_store）
+"""
+import hashlib
+import io
+import os
+import sqlite3
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from . import blob_store
+
+logger = logging.getLogger(__name__)
+
+PACK_SUFFIX = '.pack'
+
+# 原路径最多向上查找几级目录来定位包（lwc/<组件>/<文件> 需要两级）
+MAX_PACK_DEPTH = 3
+
+ZLIB_LEVEL = 6
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha1 TEXT NOT NULL,
+    compressed INTEGER NOT NULL,
+    data BLOB NOT NULL
+) WITHOUT ROWID
+"""
+
+
+class AstPack:
+    """单个打包文件（只读）"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._conn = sqlite3.connect(
+            f'file:{self.path}?mode=ro', uri=True, check_same_thread=False
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def names(self, suffix: str = '') -> List[str]:
+        """包内条目名（相对路径），可按后缀过滤"""
+        rows = self._conn.execute('SELECT name FROM entries ORDER BY name')
+        return [name for (name,) in rows if name.endswith(suffix)]
+
+    def stats(self) -> Dict[str, Tuple[int, int]]:
+        """所有条目的 名称 -> (mtime_ns, size)"""
+        rows = self._conn.execute('SELECT name, mtime_ns, size FROM entries')
+        return {name: (mtime_ns, size) for name, mtime_ns, size in rows}
+
+    def stat(self, name: str) -> Optional[Tuple[int, int]]:
+        """条目的 (mtime_ns, size)，不存在时返回 None"""
+        row = self._conn.execute(
+            'SELECT mtime_ns, size FROM entries WHERE name = ?', (name,)
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def read(self, name: str) -> Optional[bytes]:
+        """读取条目内容，不存在时返回 None"""
+        row = self._conn.execute(
+            'SELECT compressed, data FROM entries WHERE name = ?', (name,)
+        ).fetchone()
+        if row is None:
+            return None
+        compressed, data = row
+        return zlib.decompress(data) if compressed else bytes(data)
+
+
+def _pack_file_for(directory: Path) -> Path:
+    return directory.with_name(directory.name + PACK_SUFFIX)
+
+
+def locate(path) -> Optional[Tuple[Path, str]]:
+    """
+    定位包内条目
+
+    Args:
+        path: 包内路径（.../apex.pack/Foo_ast.xml）或散文件不存在的原路径
+
+    Returns:
+        (包文件路径, 条目名)，不在任何包中时返回 None
+    """
+    path = Path(path)
+    parts = []
+    current = path
+    for _ in range(MAX_PACK_DEPTH):
+        parts.insert(0, current.name)
+        parent = current.parent
+        if parent == current or not parent.name:
+            # 已到根目录，根目录没有同级的包文件
+            break
+        if parent.suffix == PACK_SUFFIX and parent.is_file():
+            return parent, '/'.join(parts)
+        pack_file = _pack_file_for(parent)
+        if pack_file.is_file():
+            return pack_file, '/'.join(parts)
+        current = parent
+    return None
+
+
+def stat_entry(path) -> Optional[Tuple[int, int]]:
+    """散文件或包内条目的 (mtime_ns, size)，都不存在时返回 None"""
+    try:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        pass
+    located = locate(path)
+    if located is None:
+        return blob_store.stat_entry(path)
+    with AstPack(located[0]) as pack:
+        return pack.stat(located[1])
+
+
+def read_entry(path) -> Optional[bytes]:
+    """读取散文件或包内条目，都不存在时返回 None"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except (FileNotFoundError, NotADirectoryError):
+        pass
+    located = locate(path)
+    if located is None:
+        return blob_store.read_entry(path)
+    with AstPack(located[0]) as pack:
+        return pack.read(located[1])
+
+
+def open_entry(path):
+    """以二进制文件对象打开散文件或包内条目"""
+    data = read_entry(path)
+    if data is None:
+        raise FileNotFoundError(f'No such file or packed entry: {path}')
+    return io.BytesIO(data)
+
+
+def list_entries(directory, suffix: str = '') -> List[Path]:
+    """
+    列出目录下（不递归）的文件，包括已打包的条目，返回原路径形式
+
+    Args:
+        directory: 组件类型目录（如 .../apex）、LWC 组件目录或包文件
+        suffix: 文件名后缀过滤
+    """
+    directory = Path(directory)
+    if directory.suffix == PACK_SUFFIX and directory.is_file():
+        directory = directory.with_suffix('')
+
+    files = {}
+    if directory.is_dir():
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith(suffix):
+                files[entry.name] = directory / entry.name
+
+    located = locate(directory / '_')
+    if located is not None:
+        pack_file, name = located
+        prefix = name[:-1]
+        with AstPack(pack_file) as pack:
+            for member in pack.names(suffix):
+                if not member.startswith(prefix):
+                    continue
+                relative = member[len(prefix):]
+                if '/' not in relative and relative not in files:
+                    files[relative] = directory / relative
+    else:
+        for name in blob_store.list_entries(directory):
+            if name.endswith(suffix) and name not in files:
+                files[name] = directory / name
+
+    return [files[name] for name in sorted(files)]
+
+
+def is_packed(directory) -> bool:
+    """组件类型目录是否已打包（或已存入内容寻址存储）"""
+    directory = Path(directory)
+    return _pack_file_for(directory).is_file() or bool(blob_store.list_entries(directory))
+
+
+def pack_directory(directory, remove_loose: bool = True) -> Dict[str, int]:
+    """
+    把组件类型目录下的所有文件（递归）打包为同级的 <目录名>.pack
+
+    新包先写入临时文件再替换，读者不会看到写了一半的包；
+    已有包中没有重新生成的条目（如本次分析失败的文件）保留到新包中，
+    与散文件格式下旧输出文件一直保留的行为一致；目录中没有散文件时保留已有的包
+
+    Args:
+        directory: 组件类型目录（如 output/ast/<仓库>/apex）
+        remove_loose: 打包后删除散文件和空目录
+
+    Returns:
+        {'files': 新打包的文件数, 'kept': 从已有包保留的条目数,
+         'bytes': 新打包文件的原始大小, 'packed_bytes': 包文件大小}
+    """
+    directory = Path(directory)
+    pack_file = _pack_file_for(directory)
+    files = sorted(p for p in directory.rglob('*') if p.is_file()) if directory.is_dir() else []
+    if not files:
+        return {
+            'files': 0, 'kept': 0, 'bytes': 0,
+            'packed_bytes': pack_file.stat().st_size if pack_file.exists() else 0,
+        }
+
+    tmp = pack_file.with_name(f'.{pack_file.name}.{os.getpid()}.tmp')
+    tmp.unlink(missing_ok=True)
+    total = 0
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        conn.execute(_SCHEMA)
+        rows = []
+        for path in files:
+            data = path.read_bytes()
+            stat = path.stat()
+            compressed = zlib.compress(data, ZLIB_LEVEL)
+            use_compressed = len(compressed) < len(data)
+            rows.append((
+                path.relative_to(directory).as_posix(),
+                len(data),
+                stat.st_mtime_ns,
+                hashlib.sha1(data).hexdigest(),
+                int(use_compressed),
+                compressed if use_compressed else data,
+            ))
+            total += len(data)
+        conn.executemany('INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)', rows)
+        conn.commit()
+
+        kept = 0
+        if pack_file.is_file():
+            # 已有包中的条目只在没有重新生成时保留
+            conn.execute('ATTACH DATABASE ? AS old', (str(pack_file),))
+            kept = conn.execute('INSERT OR IGNORE INTO entries SELECT * FROM old.entries').rowcount
+            conn.commit()
+            conn.execute('DETACH DATABASE old')
+    finally:
+        conn.close()
+    os.replace(tmp, pack_file)
+
+    if remove_loose:
+        for path in files:
+            path.unlink(missing_ok=True)
+        for sub in sorted((p for p in directory.rglob('*') if p.is_dir()), reverse=True):
+            try:
+                sub.rmdir()
+            except OSError:
+                pass
+        try:
+            directory.rmdir()
+        except OSError:
+            pass
+
+    stats = {'files': len(files), 'kept': kept, 'bytes': total, 'packed_bytes': pack_file.stat().st_size}
+    logger.info(f"Packed {directory} into {pack_file}: {stats}")
+    return stats
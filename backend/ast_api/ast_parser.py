@@ -4,26 +4,73 @@ AST XML解析器
 """
 import xml.etree.ElementTree as ET
 from pathlib import Path
+import html
+import io
+import re
 import logging
 
+from .soql_parser import parse_soql
+from .ast_pack import open_entry
+
 logger = logging.getLogger(__name__)
 
+# List<X> / Set<X> 集合类型
+_COLLECTION_TYPE_RE = re.compile(r'^(?:List|Set)\s*<\s*([\w.]+)\s*>$', re.IGNORECASE)
+
+# DML 语句中直接给出类型的表达式
+_TYPED_EXPRESSIONS = ('NewObjectExpression', 'NewKeyValueObjectExpression', 'CastExpression')
+
+# 触发器的 Usages 属性（如 BEFORE_INSERT / TRIGGER_AFTER_UPDATE）
+_TRIGGER_USAGE_RE = re.compile(r'(BEFORE|AFTER)_(INSERT|UPDATE|DELETE|UNDELETE)')
+
+
+def _element_type(type_name):
+    """
+    将变量声明类型归一化为元素类型：List<Account> / Set<Account> / Account[] -> Account
+    Map 等无法确定元素类型的返回 None
+    """
+    if not type_name:
+        return None
+    # PMD 输出中泛型尖括号可能被二次转义
+    type_name = html.unescape(html.unescape(type_name)).strip()
+    match = _COLLECTION_TYPE_RE.match(type_name)
+    if match:
+        type_name = match.group(1)
+    elif type_name.endswith('[]'):
+        type_name = type_name[:-2].strip()
+    if '<' in type_name:
+        return None
+    if type_name.lower().startswith('schema.'):
+        type_name = type_name[len('schema.'):]
+    return type_name or None
+
 
 class ASTParser:
     """AST XML解析器"""
     
-    def __init__(self, ast_file_path):
+    def __init__(self, ast_file_path, data=None):
         self.file_path = Path(ast_file_path)
+        # 调用方已读取的文件内容（可选），避免重复读取
+        self.data = data
         self.tree = None
         self.root = None
         self.class_data = {}
+        self._field_type_cache = None
         
     def parse(self):
         """解析AST文件"""
         try:
-            self.tree = ET.parse(self.file_path)
+            # 文件可能已打包（见 ast_pack）
+            source = io.BytesIO(self.data) if self.data is not None else open_entry(self.file_path)
+            with source as f:
+                self.tree = ET.parse(f)
             self.root = self.tree.getroot()
             
+            # 触发器没有方法，整个触发器体作为一个单元提取
+            if self.root.find('.//UserClass') is None and self.root.find('.//UserTrigger') is not None:
+                self.class_data = self._extract_trigger_info()
+                return self.class_data
+            
             # 提取类信息
             self.class_data = self._extract_class_info()
             
@@ -39,7 +86,7 @@ class ASTParser:
     def _extract_class_info(self):
         """提取类基本信息"""
         user_class = self.root.find('.//UserClass')
-        if not user_class:
+        if user_class is None:
             raise ValueError("No UserClass found in AST")
         
         class_modifier = user_class.find('ModifierNode')
@@ -48,13 +95,36 @@ class ASTParser:
             'name': user_class.get('SimpleName', 'Unknown'),
             'simpleName': user_class.get('SimpleName', 'Unknown'),
             'definingType': user_class.get('DefiningType', ''),
-            'public': class_modifier.get('Public', 'false') == 'true' if class_modifier else False,
-            'withSharing': class_modifier.get('WithSharing', 'false') == 'true' if class_modifier else False,
+            'public': class_modifier.get('Public', 'false') == 'true' if class_modifier is not None else False,
+            'withSharing': class_modifier.get('WithSharing', 'false') == 'true' if class_modifier is not None else False,
             'fileName': self.file_path.name,
             'nested': user_class.get('Nested', 'false') == 'true',
             'superClassName': user_class.get('SuperClassName', ''),
         }
     
+    def _extract_trigger_info(self):
+        """提取触发器信息（目标 sObject、触发事件及触发器体中的 SOQL/DML/方法调用）"""
+        trigger = self.root.find('.//UserTrigger')
+        events = []
+        for timing, operation in _TRIGGER_USAGE_RE.findall(trigger.get('Usages', '')):
+            event = f'{timing.lower()} {operation.lower()}'
+            if event not in events:
+                events.append(event)
+        
+        return {
+            'kind': 'trigger',
+            'name': trigger.get('SimpleName') or trigger.get('Image', 'Unknown'),
+            'simpleName': trigger.get('SimpleName') or trigger.get('Image', 'Unknown'),
+            'definingType': trigger.get('DefiningType', ''),
+            'sObject': trigger.get('TargetName', ''),
+            'events': events,
+            'fileName': self.file_path.name,
+            'methods': [],
+            'soql_queries': self._extract_soql_queries(trigger),
+            'dml_operations': self._extract_dml_operations(trigger, self._variable_types(trigger)),
+            'method_calls': self._extract_method_calls(trigger),
+        }
+    
     def _extract_methods(self):
         """提取所有方法信息"""
         methods = []
@@ -81,7 +151,7 @@ class ASTParser:
             'annotations': [],
         }
         
-        if method_modifier:
+        if method_modifier is not None:
             method_data['public'] = method_modifier.get('Public', 'false') == 'true'
             method_data['static'] = method_modifier.get('Static', 'false') == 'true'
             method_data['private'] = method_modifier.get('Private', 'false') == 'true'
@@ -94,7 +164,7 @@ class ASTParser:
         method_data['soql_queries'] = self._extract_soql_queries(method_node)
         
         # 提取DML操作
-        method_data['dml_operations'] = self._extract_dml_operations(method_node)
+        method_data['dml_operations'] = self._extract_dml_operations(method_node, self._variable_types(method_node))
         
         # 提取方法调用
         method_data['method_calls'] = self._extract_method_calls(method_node)
@@ -114,7 +184,48 @@ class ASTParser:
         
         return soql_queries
     
-    def _extract_dml_operations(self, parent_node):
+    def _field_types(self):
+        """类字段和属性的声明类型（变量名小写 -> 类型），整个文件只计算一次"""
+        if self._field_type_cache is None:
+            self._field_type_cache = {}
+            for field in self.root.iter('Field'):
+                if field.get('Name'):
+                    self._field_type_cache[field.get('Name').lower()] = field.get('Type')
+        return self._field_type_cache
+    
+    def _variable_types(self, method_node):
+        """方法内可见变量的声明类型：类字段，被参数和局部变量覆盖"""
+        types = dict(self._field_types())
+        for tag in ('Parameter', 'VariableDeclaration'):
+            for declaration in method_node.iter(tag):
+                if declaration.get('Image'):
+                    types[declaration.get('Image').lower()] = declaration.get('Type')
+        return types
+    
+    def _dml_target(self, dml_node, variable_types):
+        """
+        解析 DML 语句操作的 sObject 类型
+        
+        支持：变量（按声明类型）、内联 SOQL、new/强制类型转换表达式
+        
+        Returns:
+            sObject 名称，无法确定时返回 None
+        """
+        target = next(iter(dml_node), None)
+        if target is None:
+            return None
+        
+        if target.tag == 'VariableExpression':
+            # this.records 等带限定符的变量同样按变量名查找
+            return _element_type(variable_types.get(target.get('Image', '').lower()))
+        if target.tag == 'SoqlExpression':
+            parsed = parse_soql(target.get('Query', ''))
+            return parsed['sObject'] if parsed else None
+        if target.tag in _TYPED_EXPRESSIONS:
+            return _element_type(target.get('Type'))
+        return None
+    
+    def _extract_dml_operations(self, parent_node, variable_types=None):
         """提取DML操作"""
         dml_operations = []
         
@@ -133,6 +244,7 @@ class ASTParser:
                 dml_operations.append({
                     'type': dml_type,
                     'tag': dml_tag,
+                    'sObject': self._dml_target(dml, variable_types or {}),
                 })
         
         return dml_operations
@@ -146,12 +258,13 @@ class ASTParser:
             method_calls.append({
                 'methodName': call.get('MethodName', ''),
                 'fullMethodName': call.get('FullMethodName', ''),
+                'arity': int(call.get('InputParametersSize', '0')),
             })
         
         return method_calls
 
 
-def parse_ast_file(file_path):
+def parse_ast_file(file_path, data=None):
     """便捷函数：解析AST文件"""
-    parser = ASTParser(file_path)
+    parser = ASTParser(file_path, data)
     return parser.parse()
@@ -0,0 +1,241 @@
+"""
+内容寻址存储
+源代码副本和 AST 输出按内容的 SHA-1 保存为 blobs/<前两位>/<哈希>，
+每个仓库的 manifest.json 记录 相对路径 -> 哈希，不同仓库、分支中相同的文件只保存一份；
+另外按 (分析器, 源文件哈希) 记录生成的 AST，相同的源文件只分析一次
+
+读取接口（ast_pack.read_entry 等）在散文件和包都不存在时查找清单，调用方无需关心存储格式
+"""
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import logging
+
+from .storage import ast_store
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR = 'blobs'
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# 分析器输出格式变化时递增，使旧的 AST 缓存失效
+DERIVED_VERSION = 1
+
+# 原路径最多向上查找几级目录来定位清单（<仓库>/lwc/<组件>/<文件> 需要三级）
+MAX_MANIFEST_DEPTH = 3
+
+
+def sha1_bytes(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def sha1_file(path) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_stat(sha1: str, size: int) -> Tuple[int, int]:
+    """
+    清单条目的 (mtime_ns, size)
+    内容不变则值不变，用哈希前缀代替修改时间，供 ETag 和代码搜索的变化检测使用
+    """
+    return int(sha1[:15], 16), size
+
+
+class BlobStore:
+    """按 SHA-1 保存内容的 blob 存储（通过 DataStore 读写，Cloud Storage 模式下同样先写本地缓存）"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def blob_path(self, sha1: str) -> str:
+        return f'{BLOB_DIR}/{sha1[:2]}/{sha1}'
+
+    def has(self, sha1: str) -> bool:
+        return self.store.exists(self.blob_path(sha1))
+
+    def put_bytes(self, data: bytes) -> str:
+        """保存内容，已存在时跳过，返回哈希"""
+        sha1 = sha1_bytes(data)
+        if not self.has(sha1):
+            self.store.write_bytes(self.blob_path(sha1), data)
+        return sha1
+
+    def get(self, sha1: str) -> Optional[bytes]:
+        return self.store.read_bytes(self.blob_path(sha1))
+
+    def local_path(self, sha1: str) -> Optional[Path]:
+        return self.store.local_path(self.blob_path(sha1))
+
+    # ========== 分析结果缓存 ==========
+
+    def _derived_path(self, analyzer: str, source_sha1: str) -> str:
+        return f'{BLOB_DIR}/derived/v{DERIVED_VERSION}/{analyzer}/{source_sha1}'
+
+    def derived(self, analyzer: str, source_sha1: str) -> Optional[bytes]:
+        """源文件之前由该分析器生成的 AST，未分析过时返回 None"""
+        ast_sha1 = self.store.read_text(self._derived_path(analyzer, source_sha1))
+        return self.get(ast_sha1.strip()) if ast_sha1 else None
+
+    def record_derived(self, analyzer: str, source_sha1: str, data: bytes) -> str:
+        """保存分析器生成的 AST 并记录来源，返回 AST 的哈希"""
+        ast_sha1 = self.put_bytes(data)
+        self.store.write_text(self._derived_path(analyzer, source_sha1), ast_sha1)
+        return ast_sha1
+
+
+class ManifestCache:
+    """按 (路径, mtime, size) 缓存已解析的仓库清单"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._manifests: Dict[Path, tuple] = {}
+
+    def load(self, path: Path) -> Optional[Dict[str, dict]]:
+        """返回清单的 files 字典，文件不存在时返回 None"""
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._manifests.get(path)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        files = data.get('files', {}) if data.get('version') == MANIFEST_VERSION else {}
+        with self._lock:
+            self._manifests[path] = (key, files)
+        return files
+
+
+def locate(path) -> Optional[Tuple[Dict[str, dict], str]]:
+    """
+    在仓库清单中查找原路径
+
+    Returns:
+        (清单 files 字典, 相对路径)，不在任何清单中时返回 None
+    """
+    path = Path(path)
+    parts = []
+    current = path
+    for _ in range(MAX_MANIFEST_DEPTH):
+        parts.insert(0, current.name)
+        parent = current.parent
+        if parent == current:
+            break
+        files = manifest_cache.load(parent / MANIFEST_NAME)
+        if files is not None:
+            return files, '/'.join(parts)
+        current = parent
+    return None
+
+
+def stat_entry(path) -> Optional[Tuple[int, int]]:
+    located = locate(path)
+    if located is None:
+        return None
+    files, relative = located
+    entry = files.get(relative)
+    return content_stat(entry['sha1'], entry['size']) if entry else None
+
+
+def read_entry(path) -> Optional[bytes]:
+    located = locate(path)
+    if located is None:
+        return None
+    files, relative = located
+    entry = files.get(relative)
+    return blob_store.get(entry['sha1']) if entry else None
+
+
+def list_entries(directory) -> Dict[str, Tuple[int, int]]:
+    """清单中直接位于目录下的条目：文件名 -> (mtime_ns, size)"""
+    located = locate(Path(directory) / '_')
+    if located is None:
+        return {}
+    files, relative = located
+    prefix = relative[:-1]
+    return {
+        name[len(prefix):]: content_stat(entry['sha1'], entry['size'])
+        for name, entry in files.items()
+        if name.startswith(prefix) and '/' not in name[len(prefix):]
+    }
+
+
+def manifest_entries(repo_dir) -> Dict[str, Tuple[int, int]]:
+    """仓库清单中的所有条目：相对路径 -> (mtime_ns, size)"""
+    files = manifest_cache.load(Path(repo_dir) / MANIFEST_NAME) or {}
+    return {name: content_stat(entry['sha1'], entry['size']) for name, entry in files.items()}
+
+
+def dedupe_directory(directory) -> Dict[str, int]:
+    """
+    把组件类型目录下的所有文件（递归）存入 blob 存储并更新仓库清单，然后删除散文件
+
+    清单中已有的条目只在重新生成时替换，其余（如本次分析失败的文件）保留，
+    与 ast_pack.pack_directory 一致；目录中没有散文件时保留已有条目
+
+    Args:
+        directory: 组件类型目录（如 output/ast/<仓库>/apex）
+
+    Returns:
+        {'files': 新存入的文件数, 'kept': 该类型保留的已有条目数,
+         'bytes': 新存入文件的原始大小, 'new_blobs': 新保存的 blob 数}
+    """
+    directory = Path(directory)
+    repo_dir = directory.parent
+    files = sorted(p for p in directory.rglob('*') if p.is_file()) if directory.is_dir() else []
+    if not files:
+        return {'files': 0, 'kept': 0, 'bytes': 0, 'new_blobs': 0}
+
+    prefix = directory.name + '/'
+    entries = {}
+    total = 0
+    new_blobs = 0
+    for path in files:
+        data = path.read_bytes()
+        sha1 = sha1_bytes(data)
+        if not blob_store.has(sha1):
+            blob_store.store.write_bytes(blob_store.blob_path(sha1), data)
+            new_blobs += 1
+        entries[prefix + path.relative_to(directory).as_posix()] = {'sha1': sha1, 'size': len(data)}
+        total += len(data)
+
+    manifest_file = repo_dir / MANIFEST_NAME
+    existing = manifest_cache.load(manifest_file) or {}
+    kept = sum(1 for name in existing if name.startswith(prefix) and name not in entries)
+    merged = dict(existing)
+    merged.update(entries)
+    ast_store.write_json(manifest_file, {
+        'version': MANIFEST_VERSION,
+        'files': dict(sorted(merged.items())),
+    })
+
+    for path in files:
+        ast_store.delete(path)
+    for sub in sorted((p for p in directory.rglob('*') if p.is_dir()), reverse=True):
+        try:
+            sub.rmdir()
+        except OSError:
+            pass
+    try:
+        directory.rmdir()
+    except OSError:
+        pass
+
+    stats = {'files': len(files), 'kept': kept, 'bytes': total, 'new_blobs': new_blobs}
+    logger.info(f"Stored {directory} in blob store: {stats}")
+    return stats
+
+
+# 全局实例
+blob_store = BlobStore(ast_store)
+manifest_cache = ManifestCache()
@@ -0,0 +1,87 @@
+"""
+Apex 方法调用解析
+基于符号索引（类 -> 方法名 -> 参数个数）把 MethodCallExpression 解析为方法节点
+"""
+from typing import Dict, List, Any, Optional, Tuple
+
+# 无限定符或以 this 限定的调用，目标为调用方所在的类
+_SELF_QUALIFIERS = ('', 'this')
+
+
+def call_key(full_method_name: str, arity: int) -> str:
+    """调用的紧凑表示：FullMethodName/参数个数"""
+    return f"{full_method_name}/{arity}"
+
+
+def parse_call_key(key: str) -> Dict[str, Any]:
+    """解析 call_key 生成的字符串"""
+    full_method_name, _, arity = key.rpartition('/')
+    return {
+        'fullMethodName': full_method_name,
+        'methodName': full_method_name.rpartition('.')[2],
+        'arity': int(arity) if arity.isdigit() else None,
+    }
+
+
+class MethodSymbolIndex:
+    """
+    方法符号索引
+    Apex 标识符不区分大小写，索引键统一使用小写
+    """
+
+    def __init__(self):
+        # 类名(小写) -> 方法名(小写) -> [(参数个数, 方法节点ID)]
+        self._classes: Dict[str, Dict[str, List[Tuple[int, str]]]] = {}
+
+    @classmethod
+    def from_graph(cls, graph, repository: Optional[str] = None) -> 'MethodSymbolIndex':
+        """
+        从图中的方法节点构建索引
+
+        Args:
+            graph: NetworkX 图
+            repository: 只索引该仓库的方法，None 表示全部
+        """
+        index = cls()
+        for node_id, data in graph.nodes(data=True):
+            if data.get('type') != 'ApexMethod':
+                continue
+            if repository is not None and data.get('repository') != repository:
+                continue
+            for arity in data.get('arities', [data.get('arity', 0)]):
+                index.add(data.get('className', ''), data.get('name', ''), arity, node_id)
+        return index
+
+    def add(self, class_name: str, method_name: str, arity: int, node_id: str):
+        """添加一个方法签名"""
+        methods = self._classes.setdefault(class_name.lower(), {})
+        methods.setdefault(method_name.lower(), []).append((arity, node_id))
+
+    def resolve(self, caller_class: str, call: Dict[str, Any]) -> Optional[str]:
+        """
+        解析一次方法调用
+
+        Args:
+            caller_class: 调用方所在的类
+            call: 包含 fullMethodName、methodName、arity 的调用信息
+
+        Returns:
+            目标方法节点ID，无法解析（系统类、实例变量调用等）时返回 None
+        """
+        method_name = call.get('methodName', '')
+        qualifier = call.get('fullMethodName', '').rpartition('.')[0].lower()
+
+        if qualifier in _SELF_QUALIFIERS:
+            target_class = caller_class.lower()
+        elif qualifier in self._classes:
+            # Class.method 形式的静态调用
+            target_class = qualifier
+        else:
+            return None
+
+        candidates = self._classes.get(target_class, {}).get(method_name.lower(), [])
+        arity = call.get('arity')
+        for candidate_arity, node_id in candidates:
+            if arity is None or candidate_arity == arity:
+                return node_id
+        return None
@@ -0,0 +1,305 @@
+"""
+源代码搜索
+对 output/ast/<仓库> 下复制的 Apex / Visualforce / LWC 源文件建立三元组（trigram）倒排索引：
+查询串的所有三元组都出现的文件才是候选文件，只需逐行扫描候选文件
+文件按 (mtime, size) 判断是否变化，刷新时只重新索引变化的文件
+已打包的组件类型（<类型>.pack，见 ast_pack）按包内条目索引，
+已存入内容寻址存储的文件按仓库清单索引（见 blob_store）
+"""
+import os
+import re
+import pickle
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+import logging
+
+from .ast_pack import PACK_SUFFIX, AstPack, read_entry
+from .blob_store import manifest_entries
+
+logger = logging.getLogger(__name__)
+
+# 被索引的源文件扩展名
+SOURCE_EXTENSIONS = ('.cls', '.trigger', '.page', '.component', '.js', '.html', '.css')
+
+# 超过该大小的文件不索引（通常是打包后的静态资源）
+MAX_FILE_SIZE = 2 * 1024 * 1024
+
+# 索引持久化文件名（保存在仓库输出目录下）
+INDEX_FILE_NAME = '.code_index.pickle'
+INDEX_FORMAT_VERSION = 1
+
+# 返回的代码片段最大长度
+SNIPPET_LENGTH = 240
+
+
+def trigrams(text: str) -> set:
+    """小写文本的所有三元组"""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _is_indexed(relative: str) -> bool:
+    """
+    是否索引该文件
+
+    LWC 的主 JS 文件同时复制到 lwc/<组件>.js 和 lwc/<组件>/<组件>.js，
+    只索引组件目录中的副本
+    """
+    if not relative.endswith(SOURCE_EXTENSIONS):
+        return False
+    return not (relative.startswith('lwc/') and relative.count('/') == 1)
+
+
+def _iter_source_files(root: Path):
+    """
+    遍历仓库输出目录下的源文件（包括包内条目和清单条目），返回 (相对路径, (mtime_ns, size))
+    同名时依次以散文件、包内条目为准
+    """
+    packs = []
+    stack = [root]
+    seen = set()
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(Path(entry.path))
+                continue
+            if directory == root and entry.name.endswith(PACK_SUFFIX):
+                packs.append(entry)
+                continue
+            relative = Path(entry.path).relative_to(root).as_posix()
+            if not _is_indexed(relative):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            seen.add(relative)
+            yield relative, (stat.st_mtime_ns, stat.st_size)
+
+    for entry in packs:
+        prefix = entry.name[:-len(PACK_SUFFIX)] + '/'
+        try:
+            with AstPack(entry.path) as pack:
+                stats = pack.stats()
+        except Exception as e:
+            logger.warning(f"Failed to read pack {entry.path}: {e}")
+            continue
+        for name, stat in stats.items():
+            relative = prefix + name
+            if relative not in seen and _is_indexed(relative):
+                seen.add(relative)
+                yield relative, stat
+
+    for relative, stat in manifest_entries(root).items():
+        if relative not in seen and _is_indexed(relative):
+            yield relative, stat
+
+
+class CodeSearchIndex:
+    """单个仓库的三元组索引"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        # 相对路径 -> (mtime_ns, size, 三元组集合)
+        self._files: Dict[str, tuple] = {}
+        # 三元组 -> 相对路径集合
+        self._postings: Dict[str, set] = {}
+        self._load()
+
+    @property
+    def index_file(self) -> Path:
+        return self.root / INDEX_FILE_NAME
+
+    def _load(self):
+        """加载持久化的索引，格式不兼容或损坏时从空索引开始"""
+        if not self.index_file.exists():
+            return
+        try:
+            with open(self.index_file, 'rb') as f:
+                data = pickle.load(f)
+            if data.get('version') != INDEX_FORMAT_VERSION:
+                return
+            self._files = data['files']
+            for path, (_, _, grams) in self._files.items():
+                for gram in grams:
+                    self._postings.setdefault(gram, set()).add(path)
+        except Exception as e:
+            logger.warning(f"Failed to load code index {self.index_file}: {e}")
+            self._files = {}
+            self._postings = {}
+
+    def _save(self):
+        try:
+            with open(self.index_file, 'wb') as f:
+                pickle.dump(
+                    {'version': INDEX_FORMAT_VERSION, 'files': self._files},
+                    f, protocol=pickle.HIGHEST_PROTOCOL
+                )
+        except Exception as e:
+            logger.warning(f"Failed to save code index {self.index_file}: {e}")
+
+    def _remove(self, path: str):
+        entry = self._files.pop(path, None)
+        if entry is None:
+            return
+        for gram in entry[2]:
+            paths = self._postings.get(gram)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self._postings[gram]
+
+    def _add(self, path: str, mtime_ns: int, size: int, text: str):
+        grams = frozenset(trigrams(text))
+        self._files[path] = (mtime_ns, size, grams)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(path)
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        增量刷新：重新索引新增/变化的文件，移除已删除的文件
+
+        Returns:
+            {'files': 索引文件数, 'added': 新增数, 'updated': 更新数, 'removed': 删除数}
+        """
+        stats = {'added': 0, 'updated': 0, 'removed': 0}
+        with self._lock:
+            seen = set()
+            if self.root.exists():
+                for path, (mtime_ns, size) in _iter_source_files(self.root):
+                    if size > MAX_FILE_SIZE:
+                        continue
+                    seen.add(path)
+                    current = self._files.get(path)
+                    if current is not None and current[:2] == (mtime_ns, size):
+                        continue
+                    text = self._read(path)
+                    if text is None:
+                        continue
+                    self._remove(path)
+                    self._add(path, mtime_ns, size, text)
+                    stats['updated' if current is not None else 'added'] += 1
+
+            for path in [p for p in self._files if p not in seen]:
+                self._remove(path)
+                stats['removed'] += 1
+
+            if any(stats.values()) and self.root.exists():
+                self._save()
+            stats['files'] = len(self._files)
+
+        if any(stats[key] for key in ('added', 'updated', 'removed')):
+            logger.info(f"Refreshed code index {self.root}: {stats}")
+        return stats
+
+    def _read(self, path: str) -> Optional[str]:
+        """读取散文件或包内条目"""
+        try:
+            data = read_entry(self.root / path)
+        except Exception as e:
+            logger.warning(f"Failed to read {self.root / path}: {e}")
+            return None
+        if data is None:
+            return None
+        return data.decode('utf-8', errors='replace')
+
+    def _candidates(self, query: str) -> List[str]:
+        """包含查询串所有三元组的文件；查询串不足 3 个字符时返回全部文件"""
+        grams = trigrams(query)
+        if not grams:
+            return sorted(self._files)
+        # 从最稀有的三元组开始求交集
+        postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+        result = set(postings[0])
+        for paths in postings[1:]:
+            result &= paths
+            if not result:
+                break
+        return sorted(result)
+
+    def search(self, query: str, pattern: Optional[re.Pattern] = None,
+               case_sensitive: bool = False, limit: int = 100) -> Dict[str, Any]:
+        """
+        搜索包含查询串的代码行
+
+        Args:
+            query: 字面查询串
+            pattern: 可选的正则表达式，命中行还需匹配该正则
+            case_sensitive: 是否区分大小写
+            limit: 返回的最大匹配行数
+
+        Returns:
+            {'candidates': 候选文件数, 'total': 匹配行数（达到 limit 后停止计数）,
+             'truncated': 是否截断, 'matches': [{'file', 'line', 'snippet'}]}
+        """
+        with self._lock:
+            candidates = self._candidates(query)
+
+        needle = query if case_sensitive else query.lower()
+        matches = []
+        truncated = False
+        for path in candidates:
+            text = self._read(path)
+            if text is None:
+                continue
+            lines = text.splitlines()
+            for line_number, line in enumerate(lines, 1):
+                haystack = line if case_sensitive else line.lower()
+                if needle not in haystack:
+                    continue
+                if pattern is not None and not pattern.search(line):
+                    continue
+                if len(matches) >= limit:
+                    truncated = True
+                    break
+                matches.append({
+                    'file': path,
+                    'line': line_number,
+                    'snippet': line.strip()[:SNIPPET_LENGTH],
+                })
+            if truncated:
+                break
+
+        return {
+            'candidates': len(candidates),
+            'total': len(matches),
+            'truncated': truncated,
+            'matches': matches,
+        }
+
+
+class CodeSearchService:
+    """按仓库输出目录管理 CodeSearchIndex"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes: Dict[Path, CodeSearchIndex] = {}
+
+    def get_index(self, root: Path) -> CodeSearchIndex:
+        root = Path(root)
+        with self._lock:
+            index = self._indexes.get(root)
+            if index is None:
+                index = self._indexes[root] = CodeSearchIndex(root)
+            return index
+
+    def refresh(self, root: Path) -> Dict[str, int]:
+        """增量刷新仓库的索引"""
+        return self.get_index(root).refresh()
+
+    def search(self, root: Path, query: str, **options) -> Dict[str, Any]:
+        """刷新后搜索，保证结果反映磁盘上的最新源文件"""
+        index = self.get_index(root)
+        index.refresh()
+        return index.search(query, **options)
+
+
+# 全局实例
+code_search_service = CodeSearchService()
@@ -0,0 +1,70 @@
+"""
+节点显示字段
+在节点创建时计算一次显示名称、简短标签和前端类型，避免每次请求重复推导
+"""
+from typing import Dict, List, Any
+
+# 存储在节点属性中的显示字段（返回给前端时不放入 properties）
+DISPLAY_FIELDS = ('displayName', 'shortLabel', 'uiType')
+
+# SOQL 查询显示名称的最大长度
+SOQL_DISPLAY_LENGTH = 50
+
+# 显示名称直接取 properties.name 的节点类型
+_NAMED_TYPES = (
+    'ApexClass',
+    'ApexMethod',
+    'Method',
+    'LWCComponent',
+    'JavaScriptClass',
+    'JavaScriptMethod',
+    'JavaScriptFunction',
+)
+
+
+def _display_type(labels: List[str]) -> str:
+    """从标签列表中确定用于显示的节点类型（与原先的判断优先级一致）"""
+    for label in _NAMED_TYPES + ('SOQLQuery', 'DMLOperation', 'Dependency'):
+        if label in labels:
+            return label
+    return labels[0] if labels else 'Unknown'
+
+
+def compute_display_fields(labels: List[str], properties: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    计算节点的显示字段
+
+    Args:
+        labels: 节点标签列表（本地图数据库只有一个，即节点 type）
+        properties: 节点属性
+
+    Returns:
+        {'displayName': 显示名称, 'shortLabel': 图中节点标签, 'uiType': 前端节点类型}
+    """
+    display_type = _display_type(labels)
+
+    if display_type in _NAMED_TYPES:
+        display_name = properties.get('name', 'Unknown')
+    elif display_type == 'SOQLQuery':
+        query = properties.get('query', '')
+        display_name = query[:SOQL_DISPLAY_LENGTH] + '...' if len(query) > SOQL_DISPLAY_LENGTH else query
+    elif display_type == 'DMLOperation':
+        display_name = properties.get('operationType', 'DML')
+    elif display_type == 'Dependency':
+        # 依赖模块名称简化显示，取最后一部分
+        module = properties.get('module', 'Unknown')
+        display_name = module.split('/')[-1]
+    else:
+        display_name = properties.get('name', 'Unknown')
+
+    return {
+        'displayName': display_name,
+        'shortLabel': 'SOQL' if display_type == 'SOQLQuery' else display_name,
+        'uiType': labels[0] if labels else 'Unknown',
+    }
+
+
+def with_display_fields(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    """为本地图节点属性（包含 type）补充显示字段，原地修改并返回"""
+    attributes.update(compute_display_fields([attributes.get('type', 'Unknown')], attributes))
+    return attributes
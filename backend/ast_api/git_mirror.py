@@ -0,0 +1,144 @@
+"""
+Git 镜像缓存
+所有远程仓库共用一个本地裸仓库（GIT_MIRROR_DIR），每个远程 URL 的分支保存在独立的命名空间
+refs/namespaces/<URL 哈希>/refs/heads/<分支> 下，与工作区一样只获取分支的最新提交（--depth 1）：
+- 重新克隆（force=True）和刷新时只从远程获取新对象
+- 同一上游的 fork 共用对象，获取 fork 时已有的对象不会重复下载
+- 部分克隆（稀疏检出）不经过镜像：镜像按 URL 获取，不能保存不含文件内容的部分克隆
+- 工作区通过 file:// 协议从镜像克隆（upload-pack 使用对应的命名空间），不使用硬链接，
+  克隆目录在 Cloud Storage FUSE 上时仍可配合 GIT_OBJECT_DIRECTORY 使用
+
+镜像位于本地磁盘，执行镜像命令时移除 GIT_OBJECT_DIRECTORY 等变量，镜像对象始终保存在镜像目录中
+"""
+import hashlib
+import os
+import subprocess
+import threading
+from pathlib import Path
+from typing import Optional
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MIRROR_REPO_NAME = 'mirror.git'
+
+# 获取镜像的超时（与工作区克隆的超时相同）
+FETCH_TIMEOUT = 300
+
+# 这些变量指向工作区的对象目录，不能用于镜像
+_REPOSITORY_ENV = (
+    'GIT_DIR', 'GIT_WORK_TREE', 'GIT_OBJECT_DIRECTORY',
+    'GIT_ALTERNATE_OBJECT_DIRECTORIES', 'GIT_INDEX_FILE', 'GIT_NAMESPACE',
+)
+
+
+class GitMirror:
+    """共享的裸仓库镜像"""
+
+    def __init__(self, cache_dir):
+        self.path = Path(cache_dir) / MIRROR_REPO_NAME if cache_dir else None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    @property
+    def url(self) -> str:
+        """工作区克隆使用的地址（file:// 协议，不会硬链接镜像中的对象）"""
+        return self.path.as_uri()
+
+    @property
+    def objects_dir(self) -> Path:
+        return self.path / 'objects'
+
+    def key(self, repo_url: str) -> str:
+        """远程 URL 对应的命名空间"""
+        normalized = repo_url.strip().rstrip('/')
+        if normalized.endswith('.git'):
+            normalized = normalized[:-4]
+        return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+
+    def upload_pack(self, repo_url: str) -> str:
+        """从镜像克隆时使用的 upload-pack 命令（只公开该远程的引用）"""
+        return f'git --namespace={self.key(repo_url)} upload-pack'
+
+    def _env(self):
+        env = os.environ.copy()
+        for name in _REPOSITORY_ENV:
+            env.pop(name, None)
+        return env
+
+    def _git(self, *args, timeout=300):
+        return subprocess.run(
+            ['git', '--git-dir', str(self.path), *args],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            env=self._env()
+        )
+
+    def _ensure(self):
+        if (self.path / 'HEAD').exists():
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        result = subprocess.run(
+            ['git', 'init', '--bare', '--quiet', str(self.path)],
+            capture_output=True, text=True, env=self._env()
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f'Failed to create git mirror: {result.stderr}')
+        # 工作区从镜像进行部分克隆和按需获取文件内容
+        self._git('config', 'uploadpack.allowFilter', 'true')
+        self._git('config', 'uploadpack.allowAnySHA1InWant', 'true')
+        logger.info(f"Created git mirror: {self.path}")
+
+    def default_branch(self, repo_url: str) -> Optional[str]:
+        """远程仓库的默认分支，无法获取时返回 None"""
+        result = subprocess.run(
+            ['git', 'ls-remote', '--symref', repo_url, 'HEAD'],
+            capture_output=True, text=True, timeout=120, env=self._env()
+        )
+        if result.returncode != 0:
+            return None
+        for line in result.stdout.splitlines():
+            if line.startswith('ref: refs/heads/') and line.endswith('\tHEAD'):
+                return line[len('ref: refs/heads/'):-len('\tHEAD')]
+        return None
+
+    def update(self, repo_url: str, branch: str) -> Optional[str]:
+        """
+        把远程分支获取到镜像中（只传输镜像中没有的对象）
+
+        Args:
+            repo_url: 远程仓库 URL
+            branch: 分支名，不存在时获取远程的默认分支
+
+        Returns:
+            实际获取的分支名，失败时返回 None
+        """
+        with self._lock:
+            self._ensure()
+            if self._fetch(repo_url, branch):
+                return branch
+            default = self.default_branch(repo_url)
+            if default and default != branch:
+                logger.info(f"Branch {branch} not found, mirroring default branch {default}")
+                if self._fetch(repo_url, default):
+                    return default
+        return None
+
+    def _fetch(self, repo_url: str, branch: str) -> bool:
+        refspec = f'+refs/heads/{branch}:refs/namespaces/{self.key(repo_url)}/refs/heads/{branch}'
+        result = self._git('fetch', '--depth', '1', '--no-tags', '--quiet', repo_url, refspec, timeout=FETCH_TIMEOUT)
+        if result.returncode != 0:
+            logger.warning(f"Git mirror fetch failed for {repo_url} ({branch}): {result.stderr}")
+            return False
+        logger.info(f"Updated git mirror for {repo_url} ({branch})")
+        return True
+
+
+# 全局镜像实例
+git_mirror = GitMirror(settings.GIT_MIRROR_DIR)
@@ -2,17 +2,176 @@
 Git仓库服务
 从Git仓库克隆Salesforce项目并分析
 """
+import json
 import os
 import subprocess
 import shutil
 import stat
 import platform
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from django.conf import settings
 import logging
 
+from .code_search import code_search_service
+from .ast_pack import pack_directory
+from .blob_store import blob_store, dedupe_directory, sha1_file
+from .git_mirror import git_mirror
+from .storage import ast_store
+
 logger = logging.getLogger(__name__)
 
+# js_ast_parser.js 批处理模式每次解析的文件数（避免命令行过长）
+LWC_BATCH_SIZE = 500
+
+# 元数据目录名 -> 计数的文件后缀（None 表示计数子目录，即 LWC 组件）
+METADATA_DIR_SUFFIXES = {
+    'classes': '.cls',
+    'pages': '.page',
+    'lwc': None,
+    'triggers': '.trigger',
+}
+
+# 稀疏检出时保留的元数据目录（detect_salesforce_structure 和分析用到的目录）
+SPARSE_METADATA_DIRS = tuple(METADATA_DIR_SUFFIXES)
+
+# 结构检测时跳过的目录
+SCAN_SKIP_DIRS = {'node_modules'}
+
+# 结构检测结果的缓存（按提交）
+STRUCTURE_CACHE_FILE = 'salesforce-structure.json'
+STRUCTURE_CACHE_VERSION = 1
+_structure_cache = {}
+_structure_lock = threading.Lock()
+
+
+def _scan_metadata_dirs(roots):
+    """
+    遍历目录树，找出所有元数据目录（不进入元数据目录内部）
+    
+    Returns:
+        dict: 目录名 -> [(完整路径, 文件/组件数)]，不包含空目录
+    """
+    found = {name: [] for name in METADATA_DIR_SUFFIXES}
+    stack = []
+    for root in roots:
+        if root.name in METADATA_DIR_SUFFIXES:
+            stack.append((str(root), root.name))
+        else:
+            stack.append((str(root), None))
+    while stack:
+        directory, metadata_type = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        if metadata_type is not None:
+            suffix = METADATA_DIR_SUFFIXES[metadata_type]
+            if suffix is None:
+                count = sum(1 for e in entries if e.is_dir() and not e.name.startswith('.'))
+            else:
+                count = sum(1 for e in entries if e.name.endswith(suffix) and e.is_file())
+            if count:
+                found[metadata_type].append((directory, count))
+            continue
+        for entry in entries:
+            if entry.name.startswith('.') or entry.name in SCAN_SKIP_DIRS:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                metadata_type = entry.name if entry.name in METADATA_DIR_SUFFIXES else None
+                stack.append((entry.path, metadata_type))
+    return found
+
+
+def _structure_paths(info):
+    """结构检测结果中某种类型的所有目录（兼容只有 path 的旧格式）"""
+    return info.get('paths') or [info['path']]
+
+
+def _parse_package_directories(text):
+    """解析 sfdx-project.json 的内容，返回 packageDirectories 路径列表"""
+    project = json.loads(text)
+    return [
+        package['path'].replace('\\', '/').strip('/')
+        for package in project.get('packageDirectories', [])
+        if package.get('path')
+    ]
+
+
+def _head_commit(repo_path):
+    """直接读取 .git 中的 HEAD 提交（克隆的对象目录可能在 GIT_OBJECT_DIRECTORY 中，不调用 git）"""
+    git_dir = repo_path / '.git'
+    try:
+        head = (git_dir / 'HEAD').read_text(encoding='utf-8').strip()
+        if not head.startswith('ref: '):
+            return head or None
+        ref = head[len('ref: '):]
+        ref_file = git_dir / ref
+        if ref_file.is_file():
+            return ref_file.read_text(encoding='utf-8').strip() or None
+        packed = git_dir / 'packed-refs'
+        if packed.is_file():
+            for line in packed.read_text(encoding='utf-8').splitlines():
+                if line.endswith(' ' + ref):
+                    return line.split(' ', 1)[0]
+    except OSError:
+        pass
+    return None
+
+
+def _load_structure(repo_path, commit):
+    """按提交读取缓存的结构检测结果，未缓存时返回 None"""
+    if commit is None:
+        return None
+    key = str(repo_path)
+    with _structure_lock:
+        cached = _structure_cache.get(key)
+    if cached is not None and cached[0] == commit:
+        return cached[1]
+    try:
+        with open(repo_path / '.git' / STRUCTURE_CACHE_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('version') != STRUCTURE_CACHE_VERSION or data.get('commit') != commit:
+        return None
+    result = data['structure']
+    with _structure_lock:
+        _structure_cache[key] = (commit, result)
+    return result
+
+
+def _save_structure(repo_path, commit, result):
+    if commit is None:
+        return
+    with _structure_lock:
+        _structure_cache[str(repo_path)] = (commit, result)
+    try:
+        with open(repo_path / '.git' / STRUCTURE_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'version': STRUCTURE_CACHE_VERSION, 'commit': commit, 'structure': result},
+                      f, ensure_ascii=False)
+    except OSError as e:
+        logger.warning(f"Failed to cache structure for {repo_path}: {e}")
+
+
+def _directory_size(path, exclude=()):
+    """目录下所有文件的总大小（字节），exclude 为跳过的顶层目录名"""
+    total = 0
+    root = Path(path)
+    if not root.is_dir():
+        return 0
+    for directory, dirs, files in os.walk(root):
+        if Path(directory) == root:
+            dirs[:] = [d for d in dirs if d not in exclude]
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(directory, name)).st_size
+            except OSError:
+                pass
+    return total
+
 
 def remove_readonly(func, path, excinfo):
     """
@@ -30,14 +189,9 @@ class GitService:
         # 项目克隆目录
         self.project_dir = Path(settings.BASE_DIR).parent / 'project'
         
-        # AST输出目录 - 支持Cloud Storage
-        if settings.USE_CLOUD_STORAGE:
-            import sys
-            sys.path.insert(0, str(Path(settings.BASE_DIR).parent))
-            from cloud_storage import get_data_path
-            self.output_dir = get_data_path('ast').parent
-        else:
-            self.output_dir = Path(settings.BASE_DIR).parent / 'output'
+        # AST输出目录 - 通过 DataStore 写入（Cloud Storage 模式下为本地缓存，后台同步到 /data）
+        self.store = ast_store
+        self.output_dir = ast_store.root
         
         # 根据操作系统选择正确的 PMD 命令
         analyzer_bin = Path(settings.BASE_DIR).parent / 'analyzer' / 'bin'
@@ -46,7 +200,7 @@ class GitService:
         else:
             self.pmd_bin = analyzer_bin / 'pmd'
         
-    def clone_repository(self, repo_url, branch='main', force=False):
+    def clone_repository(self, repo_url, branch='main', force=False, sparse=None):
         """
         克隆Git仓库
         
@@ -54,10 +208,15 @@ class GitService:
             repo_url: Git仓库URL
             branch: 分支名称，默认为main
             force: 是否强制重新克隆（删除已存在的目录）
+            sparse: 是否部分克隆（--filter=blob:none）并只检出元数据目录，
+                    None 时使用 GIT_SPARSE_CHECKOUT 设置
             
         Returns:
             dict: 包含克隆结果的字典
         """
+        if sparse is None:
+            sparse = settings.GIT_SPARSE_CHECKOUT
+
         try:
             # 从URL提取仓库名称
             repo_name = self._extract_repo_name(repo_url)
@@ -108,15 +267,38 @@ class GitService:
             
             # 确保临时目录存在
             os.makedirs(git_objects_dir, exist_ok=True)
+            objects_dir = Path(env.get('GIT_OBJECT_DIRECTORY') or target_dir / '.git' / 'objects')
+            objects_before = _directory_size(objects_dir)
             
             # 使用 shallow clone 并且只克隆单个分支,避免损坏的对象
-            cmd = [
-                'git', 'clone',
+            clone_options = [
                 '--depth', '1',              # Shallow clone
                 '--single-branch',           # 只克隆单个分支
                 '--no-tags',                 # 不获取 tags
+            ]
+            if sparse:
+                # 部分克隆：只下载提交和目录树，文件内容在检出时按需获取
+                clone_options += ['--filter=blob:none', '--no-checkout']
+            
+            # 先更新共享镜像（只获取新对象），再从镜像克隆；镜像不可用或部分克隆时直接从远程克隆
+            source_url = repo_url
+            mirror_branch = None
+            if git_mirror.enabled and not sparse:
+                mirror_before = _directory_size(git_mirror.objects_dir)
+                try:
+                    mirror_branch = git_mirror.update(repo_url, branch)
+                except Exception as e:
+                    logger.warning(f"Git mirror unavailable, cloning from remote: {e}")
+            if mirror_branch:
+                source_url = git_mirror.url
+                branch = mirror_branch
+                clone_options += ['--upload-pack', git_mirror.upload_pack(repo_url)]
+            
+            cmd = [
+                'git', 'clone',
+                *clone_options,
                 '--branch', branch,
-                repo_url,
+                source_url,
                 str(target_dir)
             ]
             
@@ -142,10 +324,8 @@ class GitService:
                 
                 cmd_retry = [
                     'git', 'clone',
-                    '--depth', '1',
-                    '--single-branch',
-                    '--no-tags',
-                    repo_url,
+                    *clone_options,
+                    source_url,
                     str(target_dir)
                 ]
                 
@@ -167,13 +347,31 @@ class GitService:
                     'repo_name': repo_name,
                 }
             
-            logger.info(f"Successfully cloned repository to: {target_dir}")
+            sparse_info = self._sparse_checkout(target_dir, env) if sparse else None
+            
+            if mirror_branch:
+                # 之后的 fetch/pull 直接访问远程仓库
+                subprocess.run(['git', '-C', str(target_dir), 'remote', 'set-url', 'origin', repo_url],
+                               capture_output=True, text=True, env=env)
+                # 从远程下载的数据量即镜像的增长量
+                fetched_bytes = max(_directory_size(git_mirror.objects_dir) - mirror_before, 0)
+            else:
+                fetched_bytes = max(_directory_size(objects_dir) - objects_before, 0)
+            checkout_bytes = _directory_size(target_dir, exclude=('.git',))
+            logger.info(
+                f"Successfully cloned repository to: {target_dir} "
+                f"(fetched {fetched_bytes} bytes, checked out {checkout_bytes} bytes)"
+            )
             
             return {
                 'success': True,
                 'repo_name': repo_name,
                 'target_dir': str(target_dir),
                 'message': f'Successfully cloned {repo_name}',
+                'mirror': str(git_mirror.path) if mirror_branch else None,
+                'sparse_checkout': sparse_info,
+                'fetched_bytes': fetched_bytes,
+                'checkout_bytes': checkout_bytes,
             }
             
         except subprocess.TimeoutExpired:
@@ -189,19 +387,97 @@ class GitService:
                 'error': str(e),
             }
     
-    def analyze_repository(self, repo_name, apex_dir='force-app/main/default/classes', progress_callback=None, current_progress=0, total_files=0):
+    def _sparse_checkout(self, target_dir, env):
+        """
+        对 --no-checkout 部分克隆的仓库执行 cone 模式稀疏检出，只检出元数据目录
+
+        目录从 HEAD 的目录树中查找（此时还没有下载文件内容）：名称为 SPARSE_METADATA_DIRS 的目录，
+        sfdx-project.json 声明了 packageDirectories 时只在这些包目录中查找。
+        找不到任何目录或稀疏检出失败时检出完整工作区
+
+        Returns:
+            dict: {'paths': 检出的目录列表, 'package_dirs': 包目录列表}，完整检出时 paths 为 None
+        """
+        def git(*args):
+            return subprocess.run(
+                ['git', '-C', str(target_dir), *args],
+                capture_output=True,
+                text=True,
+                timeout=300,
+                env=env
+            )
+
+        package_dirs = []
+        result = git('show', 'HEAD:sfdx-project.json')
+        if result.returncode == 0:
+            try:
+                package_dirs = _parse_package_directories(result.stdout)
+            except (ValueError, AttributeError, TypeError) as e:
+                logger.warning(f"Invalid sfdx-project.json in {target_dir}: {e}")
+
+        paths = []
+        result = git('ls-tree', '-r', '-d', '--name-only', 'HEAD')
+        if result.returncode == 0:
+            for directory in sorted(result.stdout.splitlines()):
+                if directory.rsplit('/', 1)[-1] not in SPARSE_METADATA_DIRS:
+                    continue
+                if package_dirs and not any(
+                    directory == package or directory.startswith(package + '/')
+                    for package in package_dirs
+                ):
+                    continue
+                # 已选目录的子目录（如 lwc/foo/classes）由父目录覆盖
+                if any(directory.startswith(path + '/') for path in paths):
+                    continue
+                paths.append(directory)
+
+        if paths:
+            for args in (('sparse-checkout', 'init', '--cone'),
+                         ('sparse-checkout', 'set', *paths),
+                         ('checkout',)):
+                result = git(*args)
+                if result.returncode != 0:
+                    logger.warning(f"git {' '.join(args[:2])} failed, falling back to full checkout: {result.stderr}")
+                    paths = []
+                    break
+
+        if not paths:
+            git('sparse-checkout', 'disable')
+            result = git('checkout')
+            if result.returncode != 0:
+                raise RuntimeError(f'Git checkout failed: {result.stderr}')
+            logger.info(f"Checked out full tree (no sparse checkout): {target_dir}")
+            return {'paths': None, 'package_dirs': package_dirs}
+
+        logger.info(f"Sparse checkout of {target_dir}: {paths}")
+        return {'paths': paths, 'package_dirs': package_dirs}
+
+    def analyze_repository(self, repo_name, apex_dir='force-app/main/default/classes', progress_callback=None, current_progress=0, total_files=0, trigger_dir=None):
         """
-        使用PMD分析仓库中的Apex代码
+        使用PMD分析仓库中的Apex代码（类和触发器）
+        类和触发器提交到同一个 PMD 线程池并行分析（见 _run_pmd_jobs）
         
         Args:
             repo_name: 仓库名称
-            apex_dir: Apex代码相对目录，默认为Salesforce DX标准路径
+            apex_dir: Apex代码相对目录（多包项目可传入目录列表），默认为Salesforce DX标准路径
             progress_callback: 进度回调函数 callback(current, total, message)
             current_progress: 当前已完成的文件数
             total_files: 总文件数
+            trigger_dir: 触发器相对目录（或目录列表），None 时使用检测到的触发器目录
             
         Returns:
-            dict: 包含分析结果的字典
+            dict: 包含分析结果的字典，触发器的分析结果在 'trigger' 中
+        """
+        result = self._analyze_apex(repo_name, apex_dir, progress_callback, current_progress, total_files, trigger_dir)
+        if result['success']:
+            result['stored'] = self.store_output(repo_name, ['apex', 'trigger'] if result['trigger'] else ['apex'])
+            result['code_index'] = self.refresh_code_index(repo_name)
+        return result
+    
+    def _analyze_apex(self, repo_name, apex_dir, progress_callback, current_progress, total_files, trigger_dir):
+        """
+        分析 Apex 类和触发器（见 analyze_repository），不转存输出目录、不刷新代码搜索索引，
+        由最外层的入口（analyze_repository / analyze_all_components）各执行一次
         """
         try:
             repo_path = self.project_dir / repo_name
@@ -213,57 +489,72 @@ class GitService:
                 }
             
             # 查找Apex类文件
-            apex_path = repo_path / apex_dir
-            
-            if not apex_path.exists():
-                # 尝试其他常见路径
-                alternative_paths = [
-                    'src/classes',
-                    'classes',
-                    'force-app/main/default/classes',
-                ]
-                
-                for alt_path in alternative_paths:
-                    test_path = repo_path / alt_path
-                    if test_path.exists():
-                        apex_path = test_path
-                        break
-                
-                if not apex_path.exists():
-                    return {
-                        'success': False,
-                        'error': f'Apex classes directory not found in {repo_name}',
-                        'searched_paths': [apex_dir] + alternative_paths,
-                    }
+            apex_dirs = [apex_dir] if isinstance(apex_dir, str) else list(apex_dir)
+            apex_paths = [repo_path / d for d in apex_dirs if (repo_path / d).exists()]
+            
+            structure = None
+            if not apex_paths and apex_dirs:
+                # 使用检测到的结构（按提交缓存）
+                structure = self.detect_salesforce_structure(repo_name)
+                if structure.get('success') and structure.get('apex_classes'):
+                    apex_paths = [repo_path / d for d in structure['apex_classes']['paths']]
+            
+            # 查找触发器目录
+            if trigger_dir is None:
+                structure = structure or self.detect_salesforce_structure(repo_name)
+                trigger_dirs = structure['apex_triggers']['paths'] if structure.get('apex_triggers') else []
+            else:
+                trigger_dirs = [trigger_dir] if isinstance(trigger_dir, str) else list(trigger_dir)
+            trigger_paths = [repo_path / d for d in trigger_dirs if (repo_path / d).exists()]
+            
+            if not apex_paths and not trigger_paths:
+                return {
+                    'success': False,
+                    'error': f'Apex classes directory not found in {repo_name}',
+                    'searched_paths': apex_dirs,
+                }
             
-            # 查找所有.cls文件
-            apex_files = list(apex_path.glob('*.cls'))
+            # 查找所有.cls和.trigger文件
+            apex_files = [f for apex_path in apex_paths for f in apex_path.glob('*.cls')]
+            trigger_files = [f for trigger_path in trigger_paths for f in trigger_path.glob('*.trigger')]
             
-            if not apex_files:
+            if not apex_files and not trigger_files:
                 return {
                     'success': False,
-                    'error': f'No Apex class files found in {apex_path}',
+                    'error': f'No Apex class files found in {", ".join(map(str, apex_paths + trigger_paths))}',
                 }
             
-            logger.info(f"Found {len(apex_files)} Apex files in {apex_path}")
+            logger.info(f"Found {len(apex_files)} Apex files and {len(trigger_files)} triggers")
             
-            # 创建输出目录 - 按仓库分类，Apex文件放在apex子目录下
+            # 创建输出目录 - 按仓库分类，Apex文件放在apex子目录下，触发器放在trigger子目录下
             output_ast_dir = self.output_dir / 'ast' / repo_name / 'apex'
             output_ast_dir.mkdir(parents=True, exist_ok=True)
+            output_trigger_dir = self.output_dir / 'ast' / repo_name / 'trigger'
+            if trigger_files:
+                output_trigger_dir.mkdir(parents=True, exist_ok=True)
             
-            # 分析每个文件
-            analyzed_files = []
-            failed_files = []
+            # 类和触发器在同一个线程池中分析
+            jobs = [(f, output_ast_dir) for f in apex_files] + [(f, output_trigger_dir) for f in trigger_files]
+            results = self._run_pmd_jobs(jobs, progress_callback, current_progress, total_files)
             
-            for i, apex_file in enumerate(apex_files):
-                if progress_callback:
-                    progress_callback(current_progress + i, total_files, f'Analyzing {apex_file.name}...')
-                
-                result = self._analyze_apex_file(apex_file, output_ast_dir)
-                if result['success']:
-                    analyzed_files.append(result)
-                else:
-                    failed_files.append(result)
+            # 分析每个文件
+            analyzed_files = [r for r in results[:len(apex_files)] if r['success']]
+            failed_files = [r for r in results[:len(apex_files)] if not r['success']]
+            
+            trigger_result = None
+            if trigger_files:
+                trigger_results = results[len(apex_files):]
+                analyzed_triggers = [r for r in trigger_results if r['success']]
+                trigger_result = {
+                    'success': True,
+                    'file_type': 'trigger',
+                    'total_files': len(trigger_files),
+                    'analyzed': len(analyzed_triggers),
+                    'failed': len(trigger_files) - len(analyzed_triggers),
+                    'analyzed_files': analyzed_triggers,
+                    'failed_files': [r for r in trigger_results if not r['success']],
+                    'output_dir': str(output_trigger_dir),
+                }
             
             return {
                 'success': True,
@@ -275,6 +566,7 @@ class GitService:
                 'analyzed_files': analyzed_files,
                 'failed_files': failed_files,
                 'output_dir': str(output_ast_dir),
+                'trigger': trigger_result,
             }
             
         except Exception as e:
@@ -284,9 +576,33 @@ class GitService:
                 'error': str(e),
             }
     
+    def _run_pmd_jobs(self, jobs, progress_callback=None, current_progress=0, total_files=0):
+        """
+        在线程池中执行 PMD ast-dump（ast-dump 每次只接受一个文件，最多同时运行 PMD_WORKERS 个进程）
+        
+        Args:
+            jobs: [(源文件, 输出目录)]
+            
+        Returns:
+            list: 与 jobs 顺序一致的分析结果
+        """
+        results = [None] * len(jobs)
+        workers = max(1, min(settings.PMD_WORKERS, len(jobs)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pmd') as executor:
+            futures = {
+                executor.submit(self._analyze_apex_file, source_file, output_dir): i
+                for i, (source_file, output_dir) in enumerate(jobs)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                results[i] = future.result()
+                if progress_callback:
+                    progress_callback(current_progress + done, total_files, f'Analyzed {jobs[i][0].name}')
+        return results
+    
     def analyze_all_components(self, repo_name, structure_info=None, progress_callback=None):
         """
-        分析仓库中的所有组件(Apex、Visualforce、LWC)
+        分析仓库中的所有组件(Apex类和触发器、Visualforce、LWC)
         
         Args:
             repo_name: 仓库名称
@@ -307,6 +623,7 @@ class GitService:
                 'success': True,
                 'repo_name': repo_name,
                 'apex': None,
+                'trigger': None,
                 'visualforce': None,
                 'lwc': None,
             }
@@ -315,6 +632,8 @@ class GitService:
             total_files = 0
             if structure_info.get('apex_classes'):
                 total_files += structure_info['apex_classes'].get('count', 0)
+            if structure_info.get('apex_triggers'):
+                total_files += structure_info['apex_triggers'].get('count', 0)
             if structure_info.get('visualforce_pages'):
                 total_files += structure_info['visualforce_pages'].get('count', 0)
             if structure_info.get('lwc_components'):
@@ -322,18 +641,26 @@ class GitService:
             
             current_progress = 0
             
-            # 分析Apex类
-            if structure_info.get('apex_classes'):
-                apex_dir = structure_info['apex_classes']['path']
+            # 分析Apex类和触发器（同一个 PMD 线程池）
+            if structure_info.get('apex_classes') or structure_info.get('apex_triggers'):
+                apex_dir = _structure_paths(structure_info['apex_classes']) if structure_info.get('apex_classes') else []
+                if structure_info.get('apex_triggers'):
+                    trigger_dir = _structure_paths(structure_info['apex_triggers'])
+                else:
+                    # 旧格式的结构信息没有触发器字段时重新检测（按提交缓存）
+                    trigger_dir = [] if 'apex_triggers' in structure_info else None
                 if progress_callback:
-                    progress_callback(current_progress, total_files, f'Analyzing Apex classes...')
-                results['apex'] = self.analyze_repository(repo_name, apex_dir, progress_callback, current_progress, total_files)
+                    progress_callback(current_progress, total_files, f'Analyzing Apex classes and triggers...')
+                results['apex'] = self._analyze_apex(repo_name, apex_dir, progress_callback, current_progress, total_files, trigger_dir)
                 if results['apex'] and results['apex'].get('success'):
+                    results['trigger'] = results['apex'].get('trigger')
                     current_progress += results['apex'].get('analyzed', 0)
+                if results['trigger']:
+                    current_progress += results['trigger'].get('analyzed', 0)
             
             # 分析Visualforce页面
             if structure_info.get('visualforce_pages'):
-                vf_dir = structure_info['visualforce_pages']['path']
+                vf_dir = _structure_paths(structure_info['visualforce_pages'])
                 if progress_callback:
                     progress_callback(current_progress, total_files, f'Analyzing Visualforce pages...')
                 results['visualforce'] = self._analyze_visualforce(repo_name, vf_dir, progress_callback, current_progress, total_files)
@@ -342,7 +669,7 @@ class GitService:
             
             # 分析LWC组件
             if structure_info.get('lwc_components'):
-                lwc_dir = structure_info['lwc_components']['path']
+                lwc_dir = _structure_paths(structure_info['lwc_components'])
                 if progress_callback:
                     progress_callback(current_progress, total_files, f'Analyzing LWC components...')
                 results['lwc'] = self._analyze_lwc(repo_name, lwc_dir, progress_callback, current_progress, total_files)
@@ -353,12 +680,19 @@ class GitService:
             total_analyzed = 0
             if results['apex'] and results['apex'].get('success'):
                 total_analyzed += results['apex'].get('analyzed', 0)
+            if results['trigger'] and results['trigger'].get('success'):
+                total_analyzed += results['trigger'].get('analyzed', 0)
             if results['visualforce'] and results['visualforce'].get('success'):
                 total_analyzed += results['visualforce'].get('analyzed', 0)
             if results['lwc'] and results['lwc'].get('success'):
                 total_analyzed += results['lwc'].get('analyzed', 0)
             
             results['analyzed'] = total_analyzed
+            results['stored'] = self.store_output(
+                repo_name,
+                [t for t in ('apex', 'trigger', 'visualforce', 'lwc') if results[t] and results[t].get('success')]
+            )
+            results['code_index'] = self.refresh_code_index(repo_name)
             
             return results
             
@@ -369,47 +703,119 @@ class GitService:
                 'error': str(e),
             }
     
+    def store_output(self, repo_name, component_types):
+        """
+        按 AST_OUTPUT_FORMAT 转存组件类型的输出目录
+        - pack: 打包为 <类型>.pack（见 ast_pack）
+        - blobs: 存入内容寻址存储并更新仓库清单（见 blob_store）
+        转存后散文件被删除，导入、源代码接口和代码搜索透明地从包或清单中读取
+        
+        Returns:
+            组件类型 -> 转存统计，格式为 files 时返回 None
+        """
+        output_format = settings.AST_OUTPUT_FORMAT
+        if output_format not in ('pack', 'blobs'):
+            return None
+        
+        stored = {}
+        for component_type in component_types:
+            directory = self.output_dir / 'ast' / repo_name / component_type
+            try:
+                if output_format == 'blobs':
+                    stored[component_type] = dedupe_directory(directory)
+                    continue
+                loose_files = [p for p in directory.rglob('*') if p.is_file()] if directory.is_dir() else []
+                stored[component_type] = pack_directory(directory)
+                # 同步新包，并删除持久目录中的散文件
+                self.store.mark_dirty(directory.with_name(component_type + '.pack'))
+                for path in loose_files:
+                    self.store.delete(path)
+            except Exception as e:
+                logger.warning(f"Failed to store {directory} as {output_format}: {e}")
+                stored[component_type] = {'error': str(e)}
+        return stored
+    
+    def _reuse_ast(self, analyzer, source_file, output_file):
+        """
+        blobs 格式下按源文件哈希查找之前生成的 AST，命中时直接写出，不再运行分析器
+        
+        Returns:
+            (源文件哈希, 是否命中)；未启用 blobs 格式时返回 (None, False)
+        """
+        if settings.AST_OUTPUT_FORMAT != 'blobs':
+            return None, False
+        try:
+            source_sha1 = sha1_file(source_file)
+            data = blob_store.derived(analyzer, source_sha1)
+        except OSError as e:
+            logger.warning(f"Failed to look up cached AST for {source_file}: {e}")
+            return None, False
+        if data is None:
+            return source_sha1, False
+        self.store.write_bytes(output_file, data)
+        logger.info(f"Reusing cached AST for {Path(source_file).name}")
+        return source_sha1, True
+    
+    def _remember_ast(self, analyzer, source_sha1, output_file):
+        """记录分析器为该源文件生成的 AST，供其他仓库/分支复用"""
+        if not source_sha1:
+            return
+        try:
+            blob_store.record_derived(analyzer, source_sha1, Path(output_file).read_bytes())
+        except OSError as e:
+            logger.warning(f"Failed to cache AST {output_file}: {e}")
+    
+    def refresh_code_index(self, repo_name):
+        """增量刷新仓库输出目录下源文件的代码搜索索引"""
+        try:
+            return code_search_service.refresh(self.output_dir / 'ast' / repo_name)
+        except Exception as e:
+            logger.warning(f"Failed to refresh code index for {repo_name}: {e}")
+            return None
+    
     def _analyze_apex_file(self, apex_file, output_dir):
-        """使用PMD分析单个Apex文件"""
+        """使用PMD分析单个Apex文件（类或触发器）"""
         try:
             file_name = apex_file.stem  # 不含扩展名的文件名
             output_file = output_dir / f"{file_name}_ast.xml"
             
             logger.info(f"Analyzing: {apex_file.name}")
             
-            # 构建PMD命令 - 使用正确的参数
-            cmd = [
-                str(self.pmd_bin),
-                'ast-dump',
-                '--language', 'apex',
-                '--format', 'xml',
-                '--file', str(apex_file),
-            ]
+            # 相同的源文件之前已分析过时直接复用 AST（blobs 格式）
+            source_sha1, reused = self._reuse_ast('apex', apex_file, output_file)
+            if not reused:
+                # 构建PMD命令 - 使用正确的参数
+                cmd = [
+                    str(self.pmd_bin),
+                    'ast-dump',
+                    '--language', 'apex',
+                    '--format', 'xml',
+                    '--file', str(apex_file),
+                ]
             
-            # 执行PMD命令
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60  # 1分钟超时
-            )
+                # 执行PMD命令
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    timeout=60  # 1分钟超时
+                )
             
-            if result.returncode != 0:
-                logger.error(f"PMD analysis failed for {apex_file.name}: {result.stderr}")
-                return {
-                    'success': False,
-                    'file': apex_file.name,
-                    'error': result.stderr,
-                }
+                if result.returncode != 0:
+                    logger.error(f"PMD analysis failed for {apex_file.name}: {result.stderr}")
+                    return {
+                        'success': False,
+                        'file': apex_file.name,
+                        'error': result.stderr,
+                    }
             
-            # 保存AST输出
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(result.stdout)
+                # 保存AST输出
+                self.store.write_text(output_file, result.stdout)
+                self._remember_ast('apex', source_sha1, output_file)
             
-            # 保存源代码副本
-            source_copy = output_dir / f"{file_name}.cls"
-            if not source_copy.exists():
-                shutil.copy2(apex_file, source_copy)
+            # 保存源代码副本（.cls 或 .trigger）
+            source_copy = output_dir / f"{file_name}{apex_file.suffix}"
+            self.store.copy_file(apex_file, source_copy)
             
             logger.info(f"AST saved to: {output_file}")
             
@@ -418,6 +824,7 @@ class GitService:
                 'file': apex_file.name,
                 'output_file': str(output_file),
                 'source_file': str(source_copy),
+                'cached': reused,
             }
             
         except subprocess.TimeoutExpired:
@@ -436,27 +843,28 @@ class GitService:
             }
     
     def _analyze_visualforce(self, repo_name, vf_dir, progress_callback=None, current_progress=0, total_files=0):
-        """分析Visualforce页面"""
+        """分析Visualforce页面（vf_dir 可以是目录列表）"""
         try:
             repo_path = self.project_dir / repo_name
-            vf_path = repo_path / vf_dir
+            vf_dirs = [vf_dir] if isinstance(vf_dir, str) else list(vf_dir)
+            vf_paths = [repo_path / d for d in vf_dirs if (repo_path / d).exists()]
             
-            if not vf_path.exists():
+            if not vf_paths:
                 return {
                     'success': False,
-                    'error': f'Visualforce directory not found: {vf_dir}',
+                    'error': f'Visualforce directory not found: {", ".join(vf_dirs)}',
                 }
             
             # 查找所有.page文件
-            vf_files = list(vf_path.glob('*.page'))
+            vf_files = [f for vf_path in vf_paths for f in vf_path.glob('*.page')]
             
             if not vf_files:
                 return {
                     'success': False,
-                    'error': f'No Visualforce pages found in {vf_path}',
+                    'error': f'No Visualforce pages found in {", ".join(vf_dirs)}',
                 }
             
-            logger.info(f"Found {len(vf_files)} Visualforce pages in {vf_path}")
+            logger.info(f"Found {len(vf_files)} Visualforce pages in {len(vf_paths)} directories")
             
             # 创建输出目录
             output_vf_dir = self.output_dir / 'ast' / repo_name / 'visualforce'
@@ -502,38 +910,40 @@ class GitService:
             
             logger.info(f"Analyzing Visualforce: {vf_file.name}")
             
-            # PMD支持Visualforce分析
-            cmd = [
-                str(self.pmd_bin),
-                'ast-dump',
-                '--language', 'visualforce',
-                '--format', 'xml',
-                '--file', str(vf_file),
-            ]
+            # 相同的源文件之前已分析过时直接复用 AST（blobs 格式）
+            source_sha1, reused = self._reuse_ast('visualforce', vf_file, output_file)
+            if not reused:
+                # PMD支持Visualforce分析
+                cmd = [
+                    str(self.pmd_bin),
+                    'ast-dump',
+                    '--language', 'visualforce',
+                    '--format', 'xml',
+                    '--file', str(vf_file),
+                ]
             
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    timeout=60
+                )
             
-            if result.returncode != 0:
-                logger.error(f"PMD Visualforce analysis failed for {vf_file.name}: {result.stderr}")
-                return {
-                    'success': False,
-                    'file': vf_file.name,
-                    'error': result.stderr,
-                }
+                if result.returncode != 0:
+                    logger.error(f"PMD Visualforce analysis failed for {vf_file.name}: {result.stderr}")
+                    return {
+                        'success': False,
+                        'file': vf_file.name,
+                        'error': result.stderr,
+                    }
             
-            # 保存AST输出
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(result.stdout)
+                # 保存AST输出
+                self.store.write_text(output_file, result.stdout)
+                self._remember_ast('visualforce', source_sha1, output_file)
             
             # 保存源代码副本
             source_copy = output_dir / f"{file_name}.page"
-            if not source_copy.exists():
-                shutil.copy2(vf_file, source_copy)
+            self.store.copy_file(vf_file, source_copy)
             
             logger.info(f"Visualforce AST saved to: {output_file}")
             
@@ -542,6 +952,7 @@ class GitService:
                 'file': vf_file.name,
                 'output_file': str(output_file),
                 'source_file': str(source_copy),
+                'cached': reused,
             }
             
         except subprocess.TimeoutExpired:
@@ -560,32 +971,39 @@ class GitService:
             }
     
     def _analyze_lwc(self, repo_name, lwc_dir, progress_callback=None, current_progress=0, total_files=0):
-        """简単分析LWC组件(提取基本信息)"""
+        """简単分析LWC组件(提取基本信息)，lwc_dir 可以是目录列表"""
         try:
             repo_path = self.project_dir / repo_name
-            lwc_path = repo_path / lwc_dir
+            lwc_dirs = [lwc_dir] if isinstance(lwc_dir, str) else list(lwc_dir)
+            lwc_paths = [repo_path / d for d in lwc_dirs if (repo_path / d).exists()]
             
-            if not lwc_path.exists():
+            if not lwc_paths:
                 return {
                     'success': False,
-                    'error': f'LWC directory not found: {lwc_dir}',
+                    'error': f'LWC directory not found: {", ".join(lwc_dirs)}',
                 }
             
             # LWC组件是目录结构
-            lwc_components = [d for d in lwc_path.iterdir() if d.is_dir() and not d.name.startswith('.')]
+            lwc_components = [
+                d for lwc_path in lwc_paths for d in lwc_path.iterdir()
+                if d.is_dir() and not d.name.startswith('.')
+            ]
             
             if not lwc_components:
                 return {
                     'success': False,
-                    'error': f'No LWC components found in {lwc_path}',
+                    'error': f'No LWC components found in {", ".join(lwc_dirs)}',
                 }
             
-            logger.info(f"Found {len(lwc_components)} LWC components in {lwc_path}")
+            logger.info(f"Found {len(lwc_components)} LWC components in {len(lwc_paths)} directories")
             
             # 创建输出目录
             output_lwc_dir = self.output_dir / 'ast' / repo_name / 'lwc'
             output_lwc_dir.mkdir(parents=True, exist_ok=True)
             
+            # 输出 JSON 时由一个 Node.js 进程批量解析所有组件
+            batch_results = self._parse_lwc_batch(lwc_components)
+            
             # 分析每个组件
             analyzed_components = []
             failed_components = []
@@ -594,7 +1012,7 @@ class GitService:
                 if progress_callback:
                     progress_callback(current_progress + i, total_files, f'Analyzing {lwc_comp.name}...')
                 
-                result = self._analyze_lwc_component(lwc_comp, output_lwc_dir)
+                result = self._analyze_lwc_component(lwc_comp, output_lwc_dir, batch_results)
                 if result['success']:
                     analyzed_components.append(result)
                 else:
@@ -618,8 +1036,55 @@ class GitService:
                 'error': str(e),
             }
     
-    def _analyze_lwc_component(self, lwc_dir, output_dir):
-        """简单分析单个LWC组件"""
+    def _parse_lwc_batch(self, lwc_components):
+        """
+        使用 js_ast_parser.js 的批处理模式（NDJSON）解析所有组件的主 JS 文件，
+        避免每个组件启动一次 Node.js 和加载 Babel
+        
+        Returns:
+            JS 文件路径 -> JSON AST（字节串）；未输出 JSON、Babel 解析器不存在或批处理失败时返回空字典，
+            由 _analyze_lwc_component 逐个解析
+        """
+        babel_parser = self.project_dir.parent / 'js_ast_parser.js'
+        if settings.LWC_AST_FORMAT != 'json' or not babel_parser.exists():
+            return {}
+        
+        js_files = [str(d / f"{d.name}.js") for d in lwc_components if (d / f"{d.name}.js").exists()]
+        results = {}
+        for start in range(0, len(js_files), LWC_BATCH_SIZE):
+            chunk = js_files[start:start + LWC_BATCH_SIZE]
+            try:
+                result = subprocess.run(
+                    ['node', str(babel_parser), '--batch', '-'] + chunk,
+                    capture_output=True,
+                    timeout=30 + len(chunk),
+                    cwd=str(self.project_dir.parent)
+                )
+            except (OSError, subprocess.TimeoutExpired) as e:
+                logger.warning(f"Babel batch parsing failed: {e}")
+                continue
+            if result.returncode != 0:
+                logger.warning(f"Babel batch parsing failed: {result.stderr.decode('utf-8', errors='replace')}")
+                continue
+            for line in result.stdout.splitlines():
+                if not line.strip():
+                    continue
+                document = json.loads(line)
+                if 'error' in document:
+                    logger.warning(f"Babel parser failed for {document.get('file')}: {document['error']}")
+                    continue
+                results[document['file']] = line + b'\n'
+        
+        logger.info(f"Babel batch parsed {len(results)}/{len(js_files)} LWC components")
+        return results
+    
+    def _analyze_lwc_component(self, lwc_dir, output_dir, batch_results=None):
+        """
+        简单分析单个LWC组件
+        
+        Args:
+            batch_results: _parse_lwc_batch 的结果（JS 文件路径 -> JSON AST），命中时不再单独启动 Node.js
+        """
         try:
             comp_name = lwc_dir.name
             
@@ -648,12 +1113,32 @@ class GitService:
             # 如果有JavaScript文件,使用Babel解析（支持ES6+）
             if js_file.exists():
                 try:
-                    output_file = output_dir / f"{comp_name}_ast.xml"
-                    
-                    # 使用Babel解析器（位于项目根目录）
+                    # 使用Babel解析器（位于项目根目录），按 LWC_AST_FORMAT 输出 JSON 或 XML
                     babel_parser = self.project_dir.parent / 'js_ast_parser.js'
+                    json_output = babel_parser.exists() and settings.LWC_AST_FORMAT == 'json'
+                    output_file = output_dir / f"{comp_name}_ast.{'json' if json_output else 'xml'}"
+                    
+                    # 相同的源文件之前已分析过时直接复用 AST（blobs 格式）
+                    parser = 'babel' if babel_parser.exists() else 'pmd'
+                    analyzer = f'lwc-{parser}-json' if json_output else f'lwc-{parser}'
+                    source_sha1, reused = self._reuse_ast(analyzer, js_file, output_file)
+                    batched = (batch_results or {}).get(str(js_file))
                     
-                    if babel_parser.exists():
+                    if reused or batched is not None:
+                        if not reused:
+                            # 批处理（NDJSON）已生成该组件的 AST
+                            self.store.write_bytes(output_file, batched)
+                            self._remember_ast(analyzer, source_sha1, output_file)
+                        component_info['ast_file'] = str(output_file)
+                        component_info['ast_generated'] = True
+                        component_info['ast_cached'] = reused
+                        component_info['parser'] = parser
+                        
+                        # 保存JavaScript源代码副本
+                        js_source_copy = output_dir / f"{comp_name}.js"
+                        self.store.copy_file(js_file, js_source_copy)
+                        component_info['js_source'] = str(js_source_copy)
+                    elif babel_parser.exists():
                         # 使用Node.js运行Babel解析器
                         cmd = [
                             'node',
@@ -671,14 +1156,15 @@ class GitService:
                         )
                         
                         if result.returncode == 0 and output_file.exists():
+                            self.store.mark_dirty(output_file)
+                            self._remember_ast(analyzer, source_sha1, output_file)
                             component_info['ast_file'] = str(output_file)
                             component_info['ast_generated'] = True
                             component_info['parser'] = 'babel'
                             
                             # 保存JavaScript源代码副本
                             js_source_copy = output_dir / f"{comp_name}.js"
-                            if not js_source_copy.exists():
-                                shutil.copy2(js_file, js_source_copy)
+                            self.store.copy_file(js_file, js_source_copy)
                             component_info['js_source'] = str(js_source_copy)
                         else:
                             component_info['ast_generated'] = False
@@ -703,16 +1189,15 @@ class GitService:
                         )
                         
                         if result.returncode == 0:
-                            with open(output_file, 'w', encoding='utf-8') as f:
-                                f.write(result.stdout)
+                            self.store.write_text(output_file, result.stdout)
+                            self._remember_ast('lwc-pmd', source_sha1, output_file)
                             component_info['ast_file'] = str(output_file)
                             component_info['ast_generated'] = True
                             component_info['parser'] = 'pmd'
                             
                             # 保存JavaScript源代码副本
                             js_source_copy = output_dir / f"{comp_name}.js"
-                            if not js_source_copy.exists():
-                                shutil.copy2(js_file, js_source_copy)
+                            self.store.copy_file(js_file, js_source_copy)
                             component_info['js_source'] = str(js_source_copy)
                         else:
                             component_info['ast_generated'] = False
@@ -729,16 +1214,13 @@ class GitService:
             for file in lwc_dir.iterdir():
                 if file.is_file():
                     dest_file = comp_source_dir / file.name
-                    if not dest_file.exists():
-                        shutil.copy2(file, dest_file)
+                    self.store.copy_file(file, dest_file)
             
             component_info['source_dir'] = str(comp_source_dir)
             
             # 保存组件信息为JSON
-            import json
             info_file = output_dir / f"{comp_name}_info.json"
-            with open(info_file, 'w', encoding='utf-8') as f:
-                json.dump(component_info, f, indent=2, ensure_ascii=False)
+            self.store.write_json(info_file, component_info, indent=2)
             
             logger.info(f"LWC component info saved: {info_file}")
             
@@ -830,11 +1312,15 @@ class GitService:
         """
         自动检测Salesforce项目结构
         
+        一次 os.scandir 遍历找出所有 classes / pages / lwc / triggers 目录；
+        sfdx-project.json 声明了 packageDirectories 时只遍历这些包目录（多包项目的每个包都会被分析）。
+        结果按提交缓存（内存 + .git 目录下的文件），分析和导入阶段重复调用时不再遍历
+        
         Args:
             repo_name: 仓库名称
             
         Returns:
-            dict: 包含检测到的路径信息
+            dict: 包含检测到的路径信息，每种类型的 paths 为该类型的所有目录
         """
         try:
             repo_path = self.project_dir / repo_name
@@ -845,78 +1331,48 @@ class GitService:
                     'error': f'Repository not found: {repo_name}',
                 }
             
+            commit = _head_commit(repo_path)
+            cached = _load_structure(repo_path, commit)
+            if cached is not None:
+                return cached
+            
+            package_dirs = self._package_directories(repo_path)
+            roots = [repo_path / d for d in package_dirs if (repo_path / d).is_dir()] or [repo_path]
+            found = _scan_metadata_dirs(roots)
+            
             result = {
                 'success': True,
                 'repo_name': repo_name,
                 'repo_path': str(repo_path),
+                'commit': commit,
+                'package_directories': package_dirs,
                 'apex_classes': None,
+                'apex_triggers': None,
                 'lwc_components': None,
                 'visualforce_pages': None,
                 'detected_paths': []
             }
             
-            # 常见的Salesforce项目结构路径
-            apex_search_paths = [
-                'force-app/main/default/classes',
-                'src/classes',
-                'classes',
-            ]
-            
-            lwc_search_paths = [
-                'force-app/main/default/lwc',
-                'src/lwc',
-                'lwc',
-            ]
-            
-            vf_search_paths = [
-                'force-app/main/default/pages',
-                'src/pages',
-                'pages',
-            ]
-            
-            # 检测Apex类路径
-            for path in apex_search_paths:
-                full_path = repo_path / path
-                if full_path.exists() and full_path.is_dir():
-                    cls_files = list(full_path.glob('*.cls'))
-                    if cls_files:
-                        result['apex_classes'] = {
-                            'path': path,
-                            'full_path': str(full_path),
-                            'count': len(cls_files)
-                        }
-                        result['detected_paths'].append(f'Apex类: {path} ({len(cls_files)}个文件)')
-                        break
-            
-            # 检测LWC组件路径
-            for path in lwc_search_paths:
-                full_path = repo_path / path
-                if full_path.exists() and full_path.is_dir():
-                    # LWC组件是目录,不是文件
-                    lwc_dirs = [d for d in full_path.iterdir() if d.is_dir() and not d.name.startswith('.')]
-                    if lwc_dirs:
-                        result['lwc_components'] = {
-                            'path': path,
-                            'full_path': str(full_path),
-                            'count': len(lwc_dirs)
-                        }
-                        result['detected_paths'].append(f'LWC组件: {path} ({len(lwc_dirs)}个组件)')
-                        break
-            
-            # 检测Visualforce页面路径
-            for path in vf_search_paths:
-                full_path = repo_path / path
-                if full_path.exists() and full_path.is_dir():
-                    vf_files = list(full_path.glob('*.page'))
-                    if vf_files:
-                        result['visualforce_pages'] = {
-                            'path': path,
-                            'full_path': str(full_path),
-                            'count': len(vf_files)
-                        }
-                        result['detected_paths'].append(f'Visualforce页面: {path} ({len(vf_files)}个文件)')
-                        break
+            for key, dir_name, label, unit in (
+                ('apex_classes', 'classes', 'Apex类', '个文件'),
+                ('apex_triggers', 'triggers', 'Apex触发器', '个文件'),
+                ('lwc_components', 'lwc', 'LWC组件', '个组件'),
+                ('visualforce_pages', 'pages', 'Visualforce页面', '个文件'),
+            ):
+                dirs = sorted(found[dir_name])
+                if not dirs:
+                    continue
+                paths = [Path(d).relative_to(repo_path).as_posix() for d, _ in dirs]
+                result[key] = {
+                    'path': paths[0],
+                    'full_path': dirs[0][0],
+                    'count': sum(count for _, count in dirs),
+                    'paths': paths,
+                }
+                for path, (_, count) in zip(paths, dirs):
+                    result['detected_paths'].append(f'{label}: {path} ({count}{unit})')
             
+            _save_structure(repo_path, commit, result)
             logger.info(f"Detected structure for {repo_name}: {result['detected_paths']}")
             return result
             
@@ -926,7 +1382,17 @@ class GitService:
                 'success': False,
                 'error': str(e),
             }
-
+    
+    def _package_directories(self, repo_path):
+        """sfdx-project.json 中的 packageDirectories 路径，没有该文件时返回空列表"""
+        project_file = repo_path / 'sfdx-project.json'
+        if not project_file.is_file():
+            return []
+        try:
+            return _parse_package_directories(project_file.read_text(encoding='utf-8-sig'))
+        except (OSError, ValueError, AttributeError, TypeError) as e:
+            logger.warning(f"Invalid sfdx-project.json in {repo_path}: {e}")
+            return []
 
 # 创建全局服务实例
 git_service = GitService()
@@ -0,0 +1,147 @@
+"""
+图数据传输格式
+提供紧凑的列式编码，减少大图 JSON 的体积和前端解析时间
+"""
+from typing import Dict, List, Any
+
+# 紧凑格式版本号（前端解码时校验）
+COMPACT_FORMAT_VERSION = 1
+
+# 使用字符串表编码的属性（取值重复度高）
+TABLE_COLUMNS = ('repository', 'className', 'componentName')
+
+# 覆盖率达到该比例的属性使用稠密并行数组，其余使用稀疏数组
+DENSE_COLUMN_MIN_RATIO = 0.5
+
+
+class _StringTable:
+    """字符串表：字符串 -> 整数索引"""
+
+    def __init__(self):
+        self.values = []
+        self._index = {}
+
+    def encode(self, value):
+        idx = self._index.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self._index[value] = idx
+            self.values.append(value)
+        return idx
+
+
+def encode_compact_graph(nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    将前端格式的图数据编码为紧凑列式格式
+
+    Args:
+        nodes: 节点列表，每项包含 id/label/type/name/properties
+        edges: 边列表，每项包含 source/target/type
+
+    Returns:
+        紧凑格式字典：
+        - tables: 类型、仓库、类名等字符串表
+        - nodes: 节点并行数组（id/type/name/shortLabel + 属性列）
+        - edges: 以节点下标表示的边并行数组
+    """
+    type_table = _StringTable()
+    edge_type_table = _StringTable()
+    column_tables = {key: _StringTable() for key in TABLE_COLUMNS}
+
+    count = len(nodes)
+    ids = []
+    types = []
+    names = []
+    labels = {'index': [], 'value': []}
+    short_labels = {'index': [], 'value': []}
+    node_index = {}
+
+    # 统计属性覆盖率，决定稠密或稀疏列
+    key_counts = {}
+    for node in nodes:
+        for key in node.get('properties', {}):
+            key_counts[key] = key_counts.get(key, 0) + 1
+
+    coded_columns = {key: [-1] * count for key in TABLE_COLUMNS if key in key_counts}
+    dense_columns = {}
+    sparse_columns = {}
+    for key, key_count in key_counts.items():
+        if key in coded_columns:
+            continue
+        if key_count >= count * DENSE_COLUMN_MIN_RATIO:
+            dense_columns[key] = [None] * count
+        else:
+            sparse_columns[key] = {'index': [], 'value': []}
+
+    for i, node in enumerate(nodes):
+        node_id = node['id']
+        node_type = node.get('type', 'Unknown')
+        properties = node.get('properties', {})
+
+        node_index[node_id] = i
+        ids.append(node_id)
+        types.append(type_table.encode(node_type))
+
+        # 显示名称与 properties.name 相同时省略，由前端回填
+        name = node.get('name')
+        names.append(None if name == properties.get('name') else name)
+
+        # 简短标签与显示名称相同时省略
+        short_label = node.get('shortLabel', name)
+        if short_label != name:
+            short_labels['index'].append(i)
+            short_labels['value'].append(short_label)
+        
+        label = node.get('label', node_type)
+        if label != node_type:
+            labels['index'].append(i)
+            labels['value'].append(label)
+
+        for key, value in properties.items():
+            if key in coded_columns:
+                coded_columns[key][i] = column_tables[key].encode(value)
+            elif key in dense_columns:
+                dense_columns[key][i] = value
+            else:
+                sparse_columns[key]['index'].append(i)
+                sparse_columns[key]['value'].append(value)
+
+    sources = []
+    targets = []
+    edge_types = []
+    for edge in edges:
+        source = node_index.get(edge['source'])
+        target = node_index.get(edge['target'])
+        if source is None or target is None:
+            continue
+        sources.append(source)
+        targets.append(target)
+        edge_types.append(edge_type_table.encode(edge['type']))
+
+    tables = {
+        'type': type_table.values,
+        'edgeType': edge_type_table.values,
+    }
+    for key in coded_columns:
+        tables[key] = column_tables[key].values
+
+    return {
+        'format': 'compact',
+        'version': COMPACT_FORMAT_VERSION,
+        'tables': tables,
+        'nodes': {
+            'id': ids,
+            'type': types,
+            'name': names,
+            'label': labels,
+            'shortLabel': short_labels,
+            'coded': coded_columns,
+            'dense': dense_columns,
+            'sparse': sparse_columns,
+        },
+        'edges': {
+            'source': sources,
+            'target': targets,
+            'type': edge_types,
+        },
+    }
@@ -0,0 +1,199 @@
+"""
+影响分析索引
+将图的强连通分量收缩为 DAG（condensation），在 DAG 上查询祖先/后代集合并缓存，
+图结构（节点集合和边）变化时整体失效，只修改节点属性时保留
+"""
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, Any, Optional
+import logging
+
+import networkx as nx
+
+logger = logging.getLogger(__name__)
+
+# 缓存的可达分量集合数量上限
+IMPACT_CACHE_SIZE = 1024
+
+# 复制图结构时遇到并发修改的重试次数
+SNAPSHOT_RETRIES = 5
+
+# 作为入口点的节点类型
+ENTRY_POINT_TYPES = ('LWCComponent', 'VisualforcePage', 'ApexTrigger')
+
+# 带有这些注解的 Apex 方法可被外部直接调用，视为入口点
+ENTRY_POINT_ANNOTATIONS = frozenset(name.lower() for name in (
+    'AuraEnabled',
+    'InvocableMethod',
+    'RemoteAction',
+    'HttpGet',
+    'HttpPost',
+    'HttpPut',
+    'HttpPatch',
+    'HttpDelete',
+))
+
+
+def is_entry_point(node_data: Dict[str, Any]) -> bool:
+    """判断节点是否为入口点（LWC、VF 页面、触发器或对外暴露的 Apex 方法）"""
+    if node_data.get('type') in ENTRY_POINT_TYPES:
+        return True
+    annotations = node_data.get('annotations') or []
+    return any(annotation.lower() in ENTRY_POINT_ANNOTATIONS for annotation in annotations)
+
+
+def snapshot_structure(graph) -> nx.DiGraph:
+    """
+    复制图结构（不含属性）
+    导入线程可能同时修改图，遍历中途字典大小变化时重新复制
+    """
+    for attempt in range(SNAPSHOT_RETRIES):
+        try:
+            snapshot = nx.DiGraph()
+            snapshot.add_nodes_from(list(graph))
+            snapshot.add_edges_from([
+                (source, target)
+                for source, targets in list(graph.succ.items())
+                for target in list(targets)
+            ])
+            return snapshot
+        except RuntimeError:
+            if attempt == SNAPSHOT_RETRIES - 1:
+                raise
+    return nx.DiGraph()
+
+
+class ImpactIndex:
+    """
+    基于 condensation DAG 的影响分析索引
+
+    upstream（上游）：依赖该节点的所有节点，即修改该节点会影响到的节点
+    downstream（下游）：该节点依赖的所有节点
+    """
+
+    def __init__(self, local_service, cache_size: int = IMPACT_CACHE_SIZE):
+        self.local_service = local_service
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._version = None
+        self._dag = None
+        self._mapping = {}
+        self._cache = OrderedDict()
+
+    def _ensure_current(self):
+        """
+        图结构变化时重建 condensation DAG 并清空缓存（调用方需持有锁）
+        在图结构的快照上构建；快照期间发生的修改会使结构版本变化，下次查询时重建
+        """
+        version = (self.local_service.epoch, self.local_service.topology_version)
+        if self._dag is not None and self._version == version:
+            return
+
+        snapshot = snapshot_structure(self.local_service.graph)
+        self._dag = nx.condensation(snapshot)
+        self._mapping = self._dag.graph['mapping']
+        self._cache.clear()
+        self._version = version
+        logger.info(
+            f"Built impact index: {snapshot.number_of_nodes()} nodes -> "
+            f"{self._dag.number_of_nodes()} components"
+        )
+
+    def _reachable_components(self, component: int, direction: str):
+        """
+        获取分量在 DAG 上可达的所有分量（不含自身），结果缓存
+
+        Returns:
+            (分量集合, 是否命中缓存)
+        """
+        key = (component, direction)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached, True
+
+        adjacency = self._dag.pred if direction == 'upstream' else self._dag.succ
+        reached = set()
+        queue = deque([component])
+        while queue:
+            current = queue.popleft()
+            for neighbor in adjacency[current]:
+                if neighbor not in reached:
+                    reached.add(neighbor)
+                    queue.append(neighbor)
+
+        reached = frozenset(reached)
+        self._cache[key] = reached
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return reached, False
+
+    def query(self, node_id: str, direction: str = 'upstream',
+              node_types: Optional[List[str]] = None, limit: int = 1000) -> Optional[Dict[str, Any]]:
+        """
+        影响分析查询
+
+        Args:
+            node_id: 起始节点ID（方法、SOQL、类等）
+            direction: 'upstream'（受影响的节点）或 'downstream'（依赖的节点）
+            node_types: 只返回这些类型的节点
+            limit: affected 列表返回的最大节点数（统计数字不受限制）
+
+        Returns:
+            影响分析结果；节点不存在时返回 None
+        """
+        with self._lock:
+            if node_id not in self.local_service.graph:
+                return None
+
+            self._ensure_current()
+            component = self._mapping.get(node_id)
+            if component is None:
+                # 节点在构建快照之后才加入
+                return None
+            components, cached = self._reachable_components(component, direction)
+            version = self.local_service.version
+
+            # 同一强连通分量内的节点互相依赖，也计入结果
+            members = set(self._dag.nodes[component]['members'])
+            for reached in components:
+                members.update(self._dag.nodes[reached]['members'])
+            members.discard(node_id)
+
+        graph = self.local_service.graph
+        allowed = set(node_types) if node_types else None
+        affected = []
+        entry_points = []
+        counts = {}
+        for member in members:
+            node_data = graph.nodes.get(member)
+            if node_data is None:
+                continue
+            node_type = node_data.get('type', 'Unknown')
+            if allowed is not None and node_type not in allowed:
+                continue
+
+            counts[node_type] = counts.get(node_type, 0) + 1
+            summary = {
+                'id': member,
+                'type': node_type,
+                'name': node_data.get('displayName', node_data.get('name', member)),
+            }
+            affected.append(summary)
+            if is_entry_point(node_data):
+                entry_points.append(summary)
+
+        affected.sort(key=lambda n: (n['type'], n['id']))
+        entry_points.sort(key=lambda n: (n['type'], n['id']))
+
+        return {
+            'node': node_id,
+            'direction': direction,
+            'version': version,
+            'cached': cached,
+            'total': len(affected),
+            'counts': counts,
+            'entryPoints': entry_points,
+            'affected': affected[:limit],
+            'truncated': len(affected) > limit,
+        }
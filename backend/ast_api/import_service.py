@@ -3,22 +3,55 @@ AST导入服务
 将解析后的AST数据导入到图数据库（Neo4j或本地）
 """
 from .ast_parser import parse_ast_file
-from .js_ast_parser import parse_js_ast_file
+from .js_ast_parser import parse_js_ast_file, is_json_ast
+from .vf_ast_parser import parse_vf_ast_file
 from .unified_graph_service import unified_graph_service
+from .call_resolver import MethodSymbolIndex, call_key, parse_call_key
+from .soql_parser import soql_node_attributes
 from .models import ASTFile, Repository
+from .ast_pack import PACK_SUFFIX, is_packed, list_entries, read_entry
+from .ir_cache import ir_cache
 import logging
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# 组件类型输出目录 -> XML AST 类型（目录结构见 GitService）
+_COMPONENT_DIR_FORMATS = {'apex': 'apex', 'trigger': 'apex', 'visualforce': 'vf', 'lwc': 'js'}
+
+
+def detect_ast_format(file_path, data):
+    """
+    判断 AST 文件类型
+    
+    Returns:
+        'js-json'（js_ast_parser.js 的 JSON 输出）、'js'（Babel XML）、'vf'（PMD Visualforce XML）
+        或 'apex'（PMD Apex XML）
+    
+    按文件名和所在的组件类型目录判断；不在组件类型目录下的 XML 文件（如手动指定的路径）
+    才检查文件开头
+    """
+    if is_json_ast(file_path):
+        return 'js-json'
+    ast_format = _COMPONENT_DIR_FORMATS.get(Path(file_path).parent.name)
+    if ast_format:
+        return ast_format
+    head = data[:1000]
+    if b'<JavaScriptFile' in head:
+        return 'js'
+    return 'vf' if b'<CompilationUnit' in head else 'apex'
+
 
 class ASTImportService:
     """AST导入服务"""
     
     def __init__(self):
         self.graph_service = unified_graph_service
+        # 小写类名 -> 类节点ID，及构建时图的节点数（节点数变化后重建），见 _find_class_node
+        self._class_ids = {}
+        self._class_ids_size = -1
     
-    def import_ast_file(self, file_path, repository=None, source_code_path=None):
+    def import_ast_file(self, file_path, repository=None, source_code_path=None, pending_calls=None):
         """
         导入单个AST文件到图数据库
         
@@ -26,34 +59,55 @@ class ASTImportService:
             file_path: AST文件路径
             repository: Repository对象或None
             source_code_path: 源代码文件路径（可选）
+            pending_calls: 收集等待解析的方法调用的字典，导入完一批文件后传给 resolve_method_calls；
+                           未指定时导入后立即解析该文件的方法调用（结果中的 calls）
         """
+        # 单个文件的节点/关系修改（包括删除已不存在的方法）只写一次实体/关系文件，
+        # 已在外层批量写入中时合并到外层
+        with self.graph_service.batch():
+            return self._import_file(file_path, repository, source_code_path, pending_calls)
+    
+    def _import_file(self, file_path, repository, source_code_path, pending_calls):
+        """导入单个AST文件（见 import_ast_file）"""
+        resolve_now = pending_calls is None
+        if resolve_now:
+            pending_calls = {}
         try:
             file_path_obj = Path(file_path)
             
-            # 检查是否是JavaScript AST（Babel生成的）
-            is_javascript = False
-            try:
-                # 读取文件前几行来判断类型
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read(1000)  # 读取前1000个字符
-                    if '<JavaScriptFile' in content:
-                        is_javascript = True
-            except:
-                pass
+            # 读取文件内容（文件可能已打包），解析结果按内容哈希缓存
+            data = read_entry(file_path)
+            if data is None:
+                raise FileNotFoundError(f'AST file not found: {file_path}')
+            
+            ast_format = detect_ast_format(file_path, data)
             
             # 根据文件类型选择解析器
-            if is_javascript:
+            if ast_format == 'js-json':
+                # JSON 直接加载，不需要解析结果缓存
+                logger.info(f"Loading JavaScript AST JSON: {file_path}")
+                ast_data = parse_js_ast_file(file_path, data)
+                return self._import_js_component(ast_data, file_path, repository, source_code_path)
+            elif ast_format == 'js':
                 logger.info(f"Parsing JavaScript AST file: {file_path}")
-                ast_data = parse_js_ast_file(file_path)
+                ast_data = ir_cache.parse('js', data, lambda: parse_js_ast_file(file_path, data))
                 # JavaScript组件导入
                 return self._import_js_component(ast_data, file_path, repository, source_code_path)
+            elif ast_format == 'vf':
+                logger.info(f"Parsing Visualforce AST file: {file_path}")
+                ast_data = ir_cache.parse('vf', data, lambda: parse_vf_ast_file(file_path, data))
+                return self._import_vf_page(ast_data, repository)
             else:
                 # Apex AST文件
                 logger.info(f"Parsing Apex AST file: {file_path}")
-                ast_data = parse_ast_file(file_path)
+                ast_data = ir_cache.parse('apex', data, lambda: parse_ast_file(file_path, data))
+                is_trigger = ast_data.get('kind') == 'trigger'
                 # 导入到图数据库（自动选择 Neo4j 或本地）
                 logger.info(f"Importing to graph database: {ast_data['name']}")
-                self._import_to_graph(ast_data, repository)
+                if is_trigger:
+                    self._import_trigger(ast_data, repository, pending_calls)
+                else:
+                    self._import_to_graph(ast_data, repository, pending_calls)
                 
                 # 记录到数据库
                 defaults = {
@@ -78,7 +132,7 @@ class ASTImportService:
                         defaults=defaults
                     )
                 
-                return {
+                result = {
                     'success': True,
                     'class_name': ast_data['name'],
                     'methods_count': len(ast_data['methods']),
@@ -86,6 +140,11 @@ class ASTImportService:
                     'backend': self.graph_service.backend_type,
                     'repository': repository.name if repository else None,
                 }
+                if is_trigger:
+                    result['component_type'] = 'ApexTrigger'
+                if resolve_now:
+                    result['calls'] = self.resolve_method_calls(repository, pending_calls)
+                return result
             
         except Exception as e:
             logger.error(f"Failed to import AST file {file_path}: {e}")
@@ -105,8 +164,9 @@ class ASTImportService:
         directory = Path(directory_path)
         results = []
         
-        # 检查目录是否存在
-        if not directory.exists():
+        # 检查目录是否存在（目录已打包时只存在 <目录>.pack）
+        packed = is_packed(directory) or directory.suffix == PACK_SUFFIX
+        if not directory.exists() and not packed:
             logger.error(f"Directory does not exist: {directory}")
             return {
                 'total': 0,
@@ -116,7 +176,7 @@ class ASTImportService:
                 'results': [],
             }
         
-        if not directory.is_dir():
+        if not directory.is_dir() and not packed:
             logger.error(f"Path is not a directory: {directory}")
             return {
                 'total': 0,
@@ -126,9 +186,12 @@ class ASTImportService:
                 'results': [],
             }
         
-        # 查找所有AST文件（只导入XML格式）
+        # 查找所有AST文件（XML 和 JSON 格式，包括包内条目）；同一组件两种格式都存在时只导入 JSON
         try:
-            ast_files = list(directory.glob('*_ast.xml'))
+            json_files = list_entries(directory, '_ast.json')
+            json_names = {f.name[:-len('.json')] for f in json_files}
+            ast_files = [f for f in list_entries(directory, '_ast.xml') if f.name[:-len('.xml')] not in json_names]
+            ast_files += json_files
         except Exception as e:
             logger.error(f"Failed to list files in {directory}: {e}")
             return {
@@ -141,25 +204,34 @@ class ASTImportService:
         
         logger.info(f"Found {len(ast_files)} AST files in {directory}")
         
-        for ast_file in ast_files:
-            result = self.import_ast_file(str(ast_file), repository)
-            result['filename'] = ast_file.name
-            results.append(result)
+        # 整个目录只读写一次实体/关系文件；等待解析的方法调用只属于本次导入，
+        # 同一服务实例上并发的导入互不影响
+        pending_calls = {}
+        with unified_graph_service.batch():
+            for ast_file in ast_files:
+                result = self.import_ast_file(str(ast_file), repository, pending_calls=pending_calls)
+                result['filename'] = ast_file.name
+                results.append(result)
+            
+            # 所有类导入完成后统一解析方法调用
+            call_summary = self.resolve_method_calls(repository, pending_calls)
         
         return {
             'total': len(results),
             'successful': len([r for r in results if r['success']]),
             'failed': len([r for r in results if not r['success']]),
+            'calls': call_summary,
             'results': results,
         }
     
-    def _import_to_graph(self, ast_data, repository=None):
+    def _import_to_graph(self, ast_data, repository=None, pending_calls=None):
         """
         将AST数据导入到图数据库
         
         Args:
             ast_data: AST数据
             repository: Repository对象或None
+            pending_calls: 收集等待解析的方法调用的字典（见 import_ast_file）
         """
         # 创建类节点
         class_data = {
@@ -176,14 +248,191 @@ class ASTImportService:
             class_data['repository'] = repository.name
             class_data['repositoryId'] = repository.id
         
+        # 记录重新导入前该类拥有的节点，用于清理已删除的方法/SOQL/DML
+        class_node_id = f"class:{ast_data['name']}"
+        previous_nodes = self._owned_nodes(class_node_id)
+        
         # 使用统一服务创建类节点
         self.graph_service.create_class_node(class_data)
         
+        # 重载方法共用一个节点，汇总各重载的参数个数
+        overloads = {}
+        for method in ast_data['methods']:
+            overloads.setdefault(method['name'], []).append(method['arity'])
+        
         # 创建方法节点和关系
+        current_nodes = set()
+        method_calls = {}
         for method in ast_data['methods']:
-            self._import_method(ast_data['name'], method, repository)
+            created_nodes = self._import_method(ast_data['name'], method, repository, overloads[method['name']])
+            current_nodes.update(created_nodes)
+            method_calls.setdefault(created_nodes[0], []).extend(method.get('method_calls', []))
+        
+        # 方法调用等该仓库的所有类导入后再解析（见 resolve_method_calls）
+        pending = pending_calls if pending_calls is not None else {}
+        for method_node_id, calls in method_calls.items():
+            pending[method_node_id] = (ast_data['name'], calls)
+        
+        # 删除源代码中已不存在的节点
+        for node_id in previous_nodes - current_nodes:
+            pending.pop(node_id, None)
+            self.graph_service.local_service.remove_node(node_id)
+    
+    def _import_trigger(self, ast_data, repository=None, pending_calls=None):
+        """
+        将触发器导入到图数据库：ApexTrigger 节点、触发器体中的 SOQL/DML 节点，
+        方法调用与类的方法调用一起在 resolve_method_calls 中解析
+        
+        Args:
+            ast_data: 触发器 AST 数据（见 ASTParser._extract_trigger_info）
+            repository: Repository对象或None
+            pending_calls: 收集等待解析的方法调用的字典（见 import_ast_file）
+        """
+        trigger_name = ast_data['name']
+        trigger_node_id = f"trigger:{trigger_name}"
+        previous_nodes = self._owned_nodes(trigger_node_id)
+        
+        if self.graph_service.use_local:
+            trigger_attrs = {
+                'type': 'ApexTrigger',
+                'name': trigger_name,
+                'sObject': ast_data.get('sObject', ''),
+                'events': ast_data.get('events', []),
+                'fileName': ast_data['fileName'],
+            }
+            
+            # 添加仓库信息
+            if repository:
+                trigger_attrs['repository'] = repository.name
+                trigger_attrs['repositoryId'] = repository.id
+            
+            self.graph_service.local_service.add_node(trigger_node_id, trigger_attrs)
+        
+        current_nodes = set(self._import_queries(
+            trigger_node_id, trigger_name, {'triggerName': trigger_name}, ast_data, repository
+        ))
+        
+        # 方法调用等该仓库的所有类导入后再解析（见 resolve_method_calls）；
+        # 触发器不能声明方法，只解析 Class.method 形式的调用
+        if pending_calls is not None:
+            pending_calls[trigger_node_id] = ('', ast_data.get('method_calls', []))
+        
+        # 删除源代码中已不存在的 SOQL/DML 节点
+        for node_id in previous_nodes - current_nodes:
+            self.graph_service.local_service.remove_node(node_id)
+    
+    def resolve_method_calls(self, repository=None, pending_calls=None):
+        """
+        解析已导入方法的调用关系，创建方法之间的 CALLS 关系
+        应在一个仓库的所有类导入完成后调用一次
+        
+        Args:
+            repository: Repository对象或None
+            pending_calls: 本次导入收集的等待解析的方法调用 {方法节点ID: (类名, 调用列表)}，
+                           见 import_ast_file；为空时只重试之前未解析的调用
+        
+        Returns:
+            解析统计：{'resolved': 关系数, 'unresolved': 未解析调用数,
+                       'retry_resolved': 其他方法之前未解析、本次解析成功的调用数}
+            resolved / unresolved 只统计本次导入的方法和触发器的调用
+        """
+        repo_name = repository.name if repository else None
+        pending = pending_calls or {}
+        summary = {'resolved': 0, 'unresolved': 0, 'retry_resolved': 0}
+        if not self.graph_service.use_local:
+            return summary
+        
+        local_service = self.graph_service.local_service
+        graph = local_service.graph
+        
+        # 一次性构建符号索引，避免每个调用都搜索图
+        index = MethodSymbolIndex.from_graph(graph, repo_name)
+        
+        # 其他方法之前未解析的调用，可能因为新导入的类而变得可解析
+        retries = {}
+        for node_id, data in graph.nodes(data=True):
+            if node_id in pending or not data.get('unresolvedCalls'):
+                continue
+            if data.get('repository') != repo_name:
+                continue
+            retries[node_id] = (data.get('className', ''), [parse_call_key(key) for key in data['unresolvedCalls']])
+        
+        if not pending and not retries:
+            return summary
+        
+        relationships = []
+        attribute_updates = {}
+        for callers in (pending, retries):
+            for caller_id, (class_name, calls) in callers.items():
+                if caller_id not in graph:
+                    continue
+                
+                targets = {}
+                unresolved = set()
+                for call in calls:
+                    target_id = index.resolve(class_name, call)
+                    if target_id:
+                        targets[target_id] = call.get('arity')
+                    else:
+                        unresolved.add(call_key(call.get('fullMethodName', ''), call.get('arity')))
+                
+                for target_id, arity in targets.items():
+                    relationships.append((caller_id, target_id, 'CALLS', {'arity': arity}))
+                if callers is pending:
+                    summary['resolved'] += len(targets)
+                    summary['unresolved'] += len(unresolved)
+                else:
+                    summary['retry_resolved'] += len(targets)
+                
+                # 未解析的调用以紧凑字符串记录在调用方节点上
+                unresolved = sorted(unresolved) or None
+                if unresolved != graph.nodes[caller_id].get('unresolvedCalls'):
+                    attribute_updates[caller_id] = {'unresolvedCalls': unresolved}
+        
+        # 重新导入的方法先清除旧的调用关系
+        local_service.remove_relationships(pending.keys(), 'CALLS')
+        local_service.create_relationships(relationships)
+        local_service.update_node_attributes(attribute_updates)
+        
+        logger.info(
+            f"Resolved {summary['resolved']} method calls, {summary['unresolved']} unresolved, "
+            f"{summary['retry_resolved']} previously unresolved calls resolved"
+        )
+        return summary
+    
+    def _owned_nodes(self, class_node_id):
+        """
+        获取类拥有的方法节点及方法下的SOQL/DML节点（触发器为触发器体中的SOQL/DML节点）
+        
+        Args:
+            class_node_id: 类节点ID或触发器节点ID
+        
+        Returns:
+            节点ID集合
+        """
+        owned = set()
+        if not self.graph_service.use_local:
+            return owned
+        
+        graph = self.graph_service.local_service.graph
+        if class_node_id not in graph:
+            return owned
+        
+        for method_node_id, edges in graph[class_node_id].items():
+            # 触发器直接拥有 SOQL/DML 节点
+            if 'CONTAINS_SOQL' in edges or 'CONTAINS_DML' in edges:
+                owned.add(method_node_id)
+                continue
+            if 'HAS_METHOD' not in edges:
+                continue
+            owned.add(method_node_id)
+            for child_node_id, child_edges in graph[method_node_id].items():
+                if 'CONTAINS_SOQL' in child_edges or 'CONTAINS_DML' in child_edges:
+                    owned.add(child_node_id)
+        
+        return owned
     
-    def _import_method(self, class_name, method_data, repository=None):
+    def _import_method(self, class_name, method_data, repository=None, arities=None):
         """
         导入方法及其相关信息
         
@@ -191,6 +440,10 @@ class ASTImportService:
             class_name: 类名
             method_data: 方法数据
             repository: Repository对象或None
+            arities: 同名重载方法的参数个数列表
+        
+        Returns:
+            创建的方法、SOQL、DML节点ID列表
         """
         # 创建方法节点
         method_node_data = {
@@ -199,9 +452,11 @@ class ASTImportService:
             'name': method_data['name'],
             'returnType': method_data['returnType'],
             'arity': method_data['arity'],
+            'arities': arities or [method_data['arity']],
             'public': method_data['public'],
             'static': method_data['static'],
             'constructor': method_data['constructor'],
+            'annotations': method_data.get('annotations', []),
         }
         
         # 添加仓库信息
@@ -215,6 +470,7 @@ class ASTImportService:
         # 创建类和方法的关系
         class_node_id = f"class:{class_name}"
         method_node_id = f"method:{method_node_data['canonicalName']}"
+        created_nodes = [method_node_id]
         self.graph_service.create_relationship(
             class_node_id,
             method_node_id,
@@ -222,9 +478,36 @@ class ASTImportService:
             {'description': 'Class contains method'}
         )
         
+        created_nodes += self._import_queries(
+            method_node_id,
+            f"{class_name}.{method_data['name']}",
+            {'className': class_name, 'methodName': method_data['name']},
+            method_data,
+            repository
+        )
+        
+        return created_nodes
+    
+    def _import_queries(self, owner_node_id, id_prefix, owner_attrs, data, repository=None):
+        """
+        导入方法（或触发器体）中的SOQL查询和DML操作
+        
+        Args:
+            owner_node_id: 所属方法/触发器节点ID
+            id_prefix: SOQL/DML节点ID前缀
+            owner_attrs: 写入SOQL/DML节点的所属信息（className/methodName 或 triggerName）
+            data: 包含 soql_queries 和 dml_operations 的解析数据
+            repository: Repository对象或None
+        
+        Returns:
+            创建的SOQL、DML节点ID列表
+        """
+        created_nodes = []
+        
         # 导入SOQL查询
-        for idx, soql in enumerate(method_data.get('soql_queries', [])):
-            soql_node_id = f"soql:{class_name}.{method_data['name']}.{idx}"
+        for idx, soql in enumerate(data.get('soql_queries', [])):
+            soql_node_id = f"soql:{id_prefix}.{idx}"
+            created_nodes.append(soql_node_id)
             
             # 创建SOQL节点（在本地图中）
             if self.graph_service.use_local:
@@ -232,48 +515,57 @@ class ASTImportService:
                     'type': 'SOQLQuery',
                     'query': soql['query'],
                     'canonicalQuery': soql.get('canonicalQuery', soql['query']),
-                    'className': class_name,
-                    'methodName': method_data['name'],
+                    **owner_attrs,
                 }
+                # 解析出的 sObject、字段和子查询
+                soql_attrs.update(soql_node_attributes(soql['query']))
                 
                 # 添加仓库信息
                 if repository:
                     soql_attrs['repository'] = repository.name
                     soql_attrs['repositoryId'] = repository.id
                 
-                self.graph_service.local_service.graph.add_node(soql_node_id, **soql_attrs)
-                self.graph_service.local_service._save_entity(soql_node_id, soql_attrs)
+                self.graph_service.local_service.add_node(soql_node_id, soql_attrs)
             
             # 创建方法和SOQL的关系
             self.graph_service.create_relationship(
-                method_node_id,
+                owner_node_id,
                 soql_node_id,
                 'CONTAINS_SOQL',
                 {'query': soql['query']}
             )
         
         # 导入DML操作
-        for idx, dml in enumerate(method_data.get('dml_operations', [])):
-            dml_node_id = f"dml:{class_name}.{method_data['name']}.{dml['type']}.{idx}"
+        for idx, dml in enumerate(data.get('dml_operations', [])):
+            dml_node_id = f"dml:{id_prefix}.{dml['type']}.{idx}"
+            created_nodes.append(dml_node_id)
             
             # 创建DML节点（在本地图中）
             if self.graph_service.use_local:
                 dml_attrs = {
                     'type': 'DMLOperation',
-                    'className': class_name,
-                    'methodName': method_data['name'],
+                    **owner_attrs,
                     'operationType': dml['type'],
                 }
-                self.graph_service.local_service.graph.add_node(dml_node_id, **dml_attrs)
-                self.graph_service.local_service._save_entity(dml_node_id, dml_attrs)
+                if dml.get('sObject'):
+                    dml_attrs['sObject'] = dml['sObject']
+                
+                # 添加仓库信息
+                if repository:
+                    dml_attrs['repository'] = repository.name
+                    dml_attrs['repositoryId'] = repository.id
+                
+                self.graph_service.local_service.add_node(dml_node_id, dml_attrs)
             
             # 创建方法和DML的关系
             self.graph_service.create_relationship(
-                method_node_id,
+                owner_node_id,
                 dml_node_id,
                 'CONTAINS_DML',
                 {'operationType': dml['type']}
             )
+        
+        return created_nodes
     
     def _import_js_component(self, ast_data, file_path, repository=None, source_code_path=None):
         """
@@ -313,8 +605,7 @@ class ASTImportService:
                     component_attrs['repository'] = repository.name
                     component_attrs['repositoryId'] = repository.id
                 
-                self.graph_service.local_service.graph.add_node(component_node_id, **component_attrs)
-                self.graph_service.local_service._save_entity(component_node_id, component_attrs)
+                self.graph_service.local_service.add_node(component_node_id, component_attrs)
             
             # 导入imports（依赖关系）
             for import_item in ast_data.get('imports', []):
@@ -343,8 +634,7 @@ class ASTImportService:
                                 dep_attrs['repository'] = repository.name
                                 dep_attrs['repositoryId'] = repository.id
                             
-                            self.graph_service.local_service.graph.add_node(dep_node_id, **dep_attrs)
-                            self.graph_service.local_service._save_entity(dep_node_id, dep_attrs)
+                            self.graph_service.local_service.add_node(dep_node_id, dep_attrs)
                         
                         # 创建组件到依赖的关系
                         self.graph_service.create_relationship(
@@ -375,8 +665,7 @@ class ASTImportService:
                         class_attrs['repository'] = repository.name
                         class_attrs['repositoryId'] = repository.id
                     
-                    self.graph_service.local_service.graph.add_node(class_node_id, **class_attrs)
-                    self.graph_service.local_service._save_entity(class_node_id, class_attrs)
+                    self.graph_service.local_service.add_node(class_node_id, class_attrs)
                 
                 # 创建组件到类的关系
                 self.graph_service.create_relationship(
@@ -409,8 +698,7 @@ class ASTImportService:
                         func_attrs['repository'] = repository.name
                         func_attrs['repositoryId'] = repository.id
                     
-                    self.graph_service.local_service.graph.add_node(func_node_id, **func_attrs)
-                    self.graph_service.local_service._save_entity(func_node_id, func_attrs)
+                    self.graph_service.local_service.add_node(func_node_id, func_attrs)
                 
                 # 创建组件到函数的关系
                 self.graph_service.create_relationship(
@@ -494,8 +782,7 @@ class ASTImportService:
                 method_attrs['repository'] = repository.name
                 method_attrs['repositoryId'] = repository.id
             
-            self.graph_service.local_service.graph.add_node(method_node_id, **method_attrs)
-            self.graph_service.local_service._save_entity(method_node_id, method_attrs)
+            self.graph_service.local_service.add_node(method_node_id, method_attrs)
         
         # 创建类到方法的关系
         class_node_id = f"jsclass:{component_name}.{class_name}"
@@ -509,6 +796,147 @@ class ASTImportService:
             }
         )
     
+    def _import_vf_page(self, ast_data, repository=None):
+        """
+        导入Visualforce页面到图数据库
+        
+        创建 VisualforcePage 节点，连接 controller / extensions 类，
+        表达式引用解析为控制器方法（REFERENCES_APEX_METHOD）；页面的所有关系一次性批量写入。
+        控制器类应在页面之前导入。页面不记录到 ASTFile（ASTFile 按类名查找 Apex 源代码）
+        
+        Args:
+            ast_data: Visualforce AST数据（见 vf_ast_parser）
+            repository: Repository对象或None
+        """
+        try:
+            page_name = ast_data['name']
+            page_node_id = f"vfpage:{page_name}"
+            controller = ast_data.get('controller')
+            extensions = ast_data.get('extensions', [])
+            references = 0
+            created = False
+            
+            if self.graph_service.use_local:
+                local_service = self.graph_service.local_service
+                graph = local_service.graph
+                
+                page_attrs = {
+                    'type': 'VisualforcePage',
+                    'name': page_name,
+                    'pageType': ast_data.get('kind', 'page'),
+                    'controller': controller,
+                    'standardController': ast_data.get('standardController'),
+                    'extensions': extensions,
+                    'components': sorted(ast_data.get('components', {})),
+                    'fileName': ast_data['fileName'],
+                }
+                
+                # 添加仓库信息
+                if repository:
+                    page_attrs['repository'] = repository.name
+                    page_attrs['repositoryId'] = repository.id
+                
+                created = page_node_id not in graph
+                local_service.add_node(page_node_id, page_attrs)
+                
+                # controller / extensions 不区分大小写
+                relationships = []
+                for rel_type, class_names in (('USES_CONTROLLER', [controller] if controller else []),
+                                              ('USES_EXTENSION', extensions)):
+                    for class_name in class_names:
+                        class_node_id = self._find_class_node(class_name)
+                        if class_node_id:
+                            relationships.append((page_node_id, class_node_id, rel_type, {'className': class_name}))
+                
+                # 扩展优先于控制器（与 Visualforce 的解析顺序一致）
+                controllers = extensions + ([controller] if controller else [])
+                index = self._controller_index(controllers)
+                targets = {}
+                for chain in ast_data.get('references', []):
+                    target_id = self._resolve_vf_reference(index, controllers, chain)
+                    if target_id and target_id not in targets:
+                        targets[target_id] = '.'.join(chain)
+                for target_id, expression in targets.items():
+                    relationships.append((page_node_id, target_id, 'REFERENCES_APEX_METHOD', {'expression': expression}))
+                references = len(targets)
+                
+                # 重新导入时先清除页面原有的关系
+                for rel_type in ('USES_CONTROLLER', 'USES_EXTENSION', 'REFERENCES_APEX_METHOD'):
+                    local_service.remove_relationships([page_node_id], rel_type)
+                local_service.create_relationships(relationships)
+            
+            return {
+                'success': True,
+                'class_name': page_name,
+                'methods_count': 0,
+                'apex_references': references,
+                'created': created,
+                'backend': self.graph_service.backend_type,
+                'repository': repository.name if repository else None,
+                'component_type': 'VisualforcePage',
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to import Visualforce page: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+            }
+    
+    def _find_class_node(self, class_name):
+        """
+        按类名查找类节点ID（不区分大小写），找不到时返回 None
+        大小写一致时直接命中；否则使用小写类名表，图的节点数变化后才重新扫描
+        """
+        graph = self.graph_service.local_service.graph
+        class_node_id = f"class:{class_name}"
+        if class_node_id in graph:
+            return class_node_id
+        if self._class_ids_size != graph.number_of_nodes():
+            self._class_ids = {
+                data.get('name', '').lower(): node_id
+                for node_id, data in graph.nodes(data=True)
+                if data.get('type') == 'ApexClass'
+            }
+            self._class_ids_size = graph.number_of_nodes()
+        return self._class_ids.get(class_name.lower())
+    
+    def _controller_index(self, class_names):
+        """控制器类的方法符号索引（只读取这些类的 HAS_METHOD 邻居，不扫描整个图）"""
+        index = MethodSymbolIndex()
+        graph = self.graph_service.local_service.graph
+        for class_name in class_names:
+            class_node_id = self._find_class_node(class_name)
+            if class_node_id is None:
+                continue
+            for method_node_id, edges in graph[class_node_id].items():
+                if 'HAS_METHOD' in edges:
+                    data = graph.nodes[method_node_id]
+                    index.add(class_name, data.get('name', ''), data.get('arity', 0), method_node_id)
+        return index
+    
+    @staticmethod
+    def _resolve_vf_reference(index, controllers, chain):
+        """
+        把表达式引用链解析为控制器方法
+        {!save} -> save() 或 getSave()；{!account.Name} -> getAccount()
+        $Page 等全局变量不解析
+        """
+        first = chain[0]
+        if first.startswith('$'):
+            return None
+        candidates = [first, f'get{first}'] if len(chain) == 1 else [f'get{first}']
+        for controller in controllers:
+            for method_name in candidates:
+                target_id = index.resolve(controller, {
+                    'methodName': method_name,
+                    'fullMethodName': method_name,
+                    'arity': None,
+                })
+                if target_id:
+                    return target_id
+        return None
+    
     def _create_apex_relationships(self, lwc_component_id, apex_dependency, repository=None):
         """
         创建LWC组件到Apex类和方法的关系
@@ -559,8 +987,7 @@ class ASTImportService:
                     placeholder_attrs['repository'] = repository.name
                     placeholder_attrs['repositoryId'] = repository.id
                 
-                self.graph_service.local_service.graph.add_node(apex_class_node_id, **placeholder_attrs)
-                self.graph_service.local_service._save_entity(apex_class_node_id, placeholder_attrs)
+                self.graph_service.local_service.add_node(apex_class_node_id, placeholder_attrs)
                 
                 # 创建关系
                 self.graph_service.create_relationship(
@@ -613,8 +1040,7 @@ class ASTImportService:
                         method_placeholder_attrs['repository'] = repository.name
                         method_placeholder_attrs['repositoryId'] = repository.id
                     
-                    self.graph_service.local_service.graph.add_node(apex_method_node_id, **method_placeholder_attrs)
-                    self.graph_service.local_service._save_entity(apex_method_node_id, method_placeholder_attrs)
+                    self.graph_service.local_service.add_node(apex_method_node_id, method_placeholder_attrs)
                     
                     # 创建关系
                     self.graph_service.create_relationship(
@@ -0,0 +1,178 @@
+"""
+组件清单
+分析完成后把组件（类型、名称、AST 路径、源文件路径、大小、哈希）记录到 ComponentFile 表，
+/files/ 接口直接查询数据库，不再遍历输出目录
+"""
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+import logging
+
+from django.db import transaction
+
+from .models import ComponentFile, Repository
+from .ast_pack import list_entries, open_entry
+
+logger = logging.getLogger(__name__)
+
+COMPONENT_TYPES = ('apex', 'trigger', 'visualforce', 'lwc')
+
+
+def _file_digest(paths: List[Path]) -> tuple:
+    """计算文件的总大小和 SHA-1（多个文件按给定顺序拼接，文件可能已打包）"""
+    digest = hashlib.sha1()
+    size = 0
+    for path in paths:
+        try:
+            with open_entry(path) as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+                    size += len(chunk)
+        except OSError:
+            continue
+    return size, digest.hexdigest() if size else ''
+
+
+def _file_entry(component_type: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Apex 类 / 触发器 / Visualforce 单文件分析结果 -> 清单条目"""
+    ast_file = result.get('output_file')
+    source_file = result.get('source_file')
+    name = Path(ast_file).stem[:-len('_ast')] if ast_file else Path(result.get('file', '')).stem
+    size, sha1 = _file_digest([Path(source_file)]) if source_file else (0, '')
+    return {
+        'component_type': component_type,
+        'name': name,
+        'ast_file': ast_file,
+        'source_file': source_file,
+        'info_file': None,
+        'size': size,
+        'sha1': sha1,
+    }
+
+
+def _lwc_entry(result: Dict[str, Any]) -> Dict[str, Any]:
+    """LWC 组件分析结果 -> 清单条目（大小和哈希覆盖组件目录下的所有文件）"""
+    details = result.get('details', {})
+    source_dir = details.get('source_dir')
+    files = list_entries(source_dir) if source_dir else []
+    size, sha1 = _file_digest(files)
+    return {
+        'component_type': 'lwc',
+        'name': result.get('component') or details.get('name'),
+        'ast_file': details.get('ast_file'),
+        'source_file': details.get('js_source'),
+        'info_file': result.get('info_file'),
+        'size': size,
+        'sha1': sha1,
+    }
+
+
+def inventory_from_analysis(analyze_result: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    从 GitService 的分析结果中提取组件清单
+
+    Args:
+        analyze_result: analyze_all_components 或 analyze_repository 的返回值
+
+    Returns:
+        组件类型 -> 清单条目列表（只包含本次分析过的类型）
+    """
+    if analyze_result.get('file_type') == 'apex':
+        # analyze_repository 的结果中包含触发器
+        sections = {'apex': analyze_result, 'trigger': analyze_result.get('trigger')}
+    else:
+        sections = {t: analyze_result.get(t) for t in COMPONENT_TYPES}
+
+    inventory = {}
+    for component_type, section in sections.items():
+        if not section or not section.get('success'):
+            continue
+        if component_type == 'lwc':
+            entries = [_lwc_entry(r) for r in section.get('analyzed_components', [])]
+        else:
+            entries = [_file_entry(component_type, r) for r in section.get('analyzed_files', [])]
+        inventory[component_type] = entries
+    return inventory
+
+
+def record_inventory(repository, inventory: Dict[str, List[Dict[str, Any]]]) -> int:
+    """
+    用新的清单替换仓库中对应类型的组件记录
+
+    Returns:
+        记录的组件数
+    """
+    count = 0
+    with transaction.atomic():
+        for component_type, entries in inventory.items():
+            ComponentFile.objects.filter(
+                repository=repository,
+                component_type=component_type
+            ).delete()
+            # 同名组件只保留最后一条
+            unique = {entry['name']: entry for entry in entries if entry.get('name')}
+            ComponentFile.objects.bulk_create(
+                ComponentFile(repository=repository, **entry) for entry in unique.values()
+            )
+            count += len(unique)
+        # 不使用 save()，避免更新 updated_at（仓库按 updated_at 排序）
+        Repository.objects.filter(pk=repository.pk).update(inventory_recorded=True)
+        repository.inventory_recorded = True
+    logger.info(f"Recorded {count} components for repository {repository.name}")
+    return count
+
+
+def record_analysis(repository, analyze_result: Optional[Dict[str, Any]]) -> int:
+    """记录一次分析的组件清单，失败不影响分析流程"""
+    if not repository or not analyze_result or not analyze_result.get('success'):
+        return 0
+    try:
+        return record_inventory(repository, inventory_from_analysis(analyze_result))
+    except Exception as e:
+        logger.warning(f"Failed to record component inventory for {repository.name}: {e}")
+        return 0
+
+
+def scan_output_directory(output_dir: Path) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    从已有的分析输出目录重建清单
+    用于升级前已分析、数据库中还没有清单的仓库（只执行一次）
+    """
+    output_dir = Path(output_dir)
+    inventory = {}
+
+    for component_type, suffix in (('apex', '.cls'), ('trigger', '.trigger'), ('visualforce', '.page')):
+        directory = output_dir / component_type
+        if not directory.exists():
+            continue
+        entries = []
+        for xml_file in sorted(directory.glob('*_ast.xml')):
+            source_file = directory / (xml_file.name[:-len('_ast.xml')] + suffix)
+            entries.append(_file_entry(component_type, {
+                'output_file': str(xml_file),
+                'source_file': str(source_file) if source_file.exists() else None,
+            }))
+        inventory[component_type] = entries
+
+    lwc_dir = output_dir / 'lwc'
+    if lwc_dir.exists():
+        entries = []
+        for info_file in sorted(lwc_dir.glob('*_info.json')):
+            comp_name = info_file.name[:-len('_info.json')]
+            ast_file = lwc_dir / f'{comp_name}_ast.json'
+            if not ast_file.exists():
+                ast_file = lwc_dir / f'{comp_name}_ast.xml'
+            js_source = lwc_dir / comp_name / f'{comp_name}.js'
+            source_dir = lwc_dir / comp_name
+            entries.append(_lwc_entry({
+                'component': comp_name,
+                'info_file': str(info_file),
+                'details': {
+                    'ast_file': str(ast_file) if ast_file.exists() else None,
+                    'js_source': str(js_source) if js_source.exists() else None,
+                    'source_dir': str(source_dir) if source_dir.exists() else None,
+                },
+            }))
+        inventory['lwc'] = entries
+
+    return inventory
@@ -0,0 +1,164 @@
+"""
+解析结果缓存（中间表示）
+PMD / Babel 生成的 AST XML 经 ElementTree 解析后得到的 ast_data 按
+(解析器, 解析器版本, AST 文件 SHA-1) 缓存为紧凑的二进制格式，
+重新导入（清空图数据库、迁移、崩溃恢复后）时直接加载，跳过 XML 解析
+
+- 编码优先使用 msgpack，未安装时退回标准库 marshal（ast_data 只包含 dict/list/str/int/bool/None）
+- 解析器版本取解析器模块源代码的哈希，修改解析逻辑后旧缓存自动失效
+- 所有条目保存在一个 SQLite 文件中，避免大量小文件
+"""
+import hashlib
+import marshal
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+import logging
+
+from django.conf import settings
+
+try:
+    import msgpack
+except ImportError:  # msgpack 为可选依赖
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE_NAME = 'ir_cache.sqlite3'
+
+# 各解析器依赖的模块，任一模块修改后该解析器的缓存失效
+PARSER_MODULES = {
+    'apex': ('ast_parser.py', 'soql_parser.py'),
+    'js': ('js_ast_parser.py',),
+    'vf': ('vf_ast_parser.py',),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ir (
+    key TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    data BLOB NOT NULL
+) WITHOUT ROWID
+"""
+
+
+def _parser_versions() -> Dict[str, str]:
+    module_dir = Path(__file__).parent
+    versions = {}
+    for parser, modules in PARSER_MODULES.items():
+        digest = hashlib.sha1()
+        for module in modules:
+            digest.update((module_dir / module).read_bytes())
+        versions[parser] = digest.hexdigest()[:12]
+    return versions
+
+
+def encode(value: Any) -> tuple:
+    """编码为 (编解码器名, 字节串)"""
+    if msgpack is not None:
+        return 'msgpack', msgpack.packb(value, use_bin_type=True)
+    return 'marshal', marshal.dumps(value)
+
+
+def decode(codec: str, data: bytes) -> Any:
+    """解码，当前环境不支持该编解码器时返回 None"""
+    if codec == 'msgpack':
+        if msgpack is None:
+            return None
+        return msgpack.unpackb(data, raw=False)
+    if codec == 'marshal':
+        return marshal.loads(data)
+    return None
+
+
+class IRCache:
+    """解析结果缓存"""
+
+    def __init__(self, cache_dir):
+        self.path = Path(cache_dir) / CACHE_FILE_NAME
+        self.versions = _parser_versions()
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """每个线程一个连接；缓存目录不可用时返回 None（不影响导入）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self.path, timeout=10)
+                conn.execute('PRAGMA journal_mode = WAL')
+                conn.execute('PRAGMA synchronous = NORMAL')
+                conn.execute(_SCHEMA)
+                conn.commit()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"IR cache unavailable at {self.path}: {e}")
+                return None
+            self._local.conn = conn
+        return conn
+
+    def key(self, parser: str, data: bytes) -> str:
+        return f'{parser}:{self.versions[parser]}:{hashlib.sha1(data).hexdigest()}'
+
+    def get(self, key: str) -> Optional[Any]:
+        conn = self._connection()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute('SELECT codec, data FROM ir WHERE key = ?', (key,)).fetchone()
+            return decode(*row) if row else None
+        except Exception as e:
+            logger.warning(f"Failed to read IR cache entry {key}: {e}")
+            return None
+
+    def put(self, key: str, value: Any):
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            codec, data = encode(value)
+            conn.execute('INSERT OR REPLACE INTO ir VALUES (?, ?, ?)', (key, codec, data))
+            conn.commit()
+        except Exception as e:
+            logger.warning(f"Failed to write IR cache entry {key}: {e}")
+
+    def parse(self, parser: str, data: bytes, parse_func: Callable[[], Any]) -> Any:
+        """
+        返回 AST 文件的解析结果，命中缓存时不解析 XML
+
+        Args:
+            parser: 解析器名（'apex'、'js' 或 'vf'）
+            data: AST 文件内容
+            parse_func: 未命中时调用的解析函数
+        """
+        key = self.key(parser, data)
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = parse_func()
+        self.put(key, value)
+        return value
+
+    def clear(self):
+        """删除所有缓存条目"""
+        conn = self._connection()
+        if conn is not None:
+            conn.execute('DELETE FROM ir')
+            conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        return {
+            'codec': 'msgpack' if msgpack is not None else 'marshal',
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+# 全局缓存实例
+ir_cache = IRCache(settings.IR_CACHE_DIR)
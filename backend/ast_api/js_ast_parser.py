@@ -1,19 +1,161 @@
 """
 JavaScript AST Parser
-Parse Babel-generated JavaScript AST XML files
+Parse Babel-generated JavaScript AST files (js_ast_parser.js):
+- XML (<name>_ast.xml), parsed with ElementTree
+- JSON (<name>_ast.json) and NDJSON batch output, loaded directly without building an XML tree
 """
 import xml.etree.ElementTree as ET
 from pathlib import Path
+import io
+import json
 import logging
 
+from .ast_pack import open_entry, read_entry
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Suffixes of the JSON output of js_ast_parser.js
+JSON_SUFFIX = '.json'
+NDJSON_SUFFIX = '.ndjson'
+
+
+def _loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def is_json_ast(file_path):
+    """Whether the AST file is JSON output (decided by the file name only)"""
+    return Path(file_path).suffix in (JSON_SUFFIX, NDJSON_SUFFIX)
+
+
+def parse_apex_import(source, specifiers):
+    """
+    解析Apex导入，提取类名和方法名
+    例如: '@salesforce/apex/PropertyController.getPagedPropertyList'
+    """
+    apex_info = {
+        'type': 'apex',
+        'class_name': None,
+        'method_name': None,
+        'full_path': source
+    }
+    
+    # 移除 @salesforce/apex/ 前缀
+    apex_path = source.replace('@salesforce/apex/', '')
+    
+    # 解析类名和方法名
+    if '.' in apex_path:
+        parts = apex_path.split('.')
+        apex_info['class_name'] = parts[0]
+        if len(parts) > 1:
+            apex_info['method_name'] = parts[1]
+    else:
+        apex_info['class_name'] = apex_path
+    
+    return apex_info
+
+
+def component_from_json(document, file_name):
+    """
+    Convert one JSON document written by js_ast_parser.js into component data
+    (same layout as JavaScriptASTParser.parse)
+    
+    Args:
+        document: Decoded JSON document
+        file_name: AST file name recorded as fileName
+    """
+    imports = []
+    for imp in document.get('imports', []):
+        source = imp.get('source', '')
+        # 使用local名称（如果不同）或imported名称
+        specifiers = [
+            name for name in (spec.get('local') or spec.get('imported') for spec in imp.get('specifiers', []))
+            if name
+        ]
+        import_info = {'source': source, 'specifiers': specifiers}
+        # 检测Apex依赖关系
+        if source.startswith('@salesforce/apex/'):
+            import_info['apex_dependency'] = parse_apex_import(source, specifiers)
+        imports.append(import_info)
+    
+    classes = []
+    for cls in document.get('classes', []):
+        classes.append({
+            'name': cls.get('name') or '',
+            'superClass': cls.get('superClass') or '',
+            'properties': [
+                {'name': prop.get('name') or '', 'static': bool(prop.get('static'))}
+                for prop in cls.get('properties') or []
+            ],
+            'methods': [
+                {
+                    'name': method.get('name') or '',
+                    'kind': method.get('kind') or 'method',
+                    'async': bool(method.get('async')),
+                    'static': bool(method.get('static')),
+                    'parameters': list(method.get('params') or []),
+                }
+                for method in cls.get('methods', [])
+            ],
+        })
+    
+    return {
+        'name': (document.get('name') or 'Unknown').replace('.js', ''),
+        'type': 'LWCComponent',
+        'fileName': file_name,
+        'imports': imports,
+        'exports': [
+            {'type': exp.get('type') or '', 'name': exp.get('name') or ''}
+            for exp in document.get('exports', [])
+        ],
+        'classes': classes,
+        'functions': [
+            {
+                'name': func.get('name') or '',
+                'async': bool(func.get('async')),
+                'parameters': list(func.get('params') or []),
+            }
+            for func in document.get('functions', [])
+        ],
+    }
+
+
+def iter_js_ast_ndjson(data):
+    """
+    Iterate over NDJSON batch output of js_ast_parser.js
+    
+    Args:
+        data: NDJSON content (bytes or str)
+    
+    Yields:
+        (source file path, component data or None, error message or None)
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        document = _loads(line)
+        source_file = document.get('file', '')
+        if 'error' in document:
+            yield source_file, None, document['error']
+            continue
+        file_name = f"{Path(source_file).stem}_ast{JSON_SUFFIX}"
+        yield source_file, component_from_json(document, file_name), None
+
 
 class JavaScriptASTParser:
     """JavaScript AST XML Parser"""
     
-    def __init__(self, ast_file_path):
+    def __init__(self, ast_file_path, data=None):
         self.file_path = Path(ast_file_path)
+        # Raw file content already read by the caller (optional)
+        self.data = data
         self.tree = None
         self.root = None
         self.component_data = {}
@@ -21,7 +163,10 @@ class JavaScriptASTParser:
     def parse(self):
         """Parse JavaScript AST file"""
         try:
-            self.tree = ET.parse(self.file_path)
+            # The file may live inside a packed archive (see ast_pack)
+            source = io.BytesIO(self.data) if self.data is not None else open_entry(self.file_path)
+            with source as f:
+                self.tree = ET.parse(f)
             self.root = self.tree.getroot()
             
             # Extract component info
@@ -84,30 +229,8 @@ class JavaScriptASTParser:
         return imports
     
     def _parse_apex_import(self, source, specifiers):
-        """
-        解析Apex导入，提取类名和方法名
-        例如: '@salesforce/apex/PropertyController.getPagedPropertyList'
-        """
-        apex_info = {
-            'type': 'apex',
-            'class_name': None,
-            'method_name': None,
-            'full_path': source
-        }
-        
-        # 移除 @salesforce/apex/ 前缀
-        apex_path = source.replace('@salesforce/apex/', '')
-        
-        # 解析类名和方法名
-        if '.' in apex_path:
-            parts = apex_path.split('.')
-            apex_info['class_name'] = parts[0]
-            if len(parts) > 1:
-                apex_info['method_name'] = parts[1]
-        else:
-            apex_info['class_name'] = apex_path
-        
-        return apex_info
+        """解析Apex导入，提取类名和方法名"""
+        return parse_apex_import(source, specifiers)
     
     def _extract_exports(self):
         """Extract export statements"""
@@ -194,15 +317,23 @@ class JavaScriptASTParser:
         return functions
 
 
-def parse_js_ast_file(file_path):
+def parse_js_ast_file(file_path, data=None):
     """
-    Parse JavaScript AST XML file
+    Parse JavaScript AST file (XML, or JSON when the file name ends with .json)
     
     Args:
-        file_path: Path to JavaScript AST XML file
+        file_path: Path to JavaScript AST file
+        data: Raw file content already read by the caller (optional)
         
     Returns:
         Dictionary containing parsed component data
     """
-    parser = JavaScriptASTParser(file_path)
+    if Path(file_path).suffix == JSON_SUFFIX:
+        if data is None:
+            data = read_entry(file_path)
+            if data is None:
+                raise FileNotFoundError(f'JavaScript AST file not found: {file_path}')
+        return component_from_json(_loads(data), Path(file_path).name)
+    
+    parser = JavaScriptASTParser(file_path, data)
     return parser.parse()
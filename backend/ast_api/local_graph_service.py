@@ -6,29 +6,69 @@
 import os
 import json
 import pickle
+import uuid
+from collections import deque
 from pathlib import Path
 from datetime import datetime
 import networkx as nx
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable, Tuple
 import logging
+import threading
+from contextlib import contextmanager
+
+from .display_fields import DISPLAY_FIELDS, with_display_fields
+from .soql_parser import soql_node_attributes
+from .sobject_index import SObjectIndex
+from .search_index import SearchIndex
+from .node_counters import NodeCounters
+from .storage import DataStore, graph_store
 
 logger = logging.getLogger(__name__)
 
+# 变更日志最多保留的变更条数，超出后旧版本的客户端需要全量重新加载
+CHANGE_LOG_SIZE = 20000
+
+# 邻域查询默认返回的最大节点数
+NEIGHBORHOOD_MAX_NODES = 500
+
 
 class LocalGraphService:
     """本地图数据库服务"""
     
-    def __init__(self, graph_data_dir='graphdata'):
+    def __init__(self, graph_data_dir='graphdata', store: Optional[DataStore] = None):
         """
         初始化本地图数据库服务
         
         Args:
-            graph_data_dir: 图数据存储目录
+            graph_data_dir: 图数据存储目录（未指定 store 时使用）
+            store: 图数据文件的存储层，指定时忽略 graph_data_dir
         """
-        self.graph_data_dir = Path(graph_data_dir)
+        self.store = store or DataStore(graph_data_dir)
+        self.graph_data_dir = self.store.root
         self.graph = nx.MultiDiGraph()  # 支持多重有向图
         self.connected = False
         
+        # 图版本与变更日志（用于前端增量同步）
+        # epoch 标识本进程内的图实例，进程重启后客户端的版本号失效
+        self.epoch = uuid.uuid4().hex
+        self.version = 0
+        # 图结构（节点集合和边）的版本，只修改属性时不变，影响分析索引据此失效
+        self.topology_version = 0
+        self.change_log = deque()
+        self._log_floor = 0  # 早于该版本的变更已被丢弃
+        
+        # 批量写入：batch() 期间实体/关系只在内存中修改，退出时各写一次文件
+        self._batch_lock = threading.RLock()
+        self._batch_depth = 0
+        self._batch_data = {}
+        
+        # sObject -> 字段 -> SOQL 节点的倒排索引
+        self.sobject_index = SObjectIndex()
+        # 节点名称/查询文本的搜索索引
+        self.search_index = SearchIndex()
+        # 按类型/仓库的节点计数
+        self.node_counters = NodeCounters()
+        
         # 创建必要的目录结构
         self._init_directories()
         
@@ -45,14 +85,14 @@ class LocalGraphService:
             (self.graph_data_dir / 'graphs').mkdir(exist_ok=True)
             (self.graph_data_dir / 'exports').mkdir(exist_ok=True)
             
-            # 初始化分离的实体和关系文件
-            self.entities_file = self.graph_data_dir / 'entities.json'
-            self.relations_file = self.graph_data_dir / 'relations.json'
+            # 初始化分离的实体和关系文件（相对于存储根目录的文件名）
+            self.entities_file = 'entities.json'
+            self.relations_file = 'relations.json'
             
-            if not self.entities_file.exists():
+            if not self.store.exists(self.entities_file):
                 self._save_entities({})
             
-            if not self.relations_file.exists():
+            if not self.store.exists(self.relations_file):
                 self._save_relations([])
             
             self.connected = True
@@ -64,16 +104,24 @@ class LocalGraphService:
     def _load_graph(self):
         """从文件加载图数据"""
         # 优先尝试从分离的 JSON 文件加载
-        if self.entities_file.exists() and self.relations_file.exists():
+        if self.store.exists(self.entities_file) and self.store.exists(self.relations_file):
             try:
                 entities = self._load_entities()
                 relations = self._load_relations()
                 
                 # 添加所有节点
+                backfilled = 0
                 for node_id, node_info in entities.items():
                     attrs = node_info.get('attributes', {})
+                    # 旧版本图数据没有显示字段和 SOQL 解析结果，加载时一次性补齐
+                    if self._backfill_attributes(attrs):
+                        backfilled += 1
                     self.graph.add_node(node_id, **attrs)
                 
+                if backfilled:
+                    self._save_entities(entities)
+                    logger.info(f"Backfilled derived attributes for {backfilled} nodes")
+                
                 # 添加所有边
                 for relation in relations:
                     from_node = relation.get('from')
@@ -85,27 +133,60 @@ class LocalGraphService:
                         # 避免 type 参数冲突：从 properties 中移除 type 键
                         edge_props = {k: v for k, v in properties.items() if k != 'type'}
                         edge_props['type'] = rel_type
-                        self.graph.add_edge(from_node, to_node, **edge_props)
+                        # 与 create_relationship 一致，使用关系类型作为边的 key
+                        self.graph.add_edge(from_node, to_node, key=rel_type, **edge_props)
                 
+                self._rebuild_indexes()
                 logger.info(f"Loaded graph from separate files with {self.graph.number_of_nodes()} nodes and {self.graph.number_of_edges()} edges")
                 return
             except Exception as e:
                 logger.warning(f"Failed to load graph from separate files: {e}")
         
         # 降级：尝试从 gpickle 文件加载
-        graph_file = self.graph_data_dir / 'graphs' / 'main_graph.gpickle'
-        if graph_file.exists():
+        graph_file = self.store.local_path('graphs/main_graph.gpickle')
+        if graph_file is not None:
             try:
                 self.graph = nx.read_gpickle(graph_file)
+                self._rebuild_indexes()
                 logger.info(f"Loaded graph from pickle with {self.graph.number_of_nodes()} nodes and {self.graph.number_of_edges()} edges")
             except Exception as e:
                 logger.warning(f"Failed to load graph from pickle: {e}, starting with empty graph")
     
+    def _indexes(self):
+        """随节点增量维护的内存索引"""
+        return (self.sobject_index, self.search_index, self.node_counters)
+    
+    def _index_node(self, node_id: str, attributes: Dict[str, Any]):
+        for index in self._indexes():
+            index.index_node(node_id, attributes)
+    
+    def _rebuild_indexes(self):
+        for index in self._indexes():
+            index.rebuild(self.graph)
+    
+    @staticmethod
+    def _backfill_attributes(attrs: Dict[str, Any]) -> bool:
+        """
+        补齐导入时计算的派生属性
+        
+        Returns:
+            是否修改了属性
+        """
+        changed = False
+        if attrs.get('type') == 'SOQLQuery' and 'sObject' not in attrs:
+            attrs.update(soql_node_attributes(attrs.get('query', '')))
+            changed = True
+        if 'displayName' not in attrs:
+            with_display_fields(attrs)
+            changed = True
+        return changed
+    
     def _save_graph(self):
         """保存图数据到文件"""
         try:
             graph_file = self.graph_data_dir / 'graphs' / 'main_graph.gpickle'
             nx.write_gpickle(self.graph, graph_file)
+            self.store.mark_dirty(graph_file)
             logger.info(f"Saved graph with {self.graph.number_of_nodes()} nodes")
         except Exception as e:
             logger.error(f"Failed to save graph: {e}")
@@ -113,6 +194,9 @@ class LocalGraphService:
     def clear_database(self):
         """清空数据库"""
         self.graph.clear()
+        for index in self._indexes():
+            index.clear()
+        self._reset_change_log()
         self._save_graph()
         # 清空分离的数据文件
         self._save_entities({})
@@ -142,11 +226,9 @@ class LocalGraphService:
             'fileName': class_data.get('fileName', ''),
             'created_at': datetime.now().isoformat(),
         }
+        self._copy_repository(class_data, node_attrs)
         
-        self.graph.add_node(node_id, **node_attrs)
-        
-        # 保存实体文件
-        self._save_entity(node_id, node_attrs)
+        self.add_node(node_id, node_attrs)
         
         return {'node_id': node_id, 'attributes': node_attrs}
     
@@ -171,14 +253,168 @@ class LocalGraphService:
             'static': method_data.get('static', False),
             'returnType': method_data.get('returnType', 'void'),
             'arity': method_data.get('arity', 0),
+            # 重载方法共用一个节点，记录所有重载的参数个数
+            'arities': method_data.get('arities', [method_data.get('arity', 0)]),
             'created_at': datetime.now().isoformat(),
         }
+        if method_data.get('annotations'):
+            node_attrs['annotations'] = method_data['annotations']
+        self._copy_repository(method_data, node_attrs)
         
-        self.graph.add_node(node_id, **node_attrs)
-        self._save_entity(node_id, node_attrs)
+        self.add_node(node_id, node_attrs)
         
         return {'node_id': node_id, 'attributes': node_attrs}
     
+    @staticmethod
+    def _copy_repository(data: Dict[str, Any], node_attrs: Dict[str, Any]):
+        """复制仓库信息（按仓库筛选图数据时使用）"""
+        for key in ('repository', 'repositoryId'):
+            if key in data:
+                node_attrs[key] = data[key]
+    
+    def add_node(self, node_id: str, attributes: Dict[str, Any]):
+        """
+        添加或更新节点，并持久化和记录变更
+        
+        Args:
+            node_id: 节点ID
+            attributes: 节点属性（包含 type），会被补充显示字段
+        """
+        existed = node_id in self.graph
+        with_display_fields(attributes)
+        self.graph.add_node(node_id, **attributes)
+        self._index_node(node_id, self.graph.nodes[node_id])
+        self._save_entity(node_id, attributes)
+        self._record_change('node', 'updated' if existed else 'added', node_id)
+    
+    def remove_node(self, node_id: str):
+        """
+        删除节点及其所有关系
+        
+        Args:
+            node_id: 节点ID
+        """
+        if node_id not in self.graph:
+            return
+        
+        # 记录被连带删除的边
+        incident_edges = set()
+        for source, target, key in self.graph.in_edges(node_id, keys=True):
+            incident_edges.add((source, target, key))
+        for source, target, key in self.graph.out_edges(node_id, keys=True):
+            incident_edges.add((source, target, key))
+        
+        self.graph.remove_node(node_id)
+        for index in self._indexes():
+            index.remove_node(node_id)
+        
+        try:
+            entities = self._load_entities()
+            entities.pop(node_id, None)
+            self._save_entities(entities)
+            
+            relations = self._load_relations()
+            relations = [rel for rel in relations if rel['from'] != node_id and rel['to'] != node_id]
+            self._save_relations(relations)
+        except Exception as e:
+            logger.error(f"Failed to remove entity {node_id}: {e}")
+        
+        for edge_key in incident_edges:
+            self._record_change('edge', 'removed', edge_key)
+        self._record_change('node', 'removed', node_id)
+    
+    def _record_change(self, kind: str, op: str, key):
+        """
+        记录一次变更并递增图版本
+        
+        Args:
+            kind: 'node' 或 'edge'
+            op: 'added'、'updated' 或 'removed'
+            key: 节点ID，或边的 (source, target, type)
+        """
+        self.version += 1
+        if op != 'updated':
+            self.topology_version += 1
+        if len(self.change_log) >= CHANGE_LOG_SIZE:
+            dropped = self.change_log.popleft()
+            self._log_floor = dropped[0]
+        self.change_log.append((self.version, kind, op, key))
+    
+    def _reset_change_log(self):
+        """图被整体替换时重置变更日志，所有旧版本的客户端都需要全量重新加载"""
+        self.version += 1
+        self.topology_version += 1
+        self.change_log.clear()
+        self._log_floor = self.version
+    
+    def get_changes_since(self, since: int) -> Optional[Dict[str, Any]]:
+        """
+        获取指定版本之后的变更
+        
+        Args:
+            since: 客户端当前持有的图版本
+        
+        Returns:
+            变更字典；如果变更日志已无法覆盖该版本，返回 None（需要全量重新加载）
+        """
+        version = self.version
+        if since < self._log_floor or since > version:
+            return None
+        
+        # 同一元素多次变更时只保留最后一次
+        node_ops = {}
+        edge_ops = {}
+        for entry_version, kind, op, key in list(self.change_log):
+            if entry_version <= since or entry_version > version:
+                continue
+            if kind == 'node':
+                node_ops[key] = op
+            else:
+                edge_ops[key] = op
+        
+        upserted_nodes = []
+        removed_nodes = []
+        for node_id, op in node_ops.items():
+            if op == 'removed' or node_id not in self.graph:
+                removed_nodes.append(node_id)
+            else:
+                upserted_nodes.append(self._node_to_dict(node_id, self.graph.nodes[node_id]))
+        
+        upserted_edges = []
+        removed_edges = []
+        for (source, target, edge_type), op in edge_ops.items():
+            edge_data = None
+            if op != 'removed' and self.graph.has_edge(source, target, key=edge_type):
+                edge_data = self.graph[source][target][edge_type]
+            if edge_data is None:
+                removed_edges.append({'source': source, 'target': target, 'type': edge_type})
+            else:
+                upserted_edges.append({
+                    'source': source,
+                    'target': target,
+                    'type': edge_type,
+                    **{k: v for k, v in edge_data.items() if k != 'type'}
+                })
+        
+        return {
+            'version': version,
+            'nodes': {'upserted': upserted_nodes, 'removed': removed_nodes},
+            'edges': {'upserted': upserted_edges, 'removed': removed_edges},
+        }
+    
+    @staticmethod
+    def _node_to_dict(node_id: str, node_data: Dict[str, Any]) -> Dict[str, Any]:
+        """转换为统一节点格式，兼容 Neo4j 返回的结构；预先计算的显示字段放在顶层"""
+        node = {
+            'id': node_id,
+            'labels': [node_data.get('type', 'Unknown')],
+            'properties': {k: v for k, v in node_data.items() if k != 'type' and k not in DISPLAY_FIELDS}
+        }
+        for field in DISPLAY_FIELDS:
+            if field in node_data:
+                node[field] = node_data[field]
+        return node
+    
     def create_relationship(self, from_node: str, to_node: str, 
                           rel_type: str, properties: Optional[Dict] = None) -> Dict[str, Any]:
         """
@@ -199,10 +435,12 @@ class LocalGraphService:
         properties['type'] = rel_type
         properties['created_at'] = datetime.now().isoformat()
         
+        existed = self.graph.has_edge(from_node, to_node, key=rel_type)
         self.graph.add_edge(from_node, to_node, key=rel_type, **properties)
         
         # 保存关系文件
         self._save_relation(from_node, to_node, rel_type, properties)
+        self._record_change('edge', 'updated' if existed else 'added', (from_node, to_node, rel_type))
         
         return {
             'from': from_node,
@@ -211,6 +449,109 @@ class LocalGraphService:
             'properties': properties
         }
     
+    def create_relationships(self, relationships: List[Tuple[str, str, str, Dict[str, Any]]]):
+        """
+        批量创建关系，只写一次 relations.json
+        
+        Args:
+            relationships: (起始节点ID, 目标节点ID, 关系类型, 关系属性) 列表
+        """
+        if not relationships:
+            return
+        
+        created_at = datetime.now().isoformat()
+        saved = []
+        for from_node, to_node, rel_type, properties in relationships:
+            properties = dict(properties or {})
+            properties['type'] = rel_type
+            properties['created_at'] = created_at
+            
+            existed = self.graph.has_edge(from_node, to_node, key=rel_type)
+            self.graph.add_edge(from_node, to_node, key=rel_type, **properties)
+            saved.append({'from': from_node, 'to': to_node, 'type': rel_type, 'properties': properties})
+            self._record_change('edge', 'updated' if existed else 'added', (from_node, to_node, rel_type))
+        
+        try:
+            relations = self._load_relations()
+            positions = {(rel['from'], rel['to'], rel['type']): i for i, rel in enumerate(relations)}
+            for relation in saved:
+                key = (relation['from'], relation['to'], relation['type'])
+                if key in positions:
+                    relations[positions[key]] = relation
+                else:
+                    positions[key] = len(relations)
+                    relations.append(relation)
+            self._save_relations(relations)
+        except Exception as e:
+            logger.error(f"Failed to save relations: {e}")
+    
+    def remove_relationships(self, from_nodes: Iterable[str], rel_type: str):
+        """
+        批量删除指定节点发出的某类关系，只写一次 relations.json
+        
+        Args:
+            from_nodes: 起始节点ID
+            rel_type: 关系类型
+        """
+        removed = set()
+        for from_node in from_nodes:
+            if from_node not in self.graph:
+                continue
+            for to_node, edges in list(self.graph.succ[from_node].items()):
+                if rel_type in edges:
+                    self.graph.remove_edge(from_node, to_node, key=rel_type)
+                    removed.add((from_node, to_node, rel_type))
+        
+        if not removed:
+            return
+        
+        try:
+            relations = self._load_relations()
+            relations = [rel for rel in relations if (rel['from'], rel['to'], rel['type']) not in removed]
+            self._save_relations(relations)
+        except Exception as e:
+            logger.error(f"Failed to remove relations: {e}")
+        
+        for edge_key in removed:
+            self._record_change('edge', 'removed', edge_key)
+    
+    def update_node_attributes(self, updates: Dict[str, Dict[str, Any]]):
+        """
+        批量更新已有节点的属性，只写一次 entities.json
+        
+        Args:
+            updates: 节点ID -> 需要更新的属性，值为 None 时删除该属性
+        """
+        updated = []
+        for node_id, attributes in updates.items():
+            if node_id not in self.graph:
+                continue
+            node_data = self.graph.nodes[node_id]
+            for key, value in attributes.items():
+                if value is None:
+                    node_data.pop(key, None)
+                else:
+                    node_data[key] = value
+            self._index_node(node_id, node_data)
+            updated.append(node_id)
+        
+        if not updated:
+            return
+        
+        try:
+            entities = self._load_entities()
+            for node_id in updated:
+                entities[node_id] = {
+                    'node_id': node_id,
+                    'attributes': dict(self.graph.nodes[node_id])
+                }
+            self._save_entities(entities)
+        except Exception as e:
+            logger.error(f"Failed to save entities: {e}")
+        
+        for node_id in updated:
+            self._record_change('node', 'updated', node_id)
+    
     def _save_entity(self, node_id: str, attributes: Dict[str, Any]):
         """保存实体到 entities.json"""
         try:
@@ -260,19 +601,73 @@ class LocalGraphService:
         except Exception as e:
             logger.error(f"Failed to save relation {from_node} -> {to_node}: {e}")
     
+    @contextmanager
+    def batch(self):
+        """
+        批量写入上下文：期间 entities.json / relations.json 只读取一次，
+        所有修改在内存中进行，退出最外层上下文时各写一次
+        
+        用法:
+            with local_graph_service.batch():
+                ... 大量 add_node / create_relationship ...
+        """
+        with self._batch_lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._batch_lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    data, self._batch_data = self._batch_data, {}
+                    if 'entities' in data:
+                        self._write_entities(data['entities'])
+                    if 'relations' in data:
+                        self._write_relations(data['relations'])
+    
     def _load_entities(self) -> Dict[str, Any]:
-        """从 entities.json 加载实体"""
+        """从 entities.json 加载实体（批量写入期间返回内存中的副本）"""
+        with self._batch_lock:
+            if self._batch_depth:
+                if 'entities' not in self._batch_data:
+                    self._batch_data['entities'] = self._read_entities()
+                return self._batch_data['entities']
+        return self._read_entities()
+    
+    def _save_entities(self, entities: Dict[str, Any]):
+        """保存实体到 entities.json（批量写入期间延迟到退出时）"""
+        with self._batch_lock:
+            if self._batch_depth:
+                self._batch_data['entities'] = entities
+                return
+        self._write_entities(entities)
+    
+    def _load_relations(self) -> List[Dict[str, Any]]:
+        """从 relations.json 加载关系（批量写入期间返回内存中的副本）"""
+        with self._batch_lock:
+            if self._batch_depth:
+                if 'relations' not in self._batch_data:
+                    self._batch_data['relations'] = self._read_relations()
+                return self._batch_data['relations']
+        return self._read_relations()
+    
+    def _save_relations(self, relations: List[Dict[str, Any]]):
+        """保存关系到 relations.json（批量写入期间延迟到退出时）"""
+        with self._batch_lock:
+            if self._batch_depth:
+                self._batch_data['relations'] = relations
+                return
+        self._write_relations(relations)
+    
+    def _read_entities(self) -> Dict[str, Any]:
         try:
-            if self.entities_file.exists():
-                with open(self.entities_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return data.get('entities', {})
+            data = self.store.read_json(self.entities_file, {})
+            return data.get('entities', {})
         except Exception as e:
             logger.error(f"Failed to load entities: {e}")
         return {}
     
-    def _save_entities(self, entities: Dict[str, Any]):
-        """保存实体到 entities.json"""
+    def _write_entities(self, entities: Dict[str, Any]):
         try:
             # 添加元数据
             output_data = {
@@ -283,26 +678,21 @@ class LocalGraphService:
                 'entities': entities
             }
             
-            with open(self.entities_file, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+            self.store.write_json(self.entities_file, output_data, indent=2)
             
             logger.debug(f"Saved {len(entities)} entities to {self.entities_file}")
         except Exception as e:
             logger.error(f"Failed to save entities: {e}")
     
-    def _load_relations(self) -> List[Dict[str, Any]]:
-        """从 relations.json 加载关系"""
+    def _read_relations(self) -> List[Dict[str, Any]]:
         try:
-            if self.relations_file.exists():
-                with open(self.relations_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return data.get('relations', [])
+            data = self.store.read_json(self.relations_file, {})
+            return data.get('relations', [])
         except Exception as e:
             logger.error(f"Failed to load relations: {e}")
         return []
     
-    def _save_relations(self, relations: List[Dict[str, Any]]):
-        """保存关系到 relations.json"""
+    def _write_relations(self, relations: List[Dict[str, Any]]):
         try:
             # 添加元数据
             output_data = {
@@ -313,53 +703,89 @@ class LocalGraphService:
                 'relations': relations
             }
             
-            with open(self.relations_file, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+            self.store.write_json(self.relations_file, output_data, indent=2)
             
             logger.debug(f"Saved {len(relations)} relations to {self.relations_file}")
         except Exception as e:
             logger.error(f"Failed to save relations: {e}")
     
-    def get_class_graph(self, class_name: str) -> Dict[str, Any]:
-        """获取特定类的图数据"""
-        class_node = f"class:{class_name}"
+    def get_class_graph(self, class_name: str, depth: int = 1, direction: str = 'out',
+                        edge_types: Optional[List[str]] = None,
+                        max_nodes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        获取特定类的图数据
+        默认只返回类的所有直接后继（方法，不限节点数），可通过 depth 等参数一次展开多跳邻域
+        """
+        return self.get_neighborhood(f"class:{class_name}", depth, direction, edge_types, max_nodes)
+    
+    def get_neighborhood(self, node_id: str, depth: int = 1, direction: str = 'out',
+                         edge_types: Optional[List[str]] = None,
+                         max_nodes: Optional[int] = NEIGHBORHOOD_MAX_NODES) -> Dict[str, Any]:
+        """
+        获取节点的多跳邻域（广度优先，达到节点上限时提前终止）
         
-        if class_node not in self.graph:
-            return {'nodes': [], 'edges': []}
+        Args:
+            node_id: 起始节点ID
+            depth: 最大跳数
+            direction: 'out'（沿出边）、'in'（沿入边）或 'both'
+            edge_types: 只沿这些关系类型展开，None 表示全部
+            max_nodes: 返回的最大节点数（包含起始节点），None 表示不限
         
-        # 获取类节点和其所有相关节点
-        nodes = []
+        Returns:
+            {'nodes': [...], 'edges': [...], 'truncated': 是否因节点上限被截断}
+        """
+        if node_id not in self.graph:
+            return {'nodes': [], 'edges': [], 'truncated': False}
+        
+        adjacency = []
+        if direction in ('out', 'both'):
+            adjacency.append((self.graph.succ, False))
+        if direction in ('in', 'both'):
+            adjacency.append((self.graph.pred, True))
+        allowed = set(edge_types) if edge_types else None
+        
+        visited = {node_id}
+        order = [node_id]
         edges = []
-        
-        # 添加类节点，转换为统一格式
-        class_node_data = self.graph.nodes[class_node]
-        node_type = class_node_data.get('type', 'Unknown')
-        nodes.append({
-            'id': class_node,
-            'labels': [node_type],
-            'properties': {k: v for k, v in class_node_data.items() if k != 'type'}
-        })
-        
-        # 获取所有相关节点和边
-        for neighbor in self.graph.neighbors(class_node):
-            neighbor_data = self.graph.nodes[neighbor]
-            neighbor_type = neighbor_data.get('type', 'Unknown')
-            nodes.append({
-                'id': neighbor,
-                'labels': [neighbor_type],
-                'properties': {k: v for k, v in neighbor_data.items() if k != 'type'}
-            })
+        seen_edges = set()
+        truncated = False
+        frontier = [node_id]
+        
+        for _ in range(depth):
+            next_frontier = []
+            for current in frontier:
+                for adj, reverse in adjacency:
+                    for neighbor, keyed_edges in adj[current].items():
+                        for key, edge_data in keyed_edges.items():
+                            edge_type = edge_data.get('type', key)
+                            if allowed is not None and edge_type not in allowed:
+                                continue
+                            
+                            if neighbor not in visited:
+                                if max_nodes is not None and len(visited) >= max_nodes:
+                                    truncated = True
+                                    continue
+                                visited.add(neighbor)
+                                order.append(neighbor)
+                                next_frontier.append(neighbor)
+                            
+                            source, target = (neighbor, current) if reverse else (current, neighbor)
+                            if (source, target, edge_type) in seen_edges:
+                                continue
+                            seen_edges.add((source, target, edge_type))
+                            edges.append({
+                                'source': source,
+                                'target': target,
+                                'type': edge_type,
+                                **{k: v for k, v in edge_data.items() if k != 'type'}
+                            })
             
-            # 获取所有边
-            for key, edge_data in self.graph[class_node][neighbor].items():
-                edges.append({
-                    'source': class_node,
-                    'target': neighbor,
-                    'type': edge_data.get('type', key),
-                    **edge_data
-                })
+            frontier = next_frontier
+            if not frontier or truncated:
+                break
         
-        return {'nodes': nodes, 'edges': edges}
+        nodes = [self._node_to_dict(n, self.graph.nodes[n]) for n in order]
+        return {'nodes': nodes, 'edges': edges, 'truncated': truncated}
     
     def get_full_graph(self) -> Dict[str, Any]:
         """获取完整图数据"""
@@ -370,12 +796,7 @@ class LocalGraphService:
         # 获取所有节点
         for node_id, node_data in self.graph.nodes(data=True):
             # 转换为统一格式，兼容 Neo4j 返回的结构
-            node_type = node_data.get('type', 'Unknown')
-            nodes.append({
-                'id': node_id,
-                'labels': [node_type],  # 统一使用 labels 列表
-                'properties': {k: v for k, v in node_data.items() if k != 'type'}  # 除 type 外的所有属性
-            })
+            nodes.append(self._node_to_dict(node_id, node_data))
         
         # 获取所有边（去重）
         for source, target, key, edge_data in self.graph.edges(keys=True, data=True):
@@ -397,14 +818,11 @@ class LocalGraphService:
     
     def get_statistics(self) -> Dict[str, Any]:
         """获取图数据库统计信息"""
-        class_count = sum(1 for n, d in self.graph.nodes(data=True) 
-                         if d.get('type') == 'ApexClass')
-        method_count = sum(1 for n, d in self.graph.nodes(data=True) 
-                          if d.get('type') == 'ApexMethod')
-        soql_count = sum(1 for n, d in self.graph.nodes(data=True) 
-                        if d.get('type') == 'SOQLQuery')
-        dml_count = sum(1 for n, d in self.graph.nodes(data=True) 
-                       if d.get('type') == 'DMLOperation')
+        counters = self.node_counters
+        class_count = counters.count('ApexClass')
+        method_count = counters.count('ApexMethod')
+        soql_count = counters.count('SOQLQuery')
+        dml_count = counters.count('DMLOperation')
         
         return {
             'total_nodes': self.graph.number_of_nodes(),
@@ -417,6 +835,10 @@ class LocalGraphService:
             'storage_path': str(self.graph_data_dir.absolute()),
         }
     
+    def get_repository_stats(self, repository: str) -> Dict[str, int]:
+        """获取仓库按类型的节点数"""
+        return self.node_counters.by_type(repository)
+    
     def export_to_json(self, output_file: Optional[str] = None) -> str:
         """导出图数据为JSON格式"""
         if output_file is None:
@@ -462,6 +884,8 @@ class LocalGraphService:
             edge_type = edge.pop('type', 'RELATES_TO')
             self.graph.add_edge(source, target, key=edge_type, **edge)
         
+        self._rebuild_indexes()
+        self._reset_change_log()
         self._save_graph()
         logger.info(f"Imported graph from: {json_file}")
     
@@ -476,4 +900,4 @@ class LocalGraphService:
 
 
 # 全局实例
-local_graph_service = LocalGraphService()
+local_graph_service = LocalGraphService(store=graph_store)
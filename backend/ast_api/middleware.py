@@ -0,0 +1,86 @@
+"""
+HTTP中间件
+"""
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖，未安装时只使用 gzip
+    brotli = None
+
+
+# 可压缩的响应类型
+COMPRESSIBLE_CONTENT_TYPES = ('application/json', 'text/')
+
+
+class CompressionMiddleware:
+    """
+    大响应压缩中间件
+    
+    根据 Accept-Encoding 协商 br（需安装 brotli）或 gzip，
+    只压缩超过 COMPRESSION_MIN_SIZE 字节的 JSON/文本响应。
+    部署在 Nginx 之后时由 Nginx 负责压缩，可通过 COMPRESS_RESPONSES=false 关闭。
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'COMPRESS_RESPONSES', False)
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+    
+    def __call__(self, request):
+        response = self.get_response(request)
+        
+        if not self.enabled or response.streaming or response.has_header('Content-Encoding'):
+            return response
+        
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith(COMPRESSIBLE_CONTENT_TYPES):
+            return response
+        
+        patch_vary_headers(response, ('Accept-Encoding',))
+        
+        if len(response.content) < self.min_size:
+            return response
+        
+        encoding = self._negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        
+        if encoding == 'br':
+            # quality 5 在压缩率和速度之间取得平衡，适合动态响应
+            compressed = brotli.compress(response.content, quality=5)
+        else:
+            compressed = gzip.compress(response.content, compresslevel=6)
+        
+        if len(compressed) >= len(response.content):
+            return response
+        
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        
+        # 压缩后的内容与原始内容不同，ETag 需要标记为弱校验
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        
+        return response
+    
+    @staticmethod
+    def _negotiate(accept_encoding):
+        """根据 Accept-Encoding 选择压缩算法"""
+        accepted = set()
+        for part in accept_encoding.split(','):
+            token, _, params = part.strip().partition(';')
+            if params.strip().replace(' ', '') in ('q=0', 'q=0.0'):
+                continue
+            accepted.add(token.strip().lower())
+        
+        if brotli is not None and 'br' in accepted:
+            return 'br'
+        if 'gzip' in accepted:
+            return 'gzip'
+        return None
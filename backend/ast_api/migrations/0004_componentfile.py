@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ast_api', '0003_astfile_source_code_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComponentFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('component_type', models.CharField(help_text='组件类型: apex / visualforce / lwc', max_length=32)),
+                ('name', models.CharField(help_text='组件名称', max_length=255)),
+                ('ast_file', models.TextField(blank=True, help_text='AST文件路径', null=True)),
+                ('source_file', models.TextField(blank=True, help_text='源代码文件路径', null=True)),
+                ('info_file', models.TextField(blank=True, help_text='组件信息文件路径（LWC）', null=True)),
+                ('size', models.BigIntegerField(default=0, help_text='源代码大小（字节）')),
+                ('sha1', models.CharField(blank=True, default='', help_text='源代码SHA-1', max_length=40)),
+                ('analyzed_at', models.DateTimeField(auto_now=True)),
+                ('repository', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='component_files', to='ast_api.repository')),
+            ],
+            options={
+                'db_table': 'component_files',
+                'ordering': ['component_type', 'name'],
+                'unique_together': {('repository', 'component_type', 'name')},
+            },
+        ),
+    ]
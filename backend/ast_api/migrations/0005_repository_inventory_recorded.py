@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:42
+
+from django.db import migrations, models
+
+
+def mark_recorded(apps, schema_editor):
+    """已有组件清单的仓库不再需要从输出目录补录"""
+    Repository = apps.get_model('ast_api', 'Repository')
+    ComponentFile = apps.get_model('ast_api', 'ComponentFile')
+    Repository.objects.filter(
+        id__in=ComponentFile.objects.values('repository_id')
+    ).update(inventory_recorded=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ast_api', '0004_componentfile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='repository',
+            name='inventory_recorded',
+            field=models.BooleanField(default=False, help_text='组件清单是否已记录（或已尝试从输出目录补录）'),
+        ),
+        migrations.RunPython(mark_recorded, migrations.RunPython.noop),
+    ]
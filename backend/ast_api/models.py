@@ -13,6 +13,10 @@ class Repository(models.Model):
         help_text="Apex代码相对目录"
     )
     is_active = models.BooleanField(default=False, help_text="是否为当前活动仓库")
+    inventory_recorded = models.BooleanField(
+        default=False,
+        help_text="组件清单是否已记录（或已尝试从输出目录补录）"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -48,3 +52,29 @@ class ASTFile(models.Model):
     def __str__(self):
         repo_name = self.repository.name if self.repository else "N/A"
         return f"[{repo_name}] {self.class_name} ({self.filename})"
+
+
+class ComponentFile(models.Model):
+    """分析阶段记录的组件清单（Apex 类、Visualforce 页面、LWC 组件）"""
+    repository = models.ForeignKey(
+        Repository,
+        on_delete=models.CASCADE,
+        related_name='component_files'
+    )
+    component_type = models.CharField(max_length=32, help_text="组件类型: apex / visualforce / lwc")
+    name = models.CharField(max_length=255, help_text="组件名称")
+    ast_file = models.TextField(blank=True, null=True, help_text="AST文件路径")
+    source_file = models.TextField(blank=True, null=True, help_text="源代码文件路径")
+    info_file = models.TextField(blank=True, null=True, help_text="组件信息文件路径（LWC）")
+    size = models.BigIntegerField(default=0, help_text="源代码大小（字节）")
+    sha1 = models.CharField(max_length=40, blank=True, default='', help_text="源代码SHA-1")
+    analyzed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'component_files'
+        ordering = ['component_type', 'name']
+        # 同一仓库中同类型组件名唯一（唯一约束同时作为按仓库分页查询的索引）
+        unique_together = [['repository', 'component_type', 'name']]
+    
+    def __str__(self):
+        return f"[{self.repository.name}] {self.component_type}:{self.name}"
@@ -0,0 +1,71 @@
+"""
+节点计数器
+按节点类型、按 (仓库, 节点类型) 维护节点数，随图节点的增删增量更新，
+统计接口和仓库列表不需要遍历整个图
+"""
+from typing import Dict, Any, Optional
+
+
+class NodeCounters:
+    """节点类型计数（全局 + 按仓库）"""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """清空计数"""
+        self._types: Dict[str, int] = {}
+        self._repositories: Dict[str, Dict[str, int]] = {}
+        # 节点ID -> (仓库, 类型)，用于删除和属性变更
+        self._nodes: Dict[str, tuple] = {}
+
+    def rebuild(self, graph):
+        """从图中重建计数"""
+        self.clear()
+        for node_id, data in graph.nodes(data=True):
+            self.index_node(node_id, data)
+
+    def index_node(self, node_id: str, attributes: Dict[str, Any]):
+        """记录（或更新）一个节点"""
+        key = (attributes.get('repository'), attributes.get('type', 'Unknown'))
+        if self._nodes.get(node_id) == key:
+            return
+        self.remove_node(node_id)
+        self._nodes[node_id] = key
+        repository, node_type = key
+        self._types[node_type] = self._types.get(node_type, 0) + 1
+        if repository:
+            counts = self._repositories.setdefault(repository, {})
+            counts[node_type] = counts.get(node_type, 0) + 1
+
+    def remove_node(self, node_id: str):
+        """移除节点的计数"""
+        key = self._nodes.pop(node_id, None)
+        if key is None:
+            return
+        repository, node_type = key
+        self._decrement(self._types, node_type)
+        if repository:
+            counts = self._repositories.get(repository)
+            if counts is not None:
+                self._decrement(counts, node_type)
+                if not counts:
+                    del self._repositories[repository]
+
+    @staticmethod
+    def _decrement(counts: Dict[str, int], node_type: str):
+        remaining = counts.get(node_type, 0) - 1
+        if remaining > 0:
+            counts[node_type] = remaining
+        else:
+            counts.pop(node_type, None)
+
+    def count(self, node_type: str) -> int:
+        """某类型的节点总数"""
+        return self._types.get(node_type, 0)
+
+    def by_type(self, repository: Optional[str] = None) -> Dict[str, int]:
+        """按类型的节点数；指定仓库时只统计该仓库"""
+        if repository is None:
+            return dict(self._types)
+        return dict(self._repositories.get(repository, {}))
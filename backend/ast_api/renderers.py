@@ -0,0 +1,73 @@
+"""
+REST API渲染器
+大图数据使用 orjson 序列化，未安装 orjson 时退回 DRF 默认的 JSONRenderer
+"""
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖
+    orjson = None
+
+
+# orjson 无法直接序列化的类型（Decimal、QuerySet 等）交给 DRF 编码器处理
+_fallback_encoder = JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """基于 orjson 的 JSON 渲染器"""
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        if data is None:
+            return b''
+        
+        return orjson.dumps(
+            data,
+            default=_fallback_encoder.default,
+            option=orjson.OPT_NON_STR_KEYS,
+        )
+
+
+def dumps(data) -> bytes:
+    """序列化为 JSON 字节串，优先使用 orjson"""
+    if orjson is None:
+        return json.dumps(data, cls=JSONEncoder, ensure_ascii=False).encode('utf-8')
+    return orjson.dumps(data, default=_fallback_encoder.default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def iter_graph_json(nodes, edges, extra=None, chunk_size=1000):
+    """
+    以分块方式生成图数据 JSON，用于 StreamingHttpResponse
+
+    Args:
+        nodes: 节点可迭代对象（可以是生成器）
+        edges: 边可迭代对象（可以是生成器）
+        extra: 附加到顶层的其他字段（如图版本）
+        chunk_size: 每个输出块包含的元素数
+
+    Yields:
+        JSON 字节块，拼接后为 {"nodes": [...], "edges": [...], ...extra}
+    """
+    for key, items in (('nodes', nodes), ('edges', edges)):
+        yield b'{"nodes":[' if key == 'nodes' else b'],"edges":['
+        chunk = []
+        first = True
+        for item in items:
+            chunk.append(dumps(item))
+            if len(chunk) >= chunk_size:
+                yield (b'' if first else b',') + b','.join(chunk)
+                chunk = []
+                first = False
+        if chunk:
+            yield (b'' if first else b',') + b','.join(chunk)
+    
+    yield b']'
+    for key, value in (extra or {}).items():
+        yield b',' + dumps(key) + b':' + dumps(value)
+    yield b'}'
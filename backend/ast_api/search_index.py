@@ -0,0 +1,212 @@
+"""
+图节点搜索索引
+对类、方法、LWC/JS 组件名称和 SOQL 文本建立进程内倒排索引，
+支持前缀匹配和驼峰分词（getPagedPropertyList -> get / paged / property / list），
+随图节点的增删增量维护
+"""
+import re
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Any, Optional
+
+# 参与搜索的节点类型
+SEARCHABLE_TYPES = frozenset((
+    'ApexClass',
+    'ApexMethod',
+    'ApexTrigger',
+    'SOQLQuery',
+    'LWCComponent',
+    'JavaScriptClass',
+    'JavaScriptMethod',
+    'JavaScriptFunction',
+    'VisualforcePage',
+))
+
+# 被索引的属性及其权重（名称匹配优先于查询文本匹配）
+FIELD_WEIGHTS = (
+    ('name', 4),
+    ('canonicalName', 3),
+    ('className', 2),
+    ('componentName', 2),
+    ('sObject', 2),
+    ('query', 1),
+)
+
+# 完整词命中相对前缀命中的加权倍数
+EXACT_TOKEN_FACTOR = 2
+
+# 名称完全匹配 / 前缀匹配查询串时的额外得分
+EXACT_NAME_BONUS = 20
+PREFIX_NAME_BONUS = 10
+
+_WORD_RE = re.compile(r'[A-Za-z0-9_]+')
+_CAMEL_RE = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    分词：完整标识符 + 下划线/驼峰拆分后的子词，统一小写
+
+    例：'Property__c.getPagedPropertyList' ->
+        property__c, property, c, getpagedpropertylist, get, paged, property, list
+    """
+    tokens = []
+    for word in _WORD_RE.findall(text or ''):
+        tokens.append(word.lower())
+        parts = [p for chunk in word.split('_') for p in _CAMEL_RE.findall(chunk)]
+        if len(parts) > 1:
+            tokens.extend(p.lower() for p in parts)
+    return tokens
+
+
+class SearchIndex:
+    """
+    内存倒排索引：词 -> {节点ID: 权重}
+    后台导入线程更新索引的同时请求线程会查询，所有读写都在锁内进行
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        """清空索引"""
+        with self._lock:
+            self._postings: Dict[str, Dict[str, int]] = {}
+            self._node_tokens: Dict[str, List[str]] = {}
+            self._node_meta: Dict[str, tuple] = {}
+            # 有序词表，用于前缀查找；索引变化后在下次查询时重建
+            self._vocabulary: List[str] = []
+            self._vocabulary_dirty = False
+
+    @property
+    def token_count(self) -> int:
+        """已索引的 (词, 节点) 数"""
+        with self._lock:
+            return sum(len(tokens) for tokens in self._node_tokens.values())
+
+    def rebuild(self, graph):
+        """从图中重建索引"""
+        with self._lock:
+            self.clear()
+            for node_id, data in graph.nodes(data=True):
+                self.index_node(node_id, data)
+
+    def index_node(self, node_id: str, attributes: Dict[str, Any]):
+        """索引（或重新索引）一个节点"""
+        with self._lock:
+            self.remove_node(node_id)
+            node_type = attributes.get('type')
+            if node_type not in SEARCHABLE_TYPES:
+                return
+
+            weights = {}
+            for field, weight in FIELD_WEIGHTS:
+                value = attributes.get(field)
+                if not isinstance(value, str):
+                    continue
+                for token in tokenize(value):
+                    if weights.get(token, 0) < weight:
+                        weights[token] = weight
+
+            if not weights:
+                return
+
+            for token, weight in weights.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    self._vocabulary_dirty = True
+                postings[node_id] = weight
+
+            self._node_tokens[node_id] = list(weights)
+            name = attributes.get('displayName') or attributes.get('name') or node_id
+            self._node_meta[node_id] = (node_type, name)
+
+    def remove_node(self, node_id: str):
+        """从索引中移除节点"""
+        with self._lock:
+            for token in self._node_tokens.pop(node_id, ()):
+                postings = self._postings.get(token)
+                if postings is None:
+                    continue
+                postings.pop(node_id, None)
+                if not postings:
+                    del self._postings[token]
+                    self._vocabulary_dirty = True
+            self._node_meta.pop(node_id, None)
+
+    def _prefix_tokens(self, prefix: str) -> List[str]:
+        """有序词表上二分查找以 prefix 开头的所有词"""
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        start = bisect_left(self._vocabulary, prefix)
+        end = bisect_left(self._vocabulary, prefix + '\uffff', start)
+        return self._vocabulary[start:end]
+
+    def search(self, query: str, node_types: Optional[List[str]] = None,
+               limit: int = 50) -> Dict[str, Any]:
+        """
+        搜索节点
+
+        每个查询词都必须命中（前缀匹配），得分为各词命中权重之和，
+        名称与查询串完全相同或以其开头的节点额外加分
+
+        Args:
+            query: 查询串，如 'getPaged'、'property list'、'Opportunity StageName'
+            node_types: 只返回这些类型的节点
+            limit: 返回的最大结果数
+
+        Returns:
+            {'total': 命中数, 'results': [{'id', 'type', 'name', 'score'}]}
+        """
+        with self._lock:
+            # 已被索引的完整标识符（如 Property__c）整体匹配，否则按驼峰/下划线子词匹配
+            terms = []
+            for word in _WORD_RE.findall(query or ''):
+                word_lower = word.lower()
+                parts = [p.lower() for chunk in word.split('_') for p in _CAMEL_RE.findall(chunk)]
+                if word_lower in self._postings or len(parts) <= 1:
+                    terms.append(word_lower)
+                else:
+                    terms.extend(parts)
+            terms = list(dict.fromkeys(terms))
+            if not terms:
+                return {'total': 0, 'results': []}
+
+            allowed = set(node_types) if node_types else None
+            scores = None
+            # 先处理较长（通常命中较少）的查询词，尽早缩小候选集
+            for term in sorted(terms, key=lambda t: -len(t)):
+                term_scores = {}
+                for token in self._prefix_tokens(term):
+                    factor = EXACT_TOKEN_FACTOR if token == term else 1
+                    for node_id, weight in self._postings[token].items():
+                        if scores is not None and node_id not in scores:
+                            continue
+                        score = weight * factor
+                        if term_scores.get(node_id, 0) < score:
+                            term_scores[node_id] = score
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {node_id: scores[node_id] + s for node_id, s in term_scores.items()}
+                if not scores:
+                    return {'total': 0, 'results': []}
+
+            query_lower = query.strip().lower()
+            results = []
+            for node_id, score in scores.items():
+                node_type, name = self._node_meta[node_id]
+                if allowed is not None and node_type not in allowed:
+                    continue
+                name_lower = str(name).lower()
+                if name_lower == query_lower:
+                    score += EXACT_NAME_BONUS
+                elif name_lower.startswith(query_lower):
+                    score += PREFIX_NAME_BONUS
+                results.append({'id': node_id, 'type': node_type, 'name': name, 'score': score})
+
+            results.sort(key=lambda r: (-r['score'], len(str(r['name'])), r['id']))
+            return {'total': len(results), 'results': results[:limit]}
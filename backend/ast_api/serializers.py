@@ -1,26 +1,41 @@
 """
 REST API序列化器
 """
+from django.db.models import Count
 from rest_framework import serializers
 from .models import Repository, ASTFile
+from .unified_graph_service import unified_graph_service
 
 
 class RepositorySerializer(serializers.ModelSerializer):
     """仓库序列化器"""
     ast_files_count = serializers.SerializerMethodField()
+    graph_stats = serializers.SerializerMethodField()
     
     class Meta:
         model = Repository
         fields = [
             'id', 'name', 'url', 'branch', 'local_path', 
             'apex_dir', 'is_active', 'created_at', 'updated_at',
-            'ast_files_count'
+            'ast_files_count', 'graph_stats'
         ]
         read_only_fields = ['local_path', 'created_at', 'updated_at']
     
     def get_ast_files_count(self, obj):
-        """获取AST文件数量"""
+        """获取AST文件数量（列表查询通过 with_counts() 预先聚合，避免逐个仓库 COUNT）"""
+        count = getattr(obj, 'ast_files_total', None)
+        if count is not None:
+            return count
         return obj.ast_files.count()
+    
+    def get_graph_stats(self, obj):
+        """获取仓库在图中按类型的节点数"""
+        return unified_graph_service.get_repository_stats(obj.name)
+    
+    @staticmethod
+    def with_counts(queryset):
+        """为仓库查询附加 AST 文件数聚合"""
+        return queryset.annotate(ast_files_total=Count('ast_files'))
 
 
 class ASTFileSerializer(serializers.ModelSerializer):
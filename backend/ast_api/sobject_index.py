@@ -0,0 +1,175 @@
+"""
+sObject 倒排索引
+- sObject -> 字段 -> SOQL 节点ID
+- sObject -> 读取（SOQL）/ 写入（DML）该对象的方法或触发器
+随图节点的增删增量维护
+Salesforce 对象名和字段名不区分大小写，索引键统一使用小写
+"""
+from typing import Dict, List, Any
+
+from .soql_parser import iter_field_refs
+
+# 索引键类别
+_QUERY = 'query'    # 对象 -> SOQL 节点
+_FIELD = 'field'    # (对象, 字段) -> SOQL 节点
+_DML = 'dml'        # 对象 -> DML 节点
+_READ = 'read'      # 对象 -> 读取的方法
+_WRITE = 'write'    # 对象 -> 写入的方法
+
+
+def _read_sobjects(parsed: Dict[str, Any]):
+    """SOQL 读取的对象：主查询和半连接子查询（父子关系子查询的 FROM 是关系名，不计入）"""
+    yield parsed['sObject']
+    for subquery in parsed.get('subqueries', []):
+        if not subquery.get('relationship'):
+            yield from _read_sobjects(subquery)
+
+
+def _owner_method(attributes: Dict[str, Any]) -> str:
+    """SOQL/DML 节点所属的方法节点ID（触发器体中的节点属于触发器节点）"""
+    if attributes.get('triggerName'):
+        return f"trigger:{attributes['triggerName']}"
+    return f"method:{attributes.get('className', '')}.{attributes.get('methodName', '')}"
+
+
+class SObjectIndex:
+    """sObject 访问索引"""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """清空索引"""
+        # 类别 -> 键 -> {节点ID: 引用次数}
+        self._buckets: Dict[str, Dict[Any, Dict[str, int]]] = {
+            kind: {} for kind in (_QUERY, _FIELD, _DML, _READ, _WRITE)
+        }
+        # 对象 -> 被查询的 (对象, 字段) 键
+        self._object_fields: Dict[str, set] = {}
+        # 小写键 -> 首次出现时的原始写法
+        self._names: Dict[Any, str] = {}
+        # 节点ID -> 该节点贡献的 (类别, 键, 节点ID)，用于删除
+        self._node_keys: Dict[str, List[tuple]] = {}
+
+    def rebuild(self, graph):
+        """从图中重建索引"""
+        self.clear()
+        for node_id, data in graph.nodes(data=True):
+            self.index_node(node_id, data)
+
+    def index_node(self, node_id: str, attributes: Dict[str, Any]):
+        """索引（或重新索引）一个节点，非 SOQL/DML 节点忽略"""
+        self.remove_node(node_id)
+        if not attributes.get('sObject'):
+            return
+
+        keys = []
+        node_type = attributes.get('type')
+        if node_type == 'SOQLQuery':
+            owner = _owner_method(attributes)
+            for sobject in _read_sobjects(attributes):
+                object_key = self._name(sobject.lower(), sobject)
+                keys.append((_QUERY, object_key, node_id))
+                keys.append((_READ, object_key, owner))
+            for sobject, field in iter_field_refs(attributes):
+                field_key = self._name((sobject.lower(), field.lower()), field)
+                keys.append((_FIELD, field_key, node_id))
+        elif node_type == 'DMLOperation':
+            sobject = attributes['sObject']
+            object_key = self._name(sobject.lower(), sobject)
+            keys.append((_DML, object_key, node_id))
+            keys.append((_WRITE, object_key, _owner_method(attributes)))
+        else:
+            return
+
+        for kind, key, member in keys:
+            bucket = self._buckets[kind].setdefault(key, {})
+            bucket[member] = bucket.get(member, 0) + 1
+            if kind == _FIELD:
+                self._object_fields.setdefault(key[0], set()).add(key)
+        self._node_keys[node_id] = keys
+
+    def remove_node(self, node_id: str):
+        """从索引中移除节点"""
+        for kind, key, member in self._node_keys.pop(node_id, []):
+            container = self._buckets[kind]
+            bucket = container.get(key)
+            if bucket is None:
+                continue
+            count = bucket.get(member, 0) - 1
+            if count > 0:
+                bucket[member] = count
+            else:
+                bucket.pop(member, None)
+                if not bucket:
+                    del container[key]
+                    if kind == _FIELD:
+                        self._discard_field(key)
+
+    def _discard_field(self, key):
+        fields = self._object_fields.get(key[0])
+        if fields is not None:
+            fields.discard(key)
+            if not fields:
+                del self._object_fields[key[0]]
+
+    def _name(self, key, name: str):
+        """记录键的原始写法并返回键"""
+        self._names.setdefault(key, name)
+        return key
+
+    def _members(self, kind: str, key) -> List[str]:
+        return sorted(self._buckets[kind].get(key, ()))
+
+    def lookup(self, sobject: str, field: str = None) -> List[str]:
+        """
+        查询引用对象（或对象的某个字段）的 SOQL 节点ID
+
+        Args:
+            sobject: 对象名，如 Opportunity
+            field: 字段名，如 StageName；None 表示对象上的所有查询
+        """
+        if field is None:
+            return self._members(_QUERY, sobject.lower())
+        return self._members(_FIELD, (sobject.lower(), field.lower()))
+
+    def dml_operations(self, sobject: str) -> List[str]:
+        """写入对象的 DML 节点ID"""
+        return self._members(_DML, sobject.lower())
+
+    def readers(self, sobject: str) -> List[str]:
+        """通过 SOQL 读取对象的方法（或触发器）节点ID"""
+        return self._members(_READ, sobject.lower())
+
+    def writers(self, sobject: str) -> List[str]:
+        """通过 DML 写入对象的方法（或触发器）节点ID"""
+        return self._members(_WRITE, sobject.lower())
+
+    def objects(self) -> List[Dict[str, Any]]:
+        """列出所有对象及其查询数、字段数、读写方法数"""
+        object_keys = set(self._buckets[_QUERY]) | set(self._buckets[_DML])
+        return sorted(
+            (
+                {
+                    'name': self._names[object_key],
+                    'queries': len(self._buckets[_QUERY].get(object_key, ())),
+                    'fields': len(self._object_fields.get(object_key, ())),
+                    'dmlOperations': len(self._buckets[_DML].get(object_key, ())),
+                    'readers': len(self._buckets[_READ].get(object_key, ())),
+                    'writers': len(self._buckets[_WRITE].get(object_key, ())),
+                }
+                for object_key in object_keys
+            ),
+            key=lambda item: item['name'].lower()
+        )
+
+    def fields(self, sobject: str) -> Dict[str, int]:
+        """列出对象被查询的字段及引用该字段的查询数"""
+        return {
+            self._names[key]: len(self._buckets[_FIELD][key])
+            for key in sorted(self._object_fields.get(sobject.lower(), ()))
+        }
+
+    def object_name(self, sobject: str) -> str:
+        """返回对象名的原始写法"""
+        return self._names.get(sobject.lower(), sobject)
@@ -0,0 +1,286 @@
+"""
+SOQL 解析器
+从 SOQL 文本中提取 FROM 对象、SELECT 字段、WHERE 字段和子查询
+只做依赖分析需要的轻量解析，不校验语法
+"""
+import html
+import re
+from typing import Dict, List, Any, Optional
+
+# 词法单元：字符串、绑定变量、比较运算符、括号/逗号、标识符（含字段路径和日期字面量）
+_TOKEN_RE = re.compile(r"""
+    (?P<string>'(?:\\.|[^'\\])*')
+  | (?P<bind>:\s*[\w.\[\]]+)
+  | (?P<op><=|>=|!=|<>|=|<|>)
+  | (?P<punct>[(),])
+  | (?P<ident>[\w.:]+)
+""", re.VERBOSE)
+
+# 结束 WHERE 子句的关键字
+_CLAUSE_KEYWORDS = {'WITH', 'GROUP', 'HAVING', 'ORDER', 'LIMIT', 'OFFSET', 'FOR', 'UPDATE', 'ALL'}
+
+# 位于字段之后、表示该标识符是条件左值的关键字
+_CONDITION_KEYWORDS = {'LIKE', 'IN', 'NOT', 'INCLUDES', 'EXCLUDES'}
+
+# WHERE 子句中不是字段的关键字和字面量
+_WHERE_KEYWORDS = {'AND', 'OR', 'NOT', 'LIKE', 'IN', 'INCLUDES', 'EXCLUDES', 'TRUE', 'FALSE', 'NULL'}
+
+
+def _tokenize(query: str) -> List[tuple]:
+    """切分为 (类型, 文本) 列表"""
+    return [(m.lastgroup, m.group()) for m in _TOKEN_RE.finditer(query)]
+
+
+def _unique(values: List[str]) -> List[str]:
+    """去重并保持顺序（不区分大小写）"""
+    seen = set()
+    result = []
+    for value in values:
+        key = value.lower()
+        if key not in seen:
+            seen.add(key)
+            result.append(value)
+    return result
+
+
+class _Parser:
+    """递归下降解析，每个 SELECT 对应一次 parse_select"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def _peek(self, offset=0):
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def _upper(self, offset=0):
+        kind, text = self._peek(offset)
+        return text.upper() if kind == 'ident' else text
+
+    def _skip_group(self):
+        """跳过一个括号组（当前位置为左括号）"""
+        depth = 0
+        while self.pos < len(self.tokens):
+            text = self.tokens[self.pos][1]
+            self.pos += 1
+            if text == '(':
+                depth += 1
+            elif text == ')':
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def _function_fields(self) -> List[str]:
+        """读取函数参数中的字段（当前位置为左括号），如 COUNT(Id)、CALENDAR_YEAR(CreatedDate)"""
+        fields = []
+        depth = 0
+        while self.pos < len(self.tokens):
+            kind, text = self.tokens[self.pos]
+            self.pos += 1
+            if text == '(':
+                depth += 1
+            elif text == ')':
+                depth -= 1
+                if depth == 0:
+                    break
+            elif kind == 'ident' and self._upper() != '(':
+                fields.append(text)
+        return fields
+
+    def parse_select(self) -> Optional[Dict[str, Any]]:
+        """解析 SELECT ... FROM ...（当前位置为 SELECT）"""
+        if self._upper() != 'SELECT':
+            return None
+        self.pos += 1
+
+        fields = []
+        subqueries = []
+        expect_item = True
+        while self.pos < len(self.tokens) and self._upper() != 'FROM':
+            kind, text = self._peek()
+            if text == ',':
+                expect_item = True
+                self.pos += 1
+            elif text == '(' and self._upper(1) == 'SELECT':
+                # 父子关系子查询：(SELECT ... FROM Contacts)
+                self.pos += 1
+                subquery = self.parse_select()
+                if subquery:
+                    subquery['relationship'] = True
+                    subqueries.append(subquery)
+                self._close_paren()
+                expect_item = False
+            elif kind == 'ident' and text.upper() == 'TYPEOF':
+                # 多态字段：TYPEOF What WHEN ... END，只记录多态关系字段
+                self.pos += 1
+                fields.append(self._peek()[1])
+                while self.pos < len(self.tokens) and self._upper() != 'END':
+                    self.pos += 1
+                self.pos += 1
+                expect_item = False
+            elif kind == 'ident' and self._peek(1)[1] == '(':
+                # 聚合函数：COUNT(Id) alias
+                self.pos += 1
+                fields.extend(self._function_fields())
+                expect_item = False
+            elif kind == 'ident' and expect_item:
+                fields.append(text)
+                self.pos += 1
+                expect_item = False
+            else:
+                # 字段别名等
+                self.pos += 1
+
+        if self._upper() != 'FROM':
+            return None
+        self.pos += 1
+
+        kind, sobject = self._peek()
+        if kind != 'ident':
+            return None
+        self.pos += 1
+
+        # 对象别名：SELECT a.Name FROM Account a
+        alias = None
+        kind, text = self._peek()
+        if kind == 'ident' and text.upper() not in _CLAUSE_KEYWORDS | {'WHERE', 'USING'}:
+            alias = text
+            self.pos += 1
+
+        where_fields = []
+        while self.pos < len(self.tokens):
+            kind, text = self._peek()
+            if text == ')':
+                break
+            if kind == 'ident' and text.upper() == 'WHERE':
+                self.pos += 1
+                where_fields, where_subqueries = self._parse_where()
+                subqueries.extend(where_subqueries)
+                continue
+            if text == '(':
+                self._skip_group()
+                continue
+            self.pos += 1
+
+        return {
+            'sObject': sobject,
+            'fields': _unique(self._strip_alias(fields, alias)),
+            'whereFields': _unique(self._strip_alias(where_fields, alias)),
+            'subqueries': subqueries,
+        }
+
+    def _parse_where(self):
+        """解析 WHERE 条件，返回 (字段列表, 半连接子查询列表)"""
+        fields = []
+        subqueries = []
+        depth = 0
+        while self.pos < len(self.tokens):
+            kind, text = self._peek()
+            upper = self._upper()
+            if kind == 'ident' and upper in _CLAUSE_KEYWORDS and depth == 0:
+                break
+            if text == ')':
+                if depth == 0:
+                    break
+                depth -= 1
+                self.pos += 1
+            elif text == '(' and self._upper(1) == 'SELECT':
+                # 半连接：Id IN (SELECT AccountId FROM Contact)
+                self.pos += 1
+                subquery = self.parse_select()
+                if subquery:
+                    subqueries.append(subquery)
+                self._close_paren()
+            elif text == '(':
+                depth += 1
+                self.pos += 1
+            elif kind == 'ident' and upper not in _WHERE_KEYWORDS:
+                next_kind, next_text = self._peek(1)
+                if next_text == '(':
+                    # 条件左侧的日期函数：CALENDAR_YEAR(CreatedDate) = 2020
+                    self.pos += 1
+                    fields.extend(self._function_fields())
+                    continue
+                if next_kind == 'op' or self._upper(1) in _CONDITION_KEYWORDS:
+                    fields.append(text)
+                self.pos += 1
+            else:
+                self.pos += 1
+        return fields, subqueries
+
+    def _close_paren(self):
+        """跳过子查询剩余部分直到对应的右括号"""
+        depth = 0
+        while self.pos < len(self.tokens):
+            text = self.tokens[self.pos][1]
+            self.pos += 1
+            if text == '(':
+                depth += 1
+            elif text == ')':
+                if depth == 0:
+                    return
+                depth -= 1
+
+    @staticmethod
+    def _strip_alias(fields: List[str], alias: Optional[str]) -> List[str]:
+        if not alias:
+            return fields
+        prefix = alias.lower() + '.'
+        return [f[len(prefix):] if f.lower().startswith(prefix) else f for f in fields]
+
+
+def parse_soql(query: str) -> Optional[Dict[str, Any]]:
+    """
+    解析 SOQL 查询
+
+    Args:
+        query: SOQL 文本（PMD AST 中的 Query 属性，可能含有 HTML 转义）
+
+    Returns:
+        {'sObject': 对象名, 'fields': SELECT 字段, 'whereFields': WHERE 字段,
+         'subqueries': 子查询列表（结构相同，父子关系子查询带 relationship=True）}
+        无法解析时返回 None
+    """
+    if not query:
+        return None
+
+    tokens = _tokenize(html.unescape(query).strip().strip('[]'))
+    try:
+        return _Parser(tokens).parse_select()
+    except Exception:
+        return None
+
+
+def soql_node_attributes(query: str) -> Dict[str, Any]:
+    """
+    解析 SOQL 并返回需要保存到 SOQLQuery 节点上的属性
+
+    无法解析时 sObject 为 None（避免重复解析）
+    """
+    parsed = parse_soql(query)
+    if parsed is None:
+        return {'sObject': None}
+
+    attributes = {
+        'sObject': parsed['sObject'],
+        'fields': parsed['fields'],
+        'whereFields': parsed['whereFields'],
+    }
+    if parsed['subqueries']:
+        attributes['subqueries'] = parsed['subqueries']
+    return attributes
+
+
+def iter_field_refs(parsed: Dict[str, Any]):
+    """
+    遍历解析结果中的 (对象, 字段) 引用，包括子查询
+
+    父子关系子查询的 FROM 是关系名（如 Contacts），按原样作为对象名
+    """
+    sobject = parsed['sObject']
+    for field in parsed.get('fields', []) + parsed.get('whereFields', []):
+        yield sobject, field
+    for subquery in parsed.get('subqueries', []):
+        yield from iter_field_refs(subquery)
+
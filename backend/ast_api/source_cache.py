@@ -0,0 +1,149 @@
+"""
+源代码缓存
+按 (路径, mtime, size) 缓存源文件内容，LRU 淘汰并限制总内存占用
+文件被修改后 mtime/size 变化，旧条目自然失效
+源文件已打包时从包中读取（见 ast_pack），mtime/size 取打包时记录的值
+"""
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+import logging
+
+from django.conf import settings
+
+from .ast_pack import read_entry, stat_entry
+
+logger = logging.getLogger(__name__)
+
+# 默认缓存上限（按源文件字节数计）
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def make_etag(stat: Tuple[int, int], *parts) -> str:
+    """由 (mtime_ns, size) 和附加部分（如行范围）生成 ETag，不需要读取文件内容"""
+    mtime_ns, size = stat
+    suffix = ''.join(f'-{part}' for part in parts if part is not None)
+    return f'"{size:x}-{mtime_ns:x}{suffix}"'
+
+
+class SourceEntry:
+    """缓存的源文件"""
+
+    __slots__ = ('text', 'size', 'mtime_ns', 'nbytes', '_line_offsets')
+
+    def __init__(self, text: str, size: int, mtime_ns: int, nbytes: int):
+        self.text = text
+        self.size = size
+        self.mtime_ns = mtime_ns
+        # 读取到的内容字节数，计入缓存占用
+        self.nbytes = nbytes
+        self._line_offsets = None
+
+    @property
+    def line_count(self) -> int:
+        return len(self._offsets()) - 1
+
+    def _offsets(self):
+        """每行起始位置，首次按行截取时计算"""
+        if self._line_offsets is None:
+            offsets = [0]
+            find = self.text.find
+            position = find('\n')
+            while position != -1:
+                offsets.append(position + 1)
+                position = find('\n', position + 1)
+            if offsets[-1] != len(self.text):
+                offsets.append(len(self.text))
+            self._line_offsets = offsets
+        return self._line_offsets
+
+    def lines(self, start: int, end: Optional[int] = None) -> str:
+        """返回第 start..end 行（从 1 开始，包含 end）"""
+        offsets = self._offsets()
+        last = len(offsets) - 1
+        start = min(max(start, 1), last + 1)
+        end = last if end is None else min(max(end, start - 1), last)
+        return self.text[offsets[start - 1]:offsets[end]]
+
+
+class SourceCache:
+    """线程安全的 LRU 源代码缓存"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, SourceEntry]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def stat(path: str) -> Optional[Tuple[int, int]]:
+        """返回 (mtime_ns, size)，文件不存在时返回 None"""
+        return stat_entry(path)
+
+    def get(self, path: str, stat: Optional[Tuple[int, int]] = None) -> Optional[SourceEntry]:
+        """
+        获取源文件，缓存未命中或文件已变化时重新读取
+
+        Args:
+            path: 文件路径
+            stat: 调用方已获取的 (mtime_ns, size)，避免重复 stat
+
+        Returns:
+            SourceEntry，文件不存在时返回 None
+        """
+        path = str(path)
+        stat = stat or self.stat(path)
+        if stat is None:
+            return None
+        mtime_ns, size = stat
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and (entry.mtime_ns, entry.size) == (mtime_ns, size):
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+
+        data = read_entry(path)
+        if data is None:
+            return None
+        # 与文本模式打开文件一致，统一换行符
+        text = data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        entry = SourceEntry(text, size, mtime_ns, len(data))
+
+        with self._lock:
+            self.misses += 1
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            # 超过上限的单个文件不缓存
+            if entry.nbytes <= self.max_bytes:
+                self._entries[path] = entry
+                self._bytes += entry.nbytes
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= evicted.nbytes
+        return entry
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """缓存条目数、占用和命中统计"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'maxBytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+# 全局缓存实例
+source_cache = SourceCache(getattr(settings, 'SOURCE_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
@@ -0,0 +1,24 @@
+"""
+SQLite 连接调优
+每个新数据库连接建立时执行 settings.SQLITE_PRAGMAS 中的 PRAGMA
+（WAL 日志、synchronous、页缓存和 mmap 大小等）
+"""
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """connection_created 信号处理：只对 SQLite 连接生效"""
+    if connection.vendor != 'sqlite':
+        return
+    
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            try:
+                cursor.execute(f'PRAGMA {name} = {value}')
+            except Exception as e:
+                logger.warning(f"Failed to set PRAGMA {name}={value}: {e}")
@@ -0,0 +1,335 @@
+"""
+数据存储层
+AST 输出、源代码副本和图数据文件统一通过 DataStore 读写：
+- 本地模式：直接读写数据目录
+- Cloud Storage 模式：先写入本地磁盘缓存，由后台线程批量同步到持久目录（GCS FUSE 挂载点）；
+  读取时优先使用缓存，缓存未命中时从持久目录拉取
+持久目录可以是任意本地目录，测试时用临时目录代替存储桶
+"""
+import atexit
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Union
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# 后台同步的最大等待时间（秒）和单批文件数
+DEFAULT_SYNC_INTERVAL = 2.0
+SYNC_BATCH_SIZE = 200
+
+PathLike = Union[str, Path]
+
+
+def _atomic_write(path: Path, data: bytes):
+    """写入临时文件后重命名，读者不会看到写了一半的文件"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _same_file(source: Path, dest: Path) -> bool:
+    """大小和修改时间（秒）都相同视为同一文件"""
+    try:
+        source_stat = source.stat()
+        dest_stat = dest.stat()
+    except OSError:
+        return False
+    return (source_stat.st_size == dest_stat.st_size
+            and int(source_stat.st_mtime) == int(dest_stat.st_mtime))
+
+
+class DataStore:
+    """
+    带本地缓存的文件存储
+
+    所有路径都相对于 root（也可以传入 root 下的绝对路径）；
+    启用缓存时 root 是缓存目录，持久目录由后台线程同步
+    """
+
+    def __init__(self, durable_root: PathLike, cache_root: Optional[PathLike] = None,
+                 sync_interval: float = DEFAULT_SYNC_INTERVAL):
+        # 相对目录在创建时按当前工作目录解析，之后传入的 root 下绝对路径才能正确转换为相对路径
+        self.durable_root = Path(durable_root).absolute()
+        self.cache_root = Path(cache_root).absolute() if cache_root else None
+        self.sync_interval = sync_interval
+
+        self._pending = set()
+        self._syncing = 0
+        self._flushing = 0
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    @property
+    def root(self) -> Path:
+        """读写使用的目录（启用缓存时为缓存目录）"""
+        return self.cache_root or self.durable_root
+
+    @property
+    def cached(self) -> bool:
+        return self.cache_root is not None
+
+    def _relative(self, path: PathLike) -> Path:
+        path = Path(path)
+        if path.is_absolute():
+            return path.relative_to(self.root)
+        return path
+
+    def path(self, path: PathLike) -> Path:
+        """返回文件在 root 下的路径（不保证存在）"""
+        return self.root / self._relative(path)
+
+    # ========== 读取 ==========
+
+    def local_path(self, path: PathLike) -> Optional[Path]:
+        """
+        返回可直接打开的本地路径，缓存未命中时从持久目录拉取
+
+        Returns:
+            文件路径，缓存和持久目录中都不存在时返回 None
+        """
+        relative = self._relative(path)
+        local = self.root / relative
+        if local.exists():
+            return local
+        if not self.cached:
+            return None
+
+        durable = self.durable_root / relative
+        if not durable.is_file():
+            return None
+        local.parent.mkdir(parents=True, exist_ok=True)
+        tmp = local.with_name(f'.{local.name}.{threading.get_ident()}.fetch')
+        shutil.copy2(durable, tmp)
+        os.replace(tmp, local)
+        return local
+
+    def exists(self, path: PathLike) -> bool:
+        relative = self._relative(path)
+        if (self.root / relative).exists():
+            return True
+        return self.cached and (self.durable_root / relative).exists()
+
+    def read_bytes(self, path: PathLike) -> Optional[bytes]:
+        local = self.local_path(path)
+        if local is None:
+            return None
+        with open(local, 'rb') as f:
+            return f.read()
+
+    def read_text(self, path: PathLike) -> Optional[str]:
+        data = self.read_bytes(path)
+        return data.decode('utf-8') if data is not None else None
+
+    def read_json(self, path: PathLike, default: Any = None) -> Any:
+        data = self.read_bytes(path)
+        if data is None:
+            return default
+        return json.loads(data)
+
+    # ========== 写入 ==========
+
+    def write_bytes(self, path: PathLike, data: bytes) -> Path:
+        """写入文件并排队同步，返回 root 下的路径"""
+        relative = self._relative(path)
+        target = self.root / relative
+        _atomic_write(target, data)
+        self._enqueue(relative)
+        return target
+
+    def write_text(self, path: PathLike, text: str) -> Path:
+        return self.write_bytes(path, text.encode('utf-8'))
+
+    def write_json(self, path: PathLike, data: Any, **dump_options) -> Path:
+        dump_options.setdefault('ensure_ascii', False)
+        return self.write_text(path, json.dumps(data, **dump_options))
+
+    def copy_file(self, source: PathLike, path: PathLike) -> Path:
+        """复制外部文件到存储中，目标已是相同文件（大小和修改时间一致）时跳过"""
+        source = Path(source)
+        relative = self._relative(path)
+        target = self.root / relative
+        if not _same_file(source, target):
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, target)
+            self._enqueue(relative)
+        return target
+
+    def mark_dirty(self, path: PathLike):
+        """外部进程（如 PMD、Node.js）直接写入 root 下的文件后调用，排队同步"""
+        self._enqueue(self._relative(path))
+
+    def delete(self, path: PathLike):
+        """删除文件（缓存和持久目录）"""
+        relative = self._relative(path)
+        with self._condition:
+            self._pending.discard(relative)
+        (self.root / relative).unlink(missing_ok=True)
+        if self.cached:
+            (self.durable_root / relative).unlink(missing_ok=True)
+
+    # ========== 同步 ==========
+
+    def _enqueue(self, relative: Path):
+        if not self.cached:
+            return
+        with self._condition:
+            self._pending.add(relative)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._sync_loop, name='data-store-sync', daemon=True
+                )
+                self._thread.start()
+            if len(self._pending) >= SYNC_BATCH_SIZE:
+                self._condition.notify_all()
+
+    def _sync_loop(self):
+        while True:
+            with self._condition:
+                if not self._pending:
+                    if self._stopped:
+                        return
+                    self._condition.wait(self.sync_interval)
+                    continue
+                if len(self._pending) < SYNC_BATCH_SIZE and not (self._stopped or self._flushing):
+                    # 等待更多写入，凑成一批
+                    self._condition.wait(self.sync_interval)
+                    if not self._pending:
+                        continue
+                batch = [self._pending.pop() for _ in range(min(len(self._pending), SYNC_BATCH_SIZE))]
+                self._syncing += 1
+            try:
+                self._sync_batch(batch)
+            finally:
+                with self._condition:
+                    self._syncing -= 1
+                    self._condition.notify_all()
+
+    def _sync_batch(self, batch):
+        failed = []
+        for relative in batch:
+            source = self.cache_root / relative
+            target = self.durable_root / relative
+            try:
+                if not source.exists():
+                    continue
+                target.parent.mkdir(parents=True, exist_ok=True)
+                tmp = target.with_name(f'.{target.name}.sync')
+                shutil.copy2(source, tmp)
+                os.replace(tmp, target)
+            except OSError as e:
+                logger.warning(f"Failed to sync {relative} to {self.durable_root}: {e}")
+                failed.append(relative)
+        if failed:
+            with self._condition:
+                self._pending.update(failed)
+        logger.debug(f"Synced {len(batch) - len(failed)} files to {self.durable_root}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待所有待同步文件写入持久目录
+
+        Returns:
+            是否在超时前完成
+        """
+        if not self.cached:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._flushing += 1
+            try:
+                self._condition.notify_all()
+                while self._pending or self._syncing:
+                    if self._thread is None or not self._thread.is_alive():
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+            finally:
+                self._flushing -= 1
+            pending = list(self._pending)
+            self._pending.clear()
+        # 同步线程未运行（如进程退出阶段）时在当前线程完成
+        if pending:
+            self._sync_batch(pending)
+        return True
+
+    def close(self, timeout: Optional[float] = 30):
+        """同步剩余文件并停止后台线程"""
+        self.flush(timeout)
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def hydrate(self, prefix: PathLike = '') -> int:
+        """
+        把持久目录中缓存缺失或较旧的文件拉取到缓存（容器启动时预热）
+
+        Returns:
+            拉取的文件数
+        """
+        if not self.cached:
+            return 0
+        source_root = self.durable_root / prefix
+        if not source_root.exists():
+            return 0
+        count = 0
+        for directory, _, files in os.walk(source_root):
+            for name in files:
+                if name.startswith('.') and name.endswith(('.tmp', '.sync')):
+                    continue
+                source = Path(directory) / name
+                target = self.cache_root / source.relative_to(self.durable_root)
+                if target.exists() and target.stat().st_mtime >= source.stat().st_mtime:
+                    continue
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(source, target)
+                count += 1
+        logger.info(f"Hydrated {count} files from {source_root} into {self.cache_root}")
+        return count
+
+
+def _create_stores():
+    """根据配置创建 AST 输出存储和图数据存储"""
+    if settings.USE_CLOUD_STORAGE:
+        import sys
+        sys.path.insert(0, str(Path(settings.BASE_DIR).parent))
+        from cloud_storage import DATA_DIR, GRAPH_DIR
+
+        cache_dir = Path(settings.LOCAL_CACHE_DIR)
+        interval = settings.STORAGE_SYNC_INTERVAL
+        # AST 存储的根目录对应 /data（其下的 ast/<仓库>/...）
+        ast = DataStore(DATA_DIR, cache_dir / 'data', interval)
+        graph = DataStore(GRAPH_DIR, cache_dir / 'graph', interval)
+    else:
+        ast = DataStore(Path(settings.BASE_DIR).parent / 'output')
+        # 与 LocalGraphService 原有的默认目录一致（相对于工作目录）
+        graph = DataStore(Path('graphdata'))
+    return ast, graph
+
+
+# 全局存储实例
+ast_store, graph_store = _create_stores()
+
+# 图布局文件的存储：Cloud Storage 模式下与图数据相同；
+# 本地模式保持原来的位置 <项目根>/graphdata/graphs/layout.json（与工作目录无关）
+layout_store = graph_store if settings.USE_CLOUD_STORAGE else DataStore(Path(settings.BASE_DIR).parent / 'graphdata')
+
+
+@atexit.register
+def _flush_stores():
+    for store in (ast_store, graph_store):
+        try:
+            store.close()
+        except Exception as e:
+            logger.error(f"Failed to flush data store {store.durable_root}: {e}")
@@ -3,9 +3,12 @@
 自动在 Neo4j 和本地图数据库之间切换
 """
 import logging
+from contextlib import nullcontext
 from typing import Dict, Any, Optional
 from django.conf import settings
 
+from .impact_index import ImpactIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,6 +20,7 @@ class UnifiedGraphService:
         self.local_service = None
         self.use_neo4j = False
         self.use_local = False
+        self.impact_index = None
         
         self._init_services()
     
@@ -44,6 +48,7 @@ class UnifiedGraphService:
             if local_graph_service.connected:
                 self.local_service = local_graph_service
                 self.use_local = True
+                self.impact_index = ImpactIndex(local_graph_service)
                 logger.info("Local graph service initialized successfully")
         except Exception as e:
             logger.error(f"Local graph service initialization failed: {e}")
@@ -155,8 +160,14 @@ class UnifiedGraphService:
         
         return results
     
-    def get_class_graph(self, class_name: str) -> Dict[str, Any]:
-        """获取类的图数据"""
+    def get_class_graph(self, class_name: str, **options) -> Dict[str, Any]:
+        """
+        获取类的图数据
+        
+        Args:
+            class_name: 类名
+            **options: 邻域展开参数（depth/direction/edge_types/max_nodes），仅本地图数据库支持
+        """
         # 优先使用 Neo4j
         if self.use_neo4j:
             try:
@@ -167,12 +178,30 @@ class UnifiedGraphService:
         # 降级使用本地图数据库
         if self.use_local:
             try:
-                return self.local_service.get_class_graph(class_name)
+                return self.local_service.get_class_graph(class_name, **options)
             except Exception as e:
                 logger.error(f"Failed to get class graph locally: {e}")
         
         return {'nodes': [], 'edges': []}
     
+    def get_neighborhood(self, node_id: str, **options) -> Dict[str, Any]:
+        """
+        获取任意节点的多跳邻域（仅本地图数据库支持）
+        
+        Args:
+            node_id: 起始节点ID
+            **options: depth/direction/edge_types/max_nodes
+        """
+        if not self.use_local:
+            logger.error("Local graph service not available")
+            return {'nodes': [], 'edges': [], 'truncated': False}
+        
+        try:
+            return self.local_service.get_neighborhood(node_id, **options)
+        except Exception as e:
+            logger.error(f"Failed to get neighborhood: {e}")
+            return {'nodes': [], 'edges': [], 'truncated': False}
+    
     def get_full_graph(self) -> Dict[str, Any]:
         """获取完整图数据"""
         # 优先使用 Neo4j
@@ -191,6 +220,89 @@ class UnifiedGraphService:
         
         return {'nodes': [], 'edges': []}
     
+    def get_graph_version(self) -> Optional[Dict[str, Any]]:
+        """
+        获取当前图版本（仅本地图数据库维护版本号）
+        
+        Returns:
+            {'version': int, 'epoch': str}，不支持时返回 None
+        """
+        if self.use_neo4j or not self.use_local:
+            return None
+        
+        return {
+            'version': self.local_service.version,
+            'epoch': self.local_service.epoch,
+        }
+    
+    def get_changes_since(self, since: int, epoch: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        获取指定版本之后的图变更
+        
+        Args:
+            since: 客户端持有的图版本
+            epoch: 客户端持有的图实例标识
+        
+        Returns:
+            变更字典；无法增量同步时返回 None
+        """
+        current = self.get_graph_version()
+        if current is None:
+            return None
+        
+        if epoch and epoch != current['epoch']:
+            return None
+        
+        try:
+            changes = self.local_service.get_changes_since(since)
+        except Exception as e:
+            logger.error(f"Failed to get graph changes: {e}")
+            return None
+        
+        if changes is not None:
+            changes['epoch'] = current['epoch']
+        return changes
+    
+    def get_impact(self, node_id: str, **options) -> Optional[Dict[str, Any]]:
+        """
+        影响分析（仅本地图数据库支持）
+        
+        Args:
+            node_id: 起始节点ID
+            **options: direction/node_types/limit，见 ImpactIndex.query
+        
+        Returns:
+            影响分析结果，节点不存在时返回 None
+        """
+        if self.impact_index is None:
+            logger.error("Local graph service not available")
+            return None
+        
+        return self.impact_index.query(node_id, **options)
+    
+    def search(self, query: str, **options) -> Optional[Dict[str, Any]]:
+        """
+        按名称/查询文本搜索节点（仅本地图数据库支持）
+        
+        Args:
+            query: 查询串
+            **options: node_types/limit，见 SearchIndex.search
+        
+        Returns:
+            搜索结果，本地图数据库不可用时返回 None
+        """
+        if not self.use_local:
+            logger.error("Local graph service not available")
+            return None
+        
+        return self.local_service.search_index.search(query, **options)
+    
+    def get_sobject_index(self):
+        """获取 sObject 倒排索引（仅本地图数据库维护），不可用时返回 None"""
+        if not self.use_local:
+            return None
+        return self.local_service.sobject_index
+    
     def get_statistics(self) -> Dict[str, Any]:
         """获取统计信息"""
         stats = {
@@ -213,6 +325,18 @@ class UnifiedGraphService:
         
         return stats
     
+    def batch(self):
+        """批量写入上下文（本地图数据库延迟持久化到退出时），不可用时为空上下文"""
+        if not self.use_local:
+            return nullcontext()
+        return self.local_service.batch()
+    
+    def get_repository_stats(self, repository_name: str) -> Optional[Dict[str, int]]:
+        """获取仓库按类型的节点数（本地图数据库维护的计数），不可用时返回 None"""
+        if not self.use_local:
+            return None
+        return self.local_service.get_repository_stats(repository_name)
+    
     def save(self):
         """保存数据"""
         if self.use_local:
@@ -29,12 +29,23 @@ urlpatterns = [
     
     # 图数据查询
     path('graph/', views.get_graph_data, name='get_graph_data'),
+    path('graph/changes/', views.get_graph_changes, name='get_graph_changes'),
     path('graph/class/<str:class_name>/', views.get_class_graph, name='get_class_graph'),
+    path('graph/neighborhood/', views.get_neighborhood, name='get_neighborhood'),
+    path('graph/impact/', views.get_impact_analysis, name='get_impact_analysis'),
     path('graph/layout/', views.save_graph_layout, name='save_graph_layout'),
     path('graph/layout/load/', views.load_graph_layout, name='load_graph_layout'),
     
+    # 节点搜索
+    path('search/', views.search_nodes, name='search_nodes'),
+    
+    # sObject 使用情况
+    path('sobjects/', views.list_sobjects, name='list_sobjects'),
+    path('sobjects/<str:sobject>/', views.get_sobject_usage, name='get_sobject_usage'),
+    
     # 源代码查询
     path('source/<str:class_name>/', views.get_source_code, name='get_source_code'),
+    path('code-search/', views.search_code, name='search_code'),
     
     # 统计和管理
     path('statistics/', views.get_statistics, name='get_statistics'),
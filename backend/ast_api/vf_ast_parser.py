@@ -0,0 +1,143 @@
+"""
+Visualforce AST XML解析器
+流式解析 PMD 生成的 Visualforce AST（ast-dump --language visualforce），提取：
+- 页面（apex:page / apex:component）的 controller、standardController、extensions
+- 使用的组件（apex:*、c:* 等带命名空间前缀的标签）
+- {!expression} 表达式中的引用链（如 save、account.Name、URLFOR）
+
+使用 iterparse 逐个处理节点，处理完即从父节点移除，内存占用与页面大小无关，
+只与标签嵌套深度有关
+"""
+import xml.etree.ElementTree as ET
+from pathlib import Path
+import io
+import logging
+
+from .ast_pack import open_entry
+
+logger = logging.getLogger(__name__)
+
+# 定义页面控制器的根标签
+_ROOT_TAGS = ('apex:page', 'apex:component')
+
+# 根标签上记录的属性（小写）
+_ROOT_ATTRIBUTES = ('controller', 'standardcontroller', 'extensions')
+
+# 表达式引用数上限（异常大的页面只保留前 N 个不同的引用）
+MAX_REFERENCES = 2000
+
+
+class VFASTParser:
+    """Visualforce AST XML 流式解析器"""
+
+    def __init__(self, ast_file_path, data=None):
+        self.file_path = Path(ast_file_path)
+        # 调用方已读取的文件内容（可选），避免重复读取
+        self.data = data
+
+    def parse(self):
+        """解析AST文件"""
+        name = self.file_path.name
+        if name.endswith('_ast.xml'):
+            name = name[:-len('_ast.xml')]
+        result = {
+            'name': name,
+            'fileName': self.file_path.name,
+            'kind': 'page',
+            'controller': None,
+            'standardController': None,
+            'extensions': [],
+            'components': {},
+            'references': [],
+        }
+
+        root_attributes = {}
+        references = {}
+        # 打开的 XML 节点、标签名（Element）和属性名（Attribute）
+        nodes = []
+        elements = []
+        attributes = []
+        # 当前表达式中的引用链：每个 Expression 一个列表，元素为引用链（标识符列表）
+        chains = []
+
+        try:
+            source = io.BytesIO(self.data) if self.data is not None else open_entry(self.file_path)
+            with source as f:
+                for event, node in ET.iterparse(f, events=('start', 'end')):
+                    tag = node.tag
+                    if event == 'start':
+                        nodes.append(node)
+                        if tag == 'Element':
+                            element_name = node.get('Name', '')
+                            elements.append(element_name)
+                            if ':' in element_name:
+                                components = result['components']
+                                components[element_name] = components.get(element_name, 0) + 1
+                            if len(elements) == 1 and element_name.lower() == 'apex:component':
+                                result['kind'] = 'component'
+                        elif tag == 'Attribute':
+                            attributes.append(node.get('Name', '').lower())
+                        elif tag == 'Expression':
+                            chains.append([])
+                        elif tag == 'Identifier' and chains:
+                            self._add_identifier(chains[-1], node, nodes)
+                        continue
+
+                    # end
+                    nodes.pop()
+                    if tag == 'Element':
+                        elements.pop()
+                    elif tag == 'Attribute':
+                        attributes.pop()
+                    elif tag == 'Expression':
+                        for chain in chains.pop():
+                            reference = '.'.join(chain)
+                            if reference not in references and len(references) < MAX_REFERENCES:
+                                references[reference] = chain
+                    elif tag == 'Text' and attributes and self._on_root_element(elements):
+                        attribute = attributes[-1]
+                        if attribute in _ROOT_ATTRIBUTES:
+                            text = node.get('Image') or node.text or ''
+                            root_attributes[attribute] = root_attributes.get(attribute, '') + text
+
+                    # 处理完的节点从父节点移除，保持内存有界
+                    node.clear()
+                    if nodes:
+                        nodes[-1].remove(node)
+
+        except Exception as e:
+            logger.error(f"Failed to parse Visualforce AST file {self.file_path}: {e}")
+            raise
+
+        result['controller'] = root_attributes.get('controller', '').strip() or None
+        result['standardController'] = root_attributes.get('standardcontroller', '').strip() or None
+        result['extensions'] = [
+            ext.strip() for ext in root_attributes.get('extensions', '').split(',') if ext.strip()
+        ]
+        result['references'] = list(references.values())
+        return result
+
+    @staticmethod
+    def _on_root_element(elements):
+        return len(elements) == 1 and elements[0].lower() in _ROOT_TAGS
+
+    @staticmethod
+    def _add_identifier(chain_list, node, nodes):
+        """
+        Identifier 直接位于 Expression 下时开始新的引用链，
+        位于 DotExpression 下时接在当前引用链后（account.Name）
+        """
+        image = node.get('Image') or ''
+        if not image:
+            return
+        parent = nodes[-2].tag if len(nodes) > 1 else None
+        if parent == 'DotExpression' and chain_list:
+            chain_list[-1].append(image)
+        elif parent == 'Expression':
+            chain_list.append([image])
+
+
+def parse_vf_ast_file(file_path, data=None):
+    """便捷函数：解析Visualforce AST文件"""
+    parser = VFASTParser(file_path, data)
+    return parser.parse()
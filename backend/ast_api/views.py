@@ -1,17 +1,27 @@
 """
 REST API视图
 """
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, renderer_classes
 from rest_framework.response import Response
 from rest_framework import status
 from .import_service import ast_import_service, ASTImportService
 from .unified_graph_service import unified_graph_service
 from .git_service import git_service, GitService
-from .models import ASTFile, Repository
+from .models import ASTFile, Repository, ComponentFile
 from .serializers import RepositorySerializer, ASTFileSerializer
+from .graph_format import encode_compact_graph
+from .renderers import FastJSONRenderer, iter_graph_json
+from .display_fields import compute_display_fields
+from .code_search import code_search_service
+from .source_cache import source_cache, make_etag
+from .inventory import record_analysis, record_inventory, scan_output_directory
+from .storage import layout_store
+from django.http import StreamingHttpResponse
 from pathlib import Path
 from django.conf import settings
+from django.db.models import Count
 import logging
+import re
 import threading
 import uuid
 
@@ -21,6 +31,9 @@ logger = logging.getLogger(__name__)
 analysis_progress = {}
 progress_lock = threading.Lock()
 
+# 图布局文件（相对于 layout_store）
+LAYOUT_FILE = 'graphs/layout.json'
+
 
 @api_view(['POST'])
 def import_ast_file(request):
@@ -46,6 +59,7 @@ def import_ast_file(request):
             status=status.HTTP_404_NOT_FOUND
         )
     
+    # 未指定 pending_calls 时导入后立即解析该文件的方法调用（结果中的 calls）
     result = ast_import_service.import_ast_file(str(path_obj))
     
     if result['success']:
@@ -82,65 +96,93 @@ def import_ast_directory(request):
     return Response(result, status=status.HTTP_200_OK)
 
 
+def _format_node(node):
+    """
+    将图数据库节点转换为前端需要的格式
+    本地图数据库在节点创建时已预先计算显示字段，这里直接透传；
+    Neo4j 或旧数据缺少显示字段时才现场计算
+    """
+    display = node if 'displayName' in node else compute_display_fields(node['labels'], node['properties'])
+    
+    return {
+        'id': node['id'],
+        'label': ', '.join(node['labels']),
+        'type': display['uiType'],
+        'name': display['displayName'],
+        'shortLabel': display['shortLabel'],
+        'properties': node['properties'],
+    }
+
+
+def _format_edge(edge):
+    """将图数据库关系转换为前端需要的格式"""
+    return {
+        'source': edge['source'],
+        'target': edge['target'],
+        'type': edge['type'],
+        'label': edge['type'],
+    }
+
+
+def _format_graph(graph_data):
+    """将图数据转换为前端需要的节点和边列表"""
+    nodes = [_format_node(node) for node in graph_data['nodes']]
+    edges = [_format_edge(edge) for edge in graph_data['edges']]
+    return nodes, edges
+
+
+def _wants_stream(request):
+    """客户端是否请求分块流式输出（?stream=true）"""
+    return request.query_params.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def _wants_compact(request):
+    """
+    客户端是否请求紧凑列式格式（?compact=true）
+    注意：不能使用 ?format=，该参数被 DRF 用于渲染器选择
+    """
+    return request.query_params.get('compact', '').lower() in ('1', 'true', 'yes')
+
+
 @api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
 def get_graph_data(request):
-    """获取完整的图数据用于可视化"""
+    """
+    获取完整的图数据用于可视化
+    
+    Query参数:
+        compact: 为 true 时返回紧凑列式格式（见 graph_format.py）
+        stream: 为 true 时分块流式输出完整格式，不在内存中拼接整个响应
+    """
     try:
+        # 先读取版本号，保证客户端后续增量同步不会漏掉读取期间的变更
+        graph_version = unified_graph_service.get_graph_version()
         graph_data = unified_graph_service.get_full_graph()
         
-        # 转换为前端需要的格式
-        nodes = []
-        for node in graph_data['nodes']:
-            node_obj = {
-                'id': node['id'],
-                'label': ', '.join(node['labels']),
-                'type': node['labels'][0] if node['labels'] else 'Unknown',
-                'properties': node['properties'],
+        if _wants_stream(request) and not _wants_compact(request):
+            return StreamingHttpResponse(
+                iter_graph_json(
+                    (_format_node(node) for node in graph_data['nodes']),
+                    (_format_edge(edge) for edge in graph_data['edges']),
+                    graph_version,
+                ),
+                content_type='application/json'
+            )
+        
+        nodes, edges = _format_graph(graph_data)
+        
+        if _wants_compact(request):
+            payload = encode_compact_graph(nodes, edges)
+        else:
+            payload = {
+                'nodes': nodes,
+                'edges': edges,
             }
-            
-            # 设置节点显示名称
-            if 'ApexClass' in node['labels']:
-                node_obj['name'] = node['properties'].get('name', 'Unknown')
-            elif 'ApexMethod' in node['labels'] or 'Method' in node['labels']:
-                node_obj['name'] = node['properties'].get('name', 'Unknown')
-            elif 'SOQLQuery' in node['labels']:
-                query = node['properties'].get('query', '')
-                node_obj['name'] = query[:50] + '...' if len(query) > 50 else query
-            elif 'DMLOperation' in node['labels']:
-                node_obj['name'] = node['properties'].get('operationType', 'DML')
-            elif 'LWCComponent' in node['labels']:
-                node_obj['name'] = node['properties'].get('name', 'Unknown')
-            elif 'JavaScriptClass' in node['labels']:
-                node_obj['name'] = node['properties'].get('name', 'Unknown')
-            elif 'JavaScriptMethod' in node['labels']:
-                node_obj['name'] = node['properties'].get('name', 'Unknown')
-            elif 'JavaScriptFunction' in node['labels']:
-                node_obj['name'] = node['properties'].get('name', 'Unknown')
-            elif 'Dependency' in node['labels']:
-                module = node['properties'].get('module', 'Unknown')
-                # 依赖模块名称简化显示
-                if '/' in module:
-                    node_obj['name'] = module.split('/')[-1]  # 取最后一部分
-                else:
-                    node_obj['name'] = module
-            else:
-                node_obj['name'] = node['properties'].get('name', 'Unknown')
-            
-            nodes.append(node_obj)
-        
-        edges = []
-        for edge in graph_data['edges']:
-            edges.append({
-                'source': edge['source'],
-                'target': edge['target'],
-                'type': edge['type'],
-                'label': edge['type'],
-            })
         
-        return Response({
-            'nodes': nodes,
-            'edges': edges,
-        })
+        if graph_version:
+            payload.update(graph_version)
+        
+        return Response(payload)
         
     except Exception as e:
         logger.error(f"Failed to get graph data: {e}")
@@ -151,10 +193,136 @@ def get_graph_data(request):
 
 
 @api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
+def get_graph_changes(request):
+    """
+    获取指定版本之后的图变更（增量同步）
+    
+    Query参数:
+        since: 客户端持有的图版本（必需）
+        epoch: 客户端持有的图实例标识
+        repository_id: 只返回该仓库的节点和关系变更
+    
+    变更日志无法覆盖客户端版本时返回 full_reload=true，客户端应全量重新加载
+    """
+    try:
+        since = int(request.query_params.get('since', ''))
+    except ValueError:
+        return Response(
+            {'error': 'since must be an integer'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    epoch = request.query_params.get('epoch')
+    changes = unified_graph_service.get_changes_since(since, epoch)
+    
+    if changes is None:
+        graph_version = unified_graph_service.get_graph_version() or {}
+        return Response({
+            'full_reload': True,
+            **graph_version,
+        })
+    
+    upserted_nodes = changes['nodes']['upserted']
+    upserted_edges = changes['edges']['upserted']
+    removed_edges = changes['edges']['removed']
+    repository_id = request.query_params.get('repository_id')
+    if repository_id:
+        repo = Repository.objects.filter(id=repository_id).first()
+        repo_name = repo.name if repo else None
+        upserted_nodes = [n for n in upserted_nodes if n['properties'].get('repository') == repo_name]
+        
+        # 与 get_repository_graph 一致：只保留两端节点都属于该仓库的关系；
+        # 已删除的端点无法判断所属仓库，删除关系时视为属于该仓库
+        graph_nodes = unified_graph_service.local_service.graph.nodes
+        
+        def in_repository(node_id, allow_missing=False):
+            node_data = graph_nodes.get(node_id)
+            if node_data is None:
+                return allow_missing
+            return node_data.get('repository') == repo_name
+        
+        upserted_edges = [
+            e for e in upserted_edges
+            if in_repository(e['source']) and in_repository(e['target'])
+        ]
+        removed_edges = [
+            e for e in removed_edges
+            if in_repository(e['source'], True) and in_repository(e['target'], True)
+        ]
+    
+    return Response({
+        'full_reload': False,
+        'version': changes['version'],
+        'epoch': changes['epoch'],
+        'nodes': {
+            'upserted': [_format_node(node) for node in upserted_nodes],
+            'removed': changes['nodes']['removed'],
+        },
+        'edges': {
+            'upserted': [_format_edge(edge) for edge in upserted_edges],
+            'removed': removed_edges,
+        },
+    })
+
+
+# 邻域查询允许的最大跳数和节点数
+NEIGHBORHOOD_MAX_DEPTH = 5
+NEIGHBORHOOD_NODE_LIMIT = 5000
+
+
+def _neighborhood_options(request, default_limit=500):
+    """
+    解析邻域查询参数
+    
+    Args:
+        request: 请求
+        default_limit: 未指定 limit 时的最大节点数，None 表示不限
+    
+    Returns:
+        (options, error)：参数字典，或错误信息
+    """
+    try:
+        depth = int(request.query_params.get('depth', 1))
+        max_nodes = request.query_params.get('limit')
+        max_nodes = int(max_nodes) if max_nodes is not None else default_limit
+    except ValueError:
+        return None, 'depth and limit must be integers'
+    
+    direction = request.query_params.get('direction', 'out')
+    if direction not in ('out', 'in', 'both'):
+        return None, 'direction must be one of: out, in, both'
+    
+    edge_types = request.query_params.get('edge_types', '')
+    
+    return {
+        'depth': max(1, min(depth, NEIGHBORHOOD_MAX_DEPTH)),
+        'direction': direction,
+        'edge_types': [t.strip() for t in edge_types.split(',') if t.strip()] or None,
+        'max_nodes': max(1, min(max_nodes, NEIGHBORHOOD_NODE_LIMIT)) if max_nodes is not None else None,
+    }, None
+
+
+@api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
 def get_class_graph(request, class_name):
-    """获取特定类的图数据"""
+    """
+    获取特定类的图数据
+    
+    Query参数:
+        depth: 展开跳数（默认 1，最大 5）
+        direction: out / in / both（默认 out）
+        edge_types: 逗号分隔的关系类型，只沿这些关系展开
+        limit: 返回的最大节点数（默认不限，与原来的接口一致；指定时最大 5000）
+    
+    返回值中的 truncated 表示是否因 limit 被截断
+    """
+    options, error = _neighborhood_options(request, default_limit=None)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    
     try:
-        graph_data = unified_graph_service.get_class_graph(class_name)
+        graph_data = unified_graph_service.get_class_graph(class_name, **options)
         return Response(graph_data)
     except Exception as e:
         logger.error(f"Failed to get class graph: {e}")
@@ -165,6 +333,202 @@ def get_class_graph(request, class_name):
 
 
 @api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
+def get_neighborhood(request):
+    """
+    获取任意节点的多跳邻域（前端格式），用于在图中按需展开节点
+    
+    Query参数:
+        node: 起始节点ID（必需），如 class:AccountService
+        depth / direction / edge_types: 同 get_class_graph
+        limit: 返回的最大节点数（默认 500，最大 5000），截断时 truncated 为 true
+    """
+    node_id = request.query_params.get('node')
+    if not node_id:
+        return Response({'error': 'node is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    options, error = _neighborhood_options(request)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        graph_data = unified_graph_service.get_neighborhood(node_id, **options)
+        nodes, edges = _format_graph(graph_data)
+        return Response({
+            'nodes': nodes,
+            'edges': edges,
+            'truncated': graph_data.get('truncated', False),
+        })
+    except Exception as e:
+        logger.error(f"Failed to get neighborhood: {e}")
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
+def get_impact_analysis(request):
+    """
+    影响分析：修改某个节点会影响哪些节点和入口点
+    
+    Query参数:
+        node: 节点ID（必需），如 method:AccountService.updateAccounts
+        direction: upstream（受影响的节点，默认）/ downstream（依赖的节点）
+        types: 逗号分隔的节点类型，只返回这些类型
+        limit: affected 列表的最大长度（默认 1000）
+    """
+    node_id = request.query_params.get('node')
+    if not node_id:
+        return Response({'error': 'node is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    direction = request.query_params.get('direction', 'upstream')
+    if direction not in ('upstream', 'downstream'):
+        return Response(
+            {'error': 'direction must be one of: upstream, downstream'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        limit = int(request.query_params.get('limit', 1000))
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    node_types = request.query_params.get('types', '')
+    
+    try:
+        result = unified_graph_service.get_impact(
+            node_id,
+            direction=direction,
+            node_types=[t.strip() for t in node_types.split(',') if t.strip()] or None,
+            limit=max(0, limit),
+        )
+    except Exception as e:
+        logger.error(f"Failed to run impact analysis: {e}")
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    if result is None:
+        return Response({'error': f'Node not found: {node_id}'}, status=status.HTTP_404_NOT_FOUND)
+    
+    return Response(result)
+
+
+@api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
+def search_nodes(request):
+    """
+    搜索类、方法、组件和 SOQL
+    
+    Query参数:
+        q: 查询串（必需），支持前缀和驼峰子词，如 getPaged、property list
+        types: 逗号分隔的节点类型，只返回这些类型
+        limit: 返回的最大结果数（默认 50）
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        limit = int(request.query_params.get('limit', 50))
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    node_types = request.query_params.get('types', '')
+    result = unified_graph_service.search(
+        query,
+        node_types=[t.strip() for t in node_types.split(',') if t.strip()] or None,
+        limit=max(0, limit),
+    )
+    if result is None:
+        return Response(
+            {'error': 'Local graph service not available'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    
+    return Response({'query': query, **result})
+
+
+@api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
+def list_sobjects(request):
+    """列出 SOQL/DML 中引用的所有 sObject 及其查询数、字段数、读写方法数"""
+    index = unified_graph_service.get_sobject_index()
+    if index is None:
+        return Response(
+            {'error': 'Local graph service not available'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    
+    return Response({'objects': index.objects()})
+
+
+@api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
+def get_sobject_usage(request, sobject):
+    """
+    查询某个 sObject 的使用情况
+    
+    Query参数:
+        field: 字段名，如 StageName；指定时只返回引用该字段的 SOQL，
+               不指定时返回对象上的所有 SOQL、DML 以及读取/写入该对象的方法
+    """
+    index = unified_graph_service.get_sobject_index()
+    if index is None:
+        return Response(
+            {'error': 'Local graph service not available'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    
+    field = request.query_params.get('field') or None
+    graph = unified_graph_service.local_service.graph
+    
+    queries = []
+    for node_id in index.lookup(sobject, field):
+        node_data = graph.nodes.get(node_id)
+        if node_data is None:
+            continue
+        queries.append({
+            'id': node_id,
+            'className': node_data.get('className'),
+            'methodName': node_data.get('methodName'),
+            'triggerName': node_data.get('triggerName'),
+            'query': node_data.get('query'),
+        })
+    
+    result = {
+        'sObject': index.object_name(sobject),
+        'field': field,
+        'fields': index.fields(sobject),
+        'queries': queries,
+    }
+    
+    # 对象级读写方法（字段级查询只涉及 SOQL）
+    if field is None:
+        dml_operations = []
+        for node_id in index.dml_operations(sobject):
+            node_data = graph.nodes.get(node_id)
+            if node_data is None:
+                continue
+            dml_operations.append({
+                'id': node_id,
+                'className': node_data.get('className'),
+                'methodName': node_data.get('methodName'),
+                'triggerName': node_data.get('triggerName'),
+                'operationType': node_data.get('operationType'),
+            })
+        result['dmlOperations'] = dml_operations
+        result['readers'] = index.readers(sobject)
+        result['writers'] = index.writers(sobject)
+    
+    return Response(result)
+
+
+@api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
 def get_statistics(request):
     """获取数据库统计信息"""
     try:
@@ -222,75 +586,101 @@ def get_statistics(request):
 
 
 @api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
 def list_imported_files(request):
-    """列出所有已导入的文件（按仓库分组）"""
-    import os
-    from collections import defaultdict
+    """
+    列出所有已分析的组件（按仓库分组），数据来自分析时记录的 ComponentFile 表
+    
+    Query参数:
+        repo: 仓库ID，只返回该仓库
+        type: 组件类型（apex / visualforce / lwc），只返回该类型
+        page: 页码（从 1 开始，默认 1）
+        page_size: 每个仓库每页的组件数，不指定时返回全部
+    """
+    try:
+        page = int(request.query_params.get('page', 1))
+        page_size = request.query_params.get('page_size')
+        page_size = int(page_size) if page_size else None
+    except ValueError:
+        return Response({'error': 'page and page_size must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    if page < 1 or (page_size is not None and page_size < 1):
+        return Response({'error': 'page and page_size must be positive'}, status=status.HTTP_400_BAD_REQUEST)
     
-    # 获取所有仓库
     repositories = Repository.objects.all()
+    repo_id = request.query_params.get('repo')
+    if repo_id:
+        repositories = repositories.filter(id=repo_id)
+    component_type = request.query_params.get('type')
+    
+    # 升级前分析过的仓库还没有清单，从输出目录补录一次；
+    # 没有输出目录的仓库同样标记，之后的请求不再访问文件系统
+    repositories = list(repositories)
+    for repo in repositories:
+        if not repo.inventory_recorded:
+            output_dir = git_service.output_dir / 'ast' / repo.name
+            if output_dir.exists():
+                record_inventory(repo, scan_output_directory(output_dir))
+            else:
+                Repository.objects.filter(pk=repo.pk).update(inventory_recorded=True)
+    
+    # 所有仓库的组件数一次查询
+    counts = ComponentFile.objects.filter(repository__in=repositories)
+    if component_type:
+        counts = counts.filter(component_type=component_type)
+    totals = dict(
+        counts.values('repository_id').annotate(count=Count('id')).values_list('repository_id', 'count')
+    )
     
     result = {
         'repositories': []
     }
     
     for repo in repositories:
-        repo_data = {
+        total = totals.get(repo.id, 0)
+        if not total:
+            components = ComponentFile.objects.none()
+        else:
+            components = ComponentFile.objects.filter(repository=repo)
+            if component_type:
+                components = components.filter(component_type=component_type)
+        if page_size is not None:
+            offset = (page - 1) * page_size
+            components = components[offset:offset + page_size]
+        
+        grouped = {
+            'apex': [],
+            'trigger': [],
+            'visualforce': [],
+            'lwc': []
+        }
+        for component in components.values(
+            'component_type', 'name', 'ast_file', 'source_file', 'info_file', 'size', 'sha1'
+        ):
+            item = {
+                'name': component['name'],
+                'ast_file': component['ast_file'],
+                'source_file': component['source_file'],
+                'type': component['component_type'],
+                'size': component['size'],
+                'sha1': component['sha1'],
+            }
+            if component['info_file']:
+                item['info_file'] = component['info_file']
+            grouped.setdefault(component['component_type'], []).append(item)
+        
+        result['repositories'].append({
             'id': repo.id,
             'name': repo.name,
             'url': repo.url,
             'branch': repo.branch,
             'is_active': repo.is_active,
-            'components': {
-                'apex': [],
-                'visualforce': [],
-                'lwc': []
-            }
-        }
-        
-        # 获取输出目录
-        output_dir = Path(settings.BASE_DIR).parent / 'output' / 'ast' / repo.name
-        
-        # Apex 文件
-        apex_dir = output_dir / 'apex'
-        if apex_dir.exists():
-            for xml_file in apex_dir.glob('*_ast.xml'):
-                file_name = xml_file.stem.replace('_ast', '')
-                source_file = xml_file.with_suffix('.cls')
-                repo_data['components']['apex'].append({
-                    'name': file_name,
-                    'ast_file': str(xml_file),
-                    'source_file': str(source_file) if source_file.exists() else None,
-                    'type': 'apex'
-                })
-        
-        # Visualforce 文件
-        vf_dir = output_dir / 'visualforce'
-        if vf_dir.exists():
-            for xml_file in vf_dir.glob('*_ast.xml'):
-                file_name = xml_file.stem.replace('_ast', '')
-                source_file = xml_file.with_suffix('.page')
-                repo_data['components']['visualforce'].append({
-                    'name': file_name,
-                    'ast_file': str(xml_file),
-                    'source_file': str(source_file) if source_file.exists() else None,
-                    'type': 'visualforce'
-                })
-        
-        # LWC 组件
-        lwc_dir = output_dir / 'lwc'
-        if lwc_dir.exists():
-            for info_file in lwc_dir.glob('*_info.json'):
-                comp_name = info_file.stem.replace('_info', '')
-                ast_file = lwc_dir / f'{comp_name}_ast.xml'
-                repo_data['components']['lwc'].append({
-                    'name': comp_name,
-                    'ast_file': str(ast_file) if ast_file.exists() else None,
-                    'info_file': str(info_file),
-                    'type': 'lwc'
-                })
-        
-        result['repositories'].append(repo_data)
+            'components': grouped,
+            'pagination': {
+                'page': page,
+                'page_size': page_size,
+                'total': total,
+            },
+        })
     
     return Response(result)
 
@@ -316,6 +706,7 @@ def clone_repository(request):
     repo_url = request.data.get('repo_url')
     branch = request.data.get('branch', 'main')
     force = request.data.get('force', False)
+    sparse = request.data.get('sparse')
     
     if not repo_url:
         return Response(
@@ -323,7 +714,7 @@ def clone_repository(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    result = git_service.clone_repository(repo_url, branch, force)
+    result = git_service.clone_repository(repo_url, branch, force, sparse)
     
     if result['success']:
         return Response(result, status=status.HTTP_201_CREATED)
@@ -344,6 +735,7 @@ def analyze_repository(request):
         )
     
     result = git_service.analyze_repository(repo_name, apex_dir)
+    record_analysis(Repository.objects.filter(name=repo_name).first(), result)
     
     if result['success']:
         return Response(result, status=status.HTTP_200_OK)
@@ -438,6 +830,7 @@ def _process_clone_and_analyze(task_id, repo_url, branch, apex_dir, force, auto_
             return
         
         logger.info(f"[{task_id}] Analysis complete: {analyze_result.get('analyzed', 0)} files")
+        record_analysis(Repository.objects.filter(name=repo_name).first(), analyze_result)
         update_progress(task_id, 'analyzed', f'Analysis complete: {analyze_result.get("analyzed", 0)} files', 80, 100)
         
         # 步骤3: 自动导入（如果启用）
@@ -459,68 +852,97 @@ def _process_clone_and_analyze(task_id, repo_url, branch, apex_dir, force, auto_
                 )
                 if created:
                     logger.info(f"[{task_id}] Created repository: {repo_name}")
+                    record_analysis(repo_obj, analyze_result)
                 else:
                     logger.info(f"[{task_id}] Using existing repository: {repo_name}")
                 
                 import_service = ASTImportService()
+                # 本次导入收集的等待解析的方法调用，全部导入后统一解析
+                pending_calls = {}
                 
-                # 各コンポーネントタイプをインポート
-                import_results = []
-                total_imported = 0
+                # 批量导入期间只在退出时写一次实体/关系文件
+                with unified_graph_service.batch():
+                    # 各コンポーネントタイプをインポート
+                    import_results = []
+                    total_imported = 0
                 
-                # Apexファイルのインポート
-                if analyze_result.get('apex') and analyze_result['apex'].get('success'):
-                    logger.info(f"[{task_id}] Importing Apex files...")
-                    for file_info in analyze_result['apex'].get('analyzed_files', []):
-                        # ソースコードパスを取得（source_fileまたはinput_file）
-                        source_path = file_info.get('source_file') or file_info.get('input_file')
-                        result = import_service.import_ast_file(
-                            file_info['output_file'], 
-                            repo_obj,
-                            source_code_path=source_path
-                        )
-                        import_results.append(result)
-                        if result.get('success'):
-                            total_imported += 1
-                    logger.info(f"[{task_id}] Apex import: {total_imported} files")
+                    # Apexファイルのインポート
+                    if analyze_result.get('apex') and analyze_result['apex'].get('success'):
+                        logger.info(f"[{task_id}] Importing Apex files...")
+                        for file_info in analyze_result['apex'].get('analyzed_files', []):
+                            # ソースコードパスを取得（source_fileまたはinput_file）
+                            source_path = file_info.get('source_file') or file_info.get('input_file')
+                            result = import_service.import_ast_file(
+                                file_info['output_file'], 
+                                repo_obj,
+                                source_code_path=source_path,
+                                pending_calls=pending_calls
+                            )
+                            import_results.append(result)
+                            if result.get('success'):
+                                total_imported += 1
+                        logger.info(f"[{task_id}] Apex import: {total_imported} files")
                 
-                # Visualforceファイルのインポート
-                if analyze_result.get('visualforce') and analyze_result['visualforce'].get('success'):
-                    logger.info(f"[{task_id}] Importing Visualforce files...")
-                    vf_count = 0
-                    for file_info in analyze_result['visualforce'].get('analyzed_files', []):
-                        source_path = file_info.get('source_file') or file_info.get('input_file')
-                        result = import_service.import_ast_file(
-                            file_info['output_file'], 
-                            repo_obj,
-                            source_code_path=source_path
-                        )
-                        import_results.append(result)
-                        if result.get('success'):
-                            vf_count += 1
-                            total_imported += 1
-                    logger.info(f"[{task_id}] Visualforce import: {vf_count} files")
+                    # Apexトリガーのインポート
+                    if analyze_result.get('trigger') and analyze_result['trigger'].get('success'):
+                        logger.info(f"[{task_id}] Importing Apex triggers...")
+                        trigger_count = 0
+                        for file_info in analyze_result['trigger'].get('analyzed_files', []):
+                            result = import_service.import_ast_file(
+                                file_info['output_file'],
+                                repo_obj,
+                                source_code_path=file_info.get('source_file'),
+                                pending_calls=pending_calls
+                            )
+                            import_results.append(result)
+                            if result.get('success'):
+                                trigger_count += 1
+                                total_imported += 1
+                        logger.info(f"[{task_id}] Trigger import: {trigger_count} files")
                 
-                # LWCファイルのインポート
-                if analyze_result.get('lwc') and analyze_result['lwc'].get('success'):
-                    logger.info(f"[{task_id}] Importing LWC files...")
-                    lwc_count = 0
-                    for comp_info in analyze_result['lwc'].get('analyzed_components', []):
-                        # LWCはASTファイルがある場合のみインポート
-                        details = comp_info.get('details', {})
-                        if details.get('ast_file'):
-                            # LWCのソースコードパス（JavaScriptファイル）
-                            source_path = details.get('js_source')
+                    # Visualforceファイルのインポート
+                    if analyze_result.get('visualforce') and analyze_result['visualforce'].get('success'):
+                        logger.info(f"[{task_id}] Importing Visualforce files...")
+                        vf_count = 0
+                        for file_info in analyze_result['visualforce'].get('analyzed_files', []):
+                            source_path = file_info.get('source_file') or file_info.get('input_file')
                             result = import_service.import_ast_file(
-                                details['ast_file'], 
+                                file_info['output_file'], 
                                 repo_obj,
-                                source_code_path=source_path
+                                source_code_path=source_path,
+                                pending_calls=pending_calls
                             )
                             import_results.append(result)
                             if result.get('success'):
-                                lwc_count += 1
+                                vf_count += 1
                                 total_imported += 1
-                    logger.info(f"[{task_id}] LWC import: {lwc_count} components")
+                        logger.info(f"[{task_id}] Visualforce import: {vf_count} files")
+                
+                    # LWCファイルのインポート
+                    if analyze_result.get('lwc') and analyze_result['lwc'].get('success'):
+                        logger.info(f"[{task_id}] Importing LWC files...")
+                        lwc_count = 0
+                        for comp_info in analyze_result['lwc'].get('analyzed_components', []):
+                            # LWCはASTファイルがある場合のみインポート
+                            details = comp_info.get('details', {})
+                            if details.get('ast_file'):
+                                # LWCのソースコードパス（JavaScriptファイル）
+                                source_path = details.get('js_source')
+                                result = import_service.import_ast_file(
+                                    details['ast_file'], 
+                                    repo_obj,
+                                    source_code_path=source_path,
+                                    pending_calls=pending_calls
+                                )
+                                import_results.append(result)
+                                if result.get('success'):
+                                    lwc_count += 1
+                                    total_imported += 1
+                        logger.info(f"[{task_id}] LWC import: {lwc_count} components")
+                
+                    # 所有类导入完成后统一解析方法调用
+                    call_summary = import_service.resolve_method_calls(repo_obj, pending_calls)
+                    logger.info(f"[{task_id}] Method calls: {call_summary['resolved']} resolved, {call_summary['unresolved']} unresolved")
                 
                 successful = sum(1 for r in import_results if r.get('success'))
                 failed = len(import_results) - successful
@@ -623,22 +1045,8 @@ def save_graph_layout(request):
     try:
         layout_data = request.data.get('layout', {})
         
-        # 获取数据存储路径
-        if settings.USE_CLOUD_STORAGE:
-            import sys
-            sys.path.insert(0, str(settings.BASE_DIR.parent))
-            from cloud_storage import get_data_path
-            graph_dir = get_data_path('graph_data')
-        else:
-            graph_dir = Path(settings.BASE_DIR).parent / 'graphdata' / 'graphs'
-        
-        graph_dir.mkdir(parents=True, exist_ok=True)
-        layout_file = graph_dir / 'layout.json'
-        
-        # 保存布局数据
-        import json
-        with open(layout_file, 'w', encoding='utf-8') as f:
-            json.dump(layout_data, f, ensure_ascii=False, indent=2)
+        # 保存布局数据（Cloud Storage 模式下写入本地缓存并异步同步）
+        layout_file = layout_store.write_json(LAYOUT_FILE, layout_data, indent=2)
         
         logger.info(f"Graph layout saved to {layout_file}")
         return Response({
@@ -657,30 +1065,16 @@ def save_graph_layout(request):
 def load_graph_layout(request):
     """加载图布局"""
     try:
-        # 获取数据存储路径
-        if settings.USE_CLOUD_STORAGE:
-            import sys
-            sys.path.insert(0, str(settings.BASE_DIR.parent))
-            from cloud_storage import get_data_path
-            graph_dir = get_data_path('graph_data')
-        else:
-            graph_dir = Path(settings.BASE_DIR).parent / 'graphdata' / 'graphs'
-        
-        layout_file = graph_dir / 'layout.json'
-        
-        if not layout_file.exists():
+        # 读取布局数据（缓存未命中时从持久目录读取）
+        layout_data = layout_store.read_json(LAYOUT_FILE)
+        if layout_data is None:
             return Response({
                 'success': False,
                 'layout': None,
                 'message': 'No saved layout found'
             })
         
-        # 读取布局数据
-        import json
-        with open(layout_file, 'r', encoding='utf-8') as f:
-            layout_data = json.load(f)
-        
-        logger.info(f"Graph layout loaded from {layout_file}")
+        logger.info(f"Graph layout loaded from {layout_store.path(LAYOUT_FILE)}")
         return Response({
             'success': True,
             'layout': layout_data
@@ -707,7 +1101,7 @@ def manage_repositories(request):
     POST: 添加新仓库
     """
     if request.method == 'GET':
-        repos = Repository.objects.all()
+        repos = RepositorySerializer.with_counts(Repository.objects.all())
         serializer = RepositorySerializer(repos, many=True)
         return Response({
             'success': True,
@@ -836,6 +1230,7 @@ def clone_and_register_repository(request):
     force = request.data.get('force', False)
     auto_import = request.data.get('auto_import', True)
     set_active = request.data.get('set_active', True)
+    sparse = request.data.get('sparse')
     
     if not repo_url:
         return Response({
@@ -844,7 +1239,7 @@ def clone_and_register_repository(request):
         }, status=status.HTTP_400_BAD_REQUEST)
     
     # 步骤1: 克隆仓库
-    clone_result = git_service.clone_repository(repo_url, branch, force)
+    clone_result = git_service.clone_repository(repo_url, branch, force, sparse)
     if not clone_result['success']:
         return Response(clone_result, status=status.HTTP_400_BAD_REQUEST)
     
@@ -889,20 +1284,18 @@ def clone_and_register_repository(request):
     
     # 步骤3: 分析代码
     analyze_result = git_service.analyze_repository(repo_name, apex_dir)
+    record_analysis(repo, analyze_result)
     
     # 步骤4: 自动导入(如果启用)
     import_result = None
-    if auto_import and analyze_result.get('success') and analyze_result.get('analyzed', 0) > 0:
-        if settings.USE_CLOUD_STORAGE:
-            import sys
-            sys.path.insert(0, str(settings.BASE_DIR.parent))
-            from cloud_storage import get_data_path
-            output_ast_path = get_data_path('ast') / repo_name
-        else:
-            output_ast_path = settings.BASE_DIR.parent / 'output' / 'ast' / repo_name
-        
-        if output_ast_path.exists():
-            import_result = ast_import_service.import_directory(str(output_ast_path), repository=repo)
+    if auto_import and analyze_result.get('success') and (analyze_result.get('analyzed', 0) > 0 or analyze_result.get('trigger')):
+        # Apex AST 输出目录（已打包时 import_directory 从 apex.pack 读取）
+        output_ast_path = git_service.output_dir / 'ast' / repo_name / 'apex'
+        import_result = ast_import_service.import_directory(str(output_ast_path), repository=repo)
+        # 触发器在类之后导入，触发器中的 Class.method 调用可以解析到已导入的方法
+        if analyze_result.get('trigger'):
+            trigger_ast_path = git_service.output_dir / 'ast' / repo_name / 'trigger'
+            import_result['trigger'] = ast_import_service.import_directory(str(trigger_ast_path), repository=repo)
     
     return Response({
         'success': True,
@@ -915,6 +1308,7 @@ def clone_and_register_repository(request):
 
 
 @api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
 def get_repository_graph_data(request, repo_id):
     """获取指定仓库的图数据"""
     try:
@@ -928,8 +1322,15 @@ def get_repository_graph_data(request, repo_id):
     
     try:
         # 获取该仓库的图数据
+        graph_version = unified_graph_service.get_graph_version()
         graph_data = unified_graph_service.get_repository_graph(repo.name)
         
+        if _wants_compact(request):
+            graph_data = encode_compact_graph(*_format_graph(graph_data))
+        
+        if graph_version:
+            graph_data.update(graph_version)
+        
         return Response({
             'success': True,
             'repository': {
@@ -946,61 +1347,107 @@ def get_repository_graph_data(request, repo_id):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def _resolve_source_path(class_name):
+    """
+    查找类的源文件路径（一次查询同时获取活动仓库和 AST 文件记录）
+    
+    Returns:
+        (源文件路径, 错误信息)
+    """
+    record = ASTFile.objects.filter(
+        repository__is_active=True,
+        class_name=class_name
+    ).values_list('source_code_path', 'repository__name', 'repository__apex_dir').first()
+    
+    if not record:
+        if not Repository.objects.filter(is_active=True).exists():
+            return None, 'No active repository found'
+        return None, f'Class {class_name} not found in active repository'
+    
+    source_code_path, repo_name, apex_dir = record
+    if source_code_path and source_cache.stat(source_code_path):
+        return source_code_path, None
+    
+    # 尝试从项目目录中查找源代码
+    project_dir = Path(settings.BASE_DIR.parent) / 'project' / repo_name
+    possible_paths = [
+        project_dir / apex_dir / f'{class_name}.cls',
+        project_dir / 'force-app' / 'main' / 'default' / 'classes' / f'{class_name}.cls',
+    ]
+    for path in possible_paths:
+        if path.exists():
+            return str(path), None
+    
+    return None, f'Source code file not found for class {class_name}'
+
+
+def _line_param(request, name):
+    value = request.query_params.get(name)
+    if value in (None, ''):
+        return None
+    line = int(value)
+    if line < 1:
+        raise ValueError
+    return line
+
+
 @api_view(['GET'])
 def get_source_code(request, class_name):
-    """获取指定类的源代码"""
+    """
+    获取指定类的源代码
+    
+    源文件内容按 (路径, mtime, size) 缓存；响应带 ETag，
+    客户端携带 If-None-Match 且文件未变化时返回 304
+    
+    Query参数:
+        start: 起始行（从 1 开始，可选）
+        end: 结束行（包含，可选）
+    """
     try:
-        # 获取当前活动的仓库
-        repo = Repository.objects.filter(is_active=True).first()
-        if not repo:
+        try:
+            start = _line_param(request, 'start')
+            end = _line_param(request, 'end')
+        except ValueError:
             return Response({
                 'success': False,
-                'error': 'No active repository found'
-            }, status=status.HTTP_404_NOT_FOUND)
+                'error': 'start and end must be positive integers'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        # 查找AST文件记录
-        ast_file = ASTFile.objects.filter(
-            repository=repo,
-            class_name=class_name
-        ).first()
+        source_path, error = _resolve_source_path(class_name)
+        if error:
+            return Response({
+                'success': False,
+                'error': error
+            }, status=status.HTTP_404_NOT_FOUND)
         
-        if not ast_file:
+        stat = source_cache.stat(source_path)
+        if stat is None:
             return Response({
                 'success': False,
-                'error': f'Class {class_name} not found in repository {repo.name}'
+                'error': f'Source code file not found for class {class_name}'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        # 如果有源代码路径,读取源代码
-        if ast_file.source_code_path and Path(ast_file.source_code_path).exists():
-            with open(ast_file.source_code_path, 'r', encoding='utf-8') as f:
-                source_code = f.read()
-        else:
-            # 尝试从项目目录中查找源代码
-            project_dir = Path(settings.BASE_DIR.parent) / 'project' / repo.name
-            possible_paths = [
-                project_dir / repo.apex_dir / f'{class_name}.cls',
-                project_dir / 'force-app' / 'main' / 'default' / 'classes' / f'{class_name}.cls',
-            ]
-            
-            source_code = None
-            for path in possible_paths:
-                if path.exists():
-                    with open(path, 'r', encoding='utf-8') as f:
-                        source_code = f.read()
-                    break
-            
-            if not source_code:
-                return Response({
-                    'success': False,
-                    'error': f'Source code file not found for class {class_name}'
-                }, status=status.HTTP_404_NOT_FOUND)
+        ranged = start is not None or end is not None
+        etag = make_etag(stat, *((start or 1, end or '') if ranged else ()))
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag in request.headers.get('If-None-Match', ''):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
         
-        return Response({
+        entry = source_cache.get(source_path, stat)
+        result = {
             'success': True,
             'class_name': class_name,
-            'source_code': source_code,
-            'file_path': ast_file.source_code_path or '',
-        })
+            'file_path': source_path,
+            'total_lines': entry.line_count,
+        }
+        if ranged:
+            result['start'] = start or 1
+            result['end'] = min(end or entry.line_count, entry.line_count)
+            result['source_code'] = entry.lines(result['start'], result['end'])
+        else:
+            result['source_code'] = entry.text
+        
+        return Response(result, headers=headers)
         
     except Exception as e:
         logger.error(f"Failed to get source code: {e}")
@@ -1010,4 +1457,63 @@ def get_source_code(request, class_name):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-
+@api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
+def search_code(request):
+    """
+    在导入仓库的源代码中搜索（Apex 类、Visualforce 页面、LWC 文件）
+    
+    Query参数:
+        q: 字面查询串（必需），用于三元组索引筛选和逐行匹配
+        regex: 可选正则表达式，命中行还需匹配该正则
+        repo: 仓库名，默认为当前活动仓库
+        case: true 表示区分大小写（默认不区分）
+        limit: 返回的最大匹配行数（默认 100）
+    """
+    query = request.query_params.get('q', '')
+    if not query.strip():
+        return Response({'success': False, 'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    case_sensitive = request.query_params.get('case', '').lower() == 'true'
+    pattern = None
+    regex = request.query_params.get('regex')
+    if regex:
+        try:
+            pattern = re.compile(regex, 0 if case_sensitive else re.IGNORECASE)
+        except re.error as e:
+            return Response(
+                {'success': False, 'error': f'Invalid regex: {e}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+    try:
+        limit = int(request.query_params.get('limit', 100))
+    except ValueError:
+        return Response({'success': False, 'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    repo_name = request.query_params.get('repo')
+    if not repo_name:
+        repo = Repository.objects.filter(is_active=True).first()
+        if not repo:
+            return Response({
+                'success': False,
+                'error': 'No active repository found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        repo_name = repo.name
+    
+    try:
+        result = code_search_service.search(
+            git_service.output_dir / 'ast' / repo_name,
+            query,
+            pattern=pattern,
+            case_sensitive=case_sensitive,
+            limit=max(0, limit),
+        )
+    except Exception as e:
+        logger.error(f"Failed to search code: {e}")
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    return Response({'success': True, 'repository': repo_name, 'query': query, **result})
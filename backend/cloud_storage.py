@@ -3,20 +3,36 @@ Cloud Storage Configuration for GCP
 管理Cloud Storage的挂载和数据持久化
 """
 import os
+import shutil
+import signal
+import sqlite3
+import sys
+import time
+import logging
 from pathlib import Path
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
 # Cloud Storage bucket name (需要在GCP中创建)
 BUCKET_NAME = os.environ.get('GCS_BUCKET_NAME', 'pmd-salesforce-data')
 
 # 本地数据目录 (在生产环境中会被挂载为Cloud Storage volume)
-DATA_DIR = Path('/data')
+DATA_DIR = Path(os.environ.get('DATA_DIR', '/data'))
 
 # 数据子目录
 AST_DIR = DATA_DIR / 'ast'
 DATABASE_DIR = DATA_DIR / 'database'
 GRAPH_DIR = DATA_DIR / 'graph'
 
+# SQLite 数据库放在容器本地磁盘上运行（Cloud Storage FUSE 不支持 WAL 所需的共享内存，
+# 且每次 fsync 都是一次远程写入），DATABASE_DIR 只保存定期备份的快照
+LOCAL_DB_DIR = Path(os.environ.get('LOCAL_DB_DIR', '/var/lib/pmd-analyzer'))
+DB_FILE_NAME = 'db.sqlite3'
+
+# 数据库快照间隔（秒）
+DB_BACKUP_INTERVAL = int(os.environ.get('DB_BACKUP_INTERVAL', '300'))
+
 # 兼容旧路径的映射
 LEGACY_PATHS = {
     'output/ast': AST_DIR,
@@ -33,6 +49,7 @@ def ensure_directories():
         GRAPH_DIR,
         GRAPH_DIR / 'exports',
         GRAPH_DIR / 'graphs',
+        LOCAL_DB_DIR,
     ]
     
     for directory in directories:
@@ -62,10 +79,139 @@ def get_data_path(path_type):
 
 
 def get_db_path():
-    """获取数据库文件路径"""
-    return DATABASE_DIR / 'db.sqlite3'
+    """获取数据库文件路径（本地磁盘）"""
+    return LOCAL_DB_DIR / DB_FILE_NAME
+
+
+def get_db_snapshot_path():
+    """获取数据库快照路径（Cloud Storage）"""
+    return DATABASE_DIR / DB_FILE_NAME
+
+
+def backup_database(source=None, snapshot=None):
+    """
+    使用 SQLite 在线备份 API 生成一致的快照并上传到 Cloud Storage
+    
+    先备份到本地临时文件，再整体复制到挂载目录并重命名，
+    避免逐页写入 FUSE，也避免读者看到写了一半的快照
+    
+    Returns:
+        bool: 是否生成了快照
+    """
+    source = Path(source or get_db_path())
+    snapshot = Path(snapshot or get_db_snapshot_path())
+    if not source.exists():
+        return False
+    
+    local_copy = source.with_name(source.name + '.backup')
+    remote_tmp = snapshot.with_name(snapshot.name + '.tmp')
+    try:
+        src = sqlite3.connect(str(source))
+        dst = sqlite3.connect(str(local_copy))
+        try:
+            with dst:
+                src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+        
+        snapshot.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(local_copy, remote_tmp)
+        os.replace(remote_tmp, snapshot)
+        logger.info(f"Database snapshot saved to {snapshot}")
+        return True
+    finally:
+        local_copy.unlink(missing_ok=True)
+
+
+def restore_database(target=None, snapshot=None, force=False):
+    """
+    启动时从 Cloud Storage 快照恢复本地数据库
+    
+    Args:
+        force: 本地数据库已存在时也覆盖
+    
+    Returns:
+        bool: 是否恢复了快照
+    """
+    target = Path(target or get_db_path())
+    snapshot = Path(snapshot or get_db_snapshot_path())
+    if not snapshot.exists() or (target.exists() and not force):
+        return False
+    
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + '.restore')
+    shutil.copyfile(snapshot, tmp)
+    # 旧的 WAL/SHM 文件属于被替换的数据库，必须一起删除
+    for suffix in ('-wal', '-shm'):
+        Path(str(target) + suffix).unlink(missing_ok=True)
+    os.replace(tmp, target)
+    logger.info(f"Database restored from {snapshot}")
+    return True
+
+
+def _database_signature(path):
+    """数据库及其 WAL 文件的 (mtime, size)，用于判断是否有新的写入"""
+    signature = []
+    for candidate in (Path(path), Path(str(path) + '-wal')):
+        try:
+            stat = candidate.stat()
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def run_backup_loop(interval=None):
+    """
+    定期生成数据库快照（由 supervisord 作为独立进程运行）
+    只有数据库有新的写入时才备份；收到 SIGTERM 时做最后一次备份后退出
+    """
+    interval = interval or DB_BACKUP_INTERVAL
+    source = get_db_path()
+    last_signature = _database_signature(source)
+    stopping = []
+    
+    def _stop(signum, frame):
+        stopping.append(signum)
+    
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    
+    logger.info(f"Database backup loop started (interval {interval}s)")
+    while True:
+        deadline = time.monotonic() + interval
+        while not stopping and time.monotonic() < deadline:
+            time.sleep(1)
+        
+        signature = _database_signature(source)
+        if signature != last_signature:
+            try:
+                backup_database(source)
+                last_signature = signature
+            except Exception as e:
+                logger.error(f"Database backup failed: {e}")
+        
+        if stopping:
+            return
 
 
 # 初始化目录（在模块导入时执行）
 if os.environ.get('USE_CLOUD_STORAGE', 'false').lower() == 'true':
     ensure_directories()
+
+
+if __name__ == '__main__':
+    # 用法: python cloud_storage.py restore | backup | backup-loop
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    command = sys.argv[1] if len(sys.argv) > 1 else ''
+    if command == 'restore':
+        restored = restore_database()
+        print('Database restored from snapshot' if restored else 'No snapshot restored')
+    elif command == 'backup':
+        backup_database()
+    elif command == 'backup-loop':
+        run_backup_loop()
+    else:
+        print('Usage: python cloud_storage.py restore | backup | backup-loop')
+        sys.exit(1)
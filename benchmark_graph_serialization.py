@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+"""
+图数据序列化基准测试
+对比 stdlib json / orjson 渲染器、完整格式 / 紧凑格式在合成大图上的
+序列化耗时和传输字节数（原始 / gzip / brotli）
+
+用法:
+    python benchmark_graph_serialization.py [节点数]
+"""
+import gzip
+import os
+import sys
+import time
+from pathlib import Path
+
+backend_dir = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'apex_graph.settings')
+
+import django
+django.setup()
+
+from rest_framework.renderers import JSONRenderer
+from ast_api.renderers import FastJSONRenderer, orjson
+from ast_api.graph_format import encode_compact_graph
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def build_synthetic_graph(node_count):
+    """生成与前端格式一致的合成图：类 -> 方法 -> SOQL/DML"""
+    nodes = []
+    edges = []
+    repositories = [f'repo-{i}' for i in range(5)]
+    created_at = '2025-01-01T00:00:00.000000'
+
+    class_count = max(1, node_count // 20)
+    for c in range(class_count):
+        if len(nodes) >= node_count:
+            break
+        class_name = f'AccountService{c}'
+        repository = repositories[c % len(repositories)]
+        class_id = f'class:{class_name}'
+        nodes.append({
+            'id': class_id,
+            'label': 'ApexClass',
+            'type': 'ApexClass',
+            'name': class_name,
+            'properties': {
+                'name': class_name,
+                'simpleName': class_name,
+                'definingType': class_name,
+                'public': True,
+                'withSharing': True,
+                'fileName': f'{class_name}_ast.xml',
+                'repository': repository,
+                'repositoryId': c % len(repositories) + 1,
+                'created_at': created_at,
+            },
+        })
+
+        for m in range(6):
+            if len(nodes) >= node_count:
+                break
+            method_name = f'processRecords{m}'
+            method_id = f'method:{class_name}.{method_name}'
+            nodes.append({
+                'id': method_id,
+                'label': 'ApexMethod',
+                'type': 'ApexMethod',
+                'name': method_name,
+                'properties': {
+                    'canonicalName': f'{class_name}.{method_name}',
+                    'className': class_name,
+                    'name': method_name,
+                    'public': True,
+                    'static': m % 2 == 0,
+                    'returnType': 'void',
+                    'arity': m % 3,
+                    'repository': repository,
+                    'repositoryId': c % len(repositories) + 1,
+                    'created_at': created_at,
+                },
+            })
+            edges.append({'source': class_id, 'target': method_id, 'type': 'HAS_METHOD', 'label': 'HAS_METHOD'})
+
+            for idx in range(2):
+                if len(nodes) >= node_count:
+                    break
+                query = f'SELECT Id, Name, StageName FROM Opportunity WHERE AccountId = :accountId{idx}'
+                soql_id = f'soql:{class_name}.{method_name}.{idx}'
+                nodes.append({
+                    'id': soql_id,
+                    'label': 'SOQLQuery',
+                    'type': 'SOQLQuery',
+                    'name': query[:50] + '...',
+                    'properties': {
+                        'query': query,
+                        'canonicalQuery': query,
+                        'className': class_name,
+                        'methodName': method_name,
+                        'repository': repository,
+                        'repositoryId': c % len(repositories) + 1,
+                        'created_at': created_at,
+                    },
+                })
+                edges.append({'source': method_id, 'target': soql_id, 'type': 'CONTAINS_SOQL', 'label': 'CONTAINS_SOQL'})
+
+            if len(nodes) < node_count:
+                dml_id = f'dml:{class_name}.{method_name}.UPDATE.0'
+                nodes.append({
+                    'id': dml_id,
+                    'label': 'DMLOperation',
+                    'type': 'DMLOperation',
+                    'name': 'UPDATE',
+                    'properties': {
+                        'className': class_name,
+                        'methodName': method_name,
+                        'operationType': 'UPDATE',
+                        'repository': repository,
+                        'repositoryId': c % len(repositories) + 1,
+                        'created_at': created_at,
+                    },
+                })
+                edges.append({'source': method_id, 'target': dml_id, 'type': 'CONTAINS_DML', 'label': 'CONTAINS_DML'})
+
+    return nodes, edges
+
+
+def measure(label, func, repeat=3):
+    """执行多次取最短耗时"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    node_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    print("=" * 72)
+    print(f"图数据序列化基准测试（合成图: {node_count} 节点）")
+    print("=" * 72)
+    print(f"orjson: {'可用' if orjson else '未安装（FastJSONRenderer 退回 stdlib）'}")
+    print(f"brotli: {'可用' if brotli else '未安装'}")
+
+    nodes, edges = build_synthetic_graph(node_count)
+    print(f"节点: {len(nodes)}  边: {len(edges)}\n")
+
+    full_payload = {'nodes': nodes, 'edges': edges}
+    compact_payload, encode_time = measure('encode', lambda: encode_compact_graph(nodes, edges))
+    print(f"紧凑格式编码耗时: {encode_time * 1000:.1f} ms\n")
+
+    cases = [
+        ('完整格式 + stdlib json', JSONRenderer(), full_payload),
+        ('完整格式 + orjson', FastJSONRenderer(), full_payload),
+        ('紧凑格式 + stdlib json', JSONRenderer(), compact_payload),
+        ('紧凑格式 + orjson', FastJSONRenderer(), compact_payload),
+    ]
+
+    header = f"{'场景':<24}{'序列化(ms)':>12}{'原始(KB)':>12}{'gzip(KB)':>12}{'br(KB)':>12}"
+    print(header)
+    print("-" * 72)
+
+    for label, renderer, payload in cases:
+        body, render_time = measure(label, lambda: renderer.render(payload))
+        gzip_size = len(gzip.compress(body, compresslevel=6))
+        br_size = len(brotli.compress(body, quality=5)) if brotli else None
+        print(
+            f"{label:<24}"
+            f"{render_time * 1000:>12.1f}"
+            f"{len(body) / 1024:>12.0f}"
+            f"{gzip_size / 1024:>12.0f}"
+            f"{(br_size / 1024 if br_size else float('nan')):>12.0f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
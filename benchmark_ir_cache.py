@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+AST 解析结果缓存基准测试
+对比重新导入时的解析阶段：ElementTree 解析 XML / 从 IR 缓存加载（msgpack 或 marshal），
+以及 XML 文件和 IR 的大小
+
+用法:
+    python benchmark_ir_cache.py [AST目录 ...] [--rounds N]
+
+默认使用 output/ast 下所有仓库的 apex 和 lwc 目录；缓存写入临时目录，不影响正式缓存
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+backend_dir = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'apex_graph.settings')
+
+import django
+django.setup()
+
+from ast_api.ast_parser import parse_ast_file
+from ast_api.js_ast_parser import parse_js_ast_file
+from ast_api.ast_pack import list_entries, read_entry
+from ast_api.ir_cache import IRCache, encode
+
+
+def collect_ast_files(directories):
+    files = []
+    for directory in directories:
+        for path in list_entries(directory, '_ast.xml'):
+            data = read_entry(path)
+            if data is None:
+                continue
+            parser = 'js' if b'<JavaScriptFile' in data[:1000] else 'apex'
+            files.append((path, parser, data))
+    return files
+
+
+def parse_xml(path, parser, data):
+    if parser == 'js':
+        return parse_js_ast_file(path, data)
+    return parse_ast_file(path, data)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('directories', nargs='*')
+    arg_parser.add_argument('--rounds', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    directories = args.directories
+    if not directories:
+        output_ast = Path(__file__).parent / 'output' / 'ast'
+        directories = [
+            repo / component_type
+            for repo in sorted(output_ast.iterdir()) if repo.is_dir()
+            for component_type in ('apex', 'lwc')
+        ]
+
+    files = collect_ast_files(directories)
+    if not files:
+        print('No AST files found')
+        return
+
+    xml_bytes = sum(len(data) for _, _, data in files)
+    print(f'AST files: {len(files)} ({xml_bytes / 1024:.1f} KB XML)')
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = IRCache(cache_dir)
+
+        # 冷启动：解析 XML 并写入缓存
+        start = time.perf_counter()
+        for path, parser, data in files:
+            cache.parse(parser, data, lambda: parse_xml(path, parser, data))
+        cold = time.perf_counter() - start
+
+        codec = None
+        ir_bytes = 0
+        for path, parser, data in files:
+            codec, encoded = encode(parse_xml(path, parser, data))
+            ir_bytes += len(encoded)
+
+        xml_times = []
+        ir_times = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            for path, parser, data in files:
+                parse_xml(path, parser, data)
+            xml_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for path, parser, data in files:
+                cache.parse(parser, data, lambda: parse_xml(path, parser, data))
+            ir_times.append(time.perf_counter() - start)
+
+        xml_best = min(xml_times)
+        ir_best = min(ir_times)
+        print(f'IR codec: {codec} ({ir_bytes / 1024:.1f} KB, {ir_bytes / xml_bytes:.1%} of XML)')
+        print(f'{"stage":<32}{"best (ms)":>12}{"per file (us)":>16}')
+        for label, seconds in (
+            ('cold (parse XML + store IR)', cold),
+            ('re-import: parse XML', xml_best),
+            ('re-import: load IR', ir_best),
+        ):
+            print(f'{label:<32}{seconds * 1000:>12.2f}{seconds / len(files) * 1e6:>16.1f}')
+        print(f'speed-up: {xml_best / ir_best:.1f}x  (cache {cache.stats()})')
+
+
+if __name__ == '__main__':
+    main()
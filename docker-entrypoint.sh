@@ -30,8 +30,15 @@ if [ "${USE_CLOUD_STORAGE}" = "true" ]; then
         echo "Copying sample AST files to Cloud Storage..."
         cp -r /app/output/ast/* /data/ast/ 2>/dev/null || echo "No sample files to copy"
     fi
+    
+    # SQLite runs on local disk (WAL mode); /data/database only holds snapshots
+    echo "=== Restoring database snapshot ==="
+    mkdir -p "${LOCAL_DB_DIR:-/var/lib/pmd-analyzer}"
+    python /app/backend/cloud_storage.py restore || echo "Database restore failed, starting with an empty database"
+    export DB_BACKUP_AUTOSTART=true
 else
     echo "=== Using local storage ==="
+    export DB_BACKUP_AUTOSTART=false
 fi
 
 cd /app/backend
@@ -39,6 +46,14 @@ cd /app/backend
 echo "=== Running database migrations ==="
 python manage.py migrate --noinput || echo "Migration failed but continuing..."
 
+if [ "${USE_CLOUD_STORAGE}" = "true" ]; then
+    # AST output and graph data are read/written on local disk and synced to /data in the background
+    echo "=== Warming local data cache ==="
+    mkdir -p "${LOCAL_CACHE_DIR:-/var/cache/pmd-analyzer}"
+    python manage.py shell -c "from ast_api.storage import ast_store, graph_store; ast_store.hydrate('ast'); ast_store.hydrate('blobs'); graph_store.hydrate()" \
+        || echo "Cache warm-up failed, files will be fetched on demand"
+fi
+
 echo "=== Collecting static files ==="
 python manage.py collectstatic --noinput --clear || echo "Collectstatic failed but continuing..."
 
@@ -80,12 +80,46 @@ export default {
   },
   
   // 图数据查询
-  getGraphData() {
-    return api.get('/graph/')
+  getGraphData(params = {}) {
+    return api.get('/graph/', { params })
   },
   
-  getClassGraph(className) {
-    return api.get(`/graph/class/${className}/`)
+  // 增量同步：获取指定版本之后的图变更
+  getGraphChanges(since, epoch, repositoryId = null) {
+    const params = { since, epoch }
+    if (repositoryId) {
+      params.repository_id = repositoryId
+    }
+    return api.get('/graph/changes/', { params })
+  },
+  
+  getClassGraph(className, params = {}) {
+    return api.get(`/graph/class/${className}/`, { params })
+  },
+  
+  // 多跳邻域展开：params 支持 depth / direction / edge_types / limit
+  getNeighborhood(nodeId, params = {}) {
+    return api.get('/graph/neighborhood/', { params: { node: nodeId, ...params } })
+  },
+  
+  // 影响分析：params 支持 direction / types / limit
+  getImpactAnalysis(nodeId, params = {}) {
+    return api.get('/graph/impact/', { params: { node: nodeId, ...params } })
+  },
+  
+  // 节点搜索：params 支持 types / limit
+  searchNodes(q, params = {}) {
+    return api.get('/search/', { params: { q, ...params } })
+  },
+  
+  // sObject 使用情况
+  getSObjects() {
+    return api.get('/sobjects/')
+  },
+  
+  getSObjectUsage(sobject, field = null) {
+    const params = field ? { field } : {}
+    return api.get(`/sobjects/${sobject}/`, { params })
   },
   
   // 图布局保存和加载
@@ -98,8 +132,14 @@ export default {
   },
   
   // 源代码查询
-  getSourceCode(className) {
-    return api.get(`/source/${className}/`)
+  // params 支持 start / end 行范围
+  getSourceCode(className, params = {}) {
+    return api.get(`/source/${className}/`, { params })
+  },
+  
+  // 源代码全文搜索：params 支持 regex / repo / case / limit
+  searchCode(q, params = {}) {
+    return api.get('/code-search/', { params: { q, ...params } })
   },
   
   // 统计信息
@@ -107,8 +147,9 @@ export default {
     return api.get('/statistics/')
   },
   
-  getImportedFiles() {
-    return api.get('/files/')
+  // params 支持 repo / type / page / page_size
+  getImportedFiles(params = {}) {
+    return api.get('/files/', { params })
   },
   
   // 清空数据库
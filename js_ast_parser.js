@@ -1,7 +1,8 @@
 #!/usr/bin/env node
 /**
  * JavaScript AST Parser using Babel
- * Parses ES6+ JavaScript files and generates AST in XML format
+ * Parses ES6+ JavaScript files and generates AST metadata in XML or JSON format.
+ * Batch mode parses many files in one process and writes NDJSON (one JSON object per line).
  */
 
 const fs = require('fs');
@@ -9,132 +10,150 @@ const path = require('path');
 const parser = require('@babel/parser');
 const traverse = require('@babel/traverse').default;
 
+// Version of the JSON / NDJSON output layout
+const JSON_FORMAT_VERSION = 1;
+
 /**
- * Parse JavaScript file and generate AST
+ * Parse JavaScript file and extract metadata
  * @param {string} filePath - Path to JavaScript file
- * @param {string} outputPath - Path to output XML file
+ * @returns {object} Extracted metadata
  */
-function parseJavaScriptToAST(filePath, outputPath) {
-  try {
-    // Read source code
-    const sourceCode = fs.readFileSync(filePath, 'utf-8');
+function extractMetadata(filePath) {
+  // Read source code
+  const sourceCode = fs.readFileSync(filePath, 'utf-8');
+  
+  // Parse with Babel
+  const ast = parser.parse(sourceCode, {
+    sourceType: 'module',
+    plugins: [
+      'jsx',
+      'classProperties',
+      'decorators-legacy',
+      'asyncGenerators',
+      'bigInt',
+      'dynamicImport',
+      'nullishCoalescingOperator',
+      'optionalChaining'
+    ]
+  });
+  
+  // Extract metadata
+  const metadata = {
+    imports: [],
+    exports: [],
+    classes: [],
+    functions: [],
+    variables: []
+  };
+  
+  // Traverse AST to extract information
+  traverse(ast, {
+    ImportDeclaration(path) {
+      const importInfo = {
+        source: path.node.source.value,
+        specifiers: path.node.specifiers.map(spec => {
+          if (spec.type === 'ImportDefaultSpecifier') {
+            return { type: 'default', local: spec.local.name };
+          } else if (spec.type === 'ImportSpecifier') {
+            return { 
+              type: 'named', 
+              imported: spec.imported.name, 
+              local: spec.local.name 
+            };
+          }
+          return null;
+        }).filter(Boolean)
+      };
+      metadata.imports.push(importInfo);
+    },
     
-    // Parse with Babel
-    const ast = parser.parse(sourceCode, {
-      sourceType: 'module',
-      plugins: [
-        'jsx',
-        'classProperties',
-        'decorators-legacy',
-        'asyncGenerators',
-        'bigInt',
-        'dynamicImport',
-        'nullishCoalescingOperator',
-        'optionalChaining'
-      ]
-    });
+    ExportDefaultDeclaration(path) {
+      metadata.exports.push({
+        type: 'default',
+        name: path.node.declaration.id?.name || 'anonymous'
+      });
+    },
     
-    // Extract metadata
-    const metadata = {
-      imports: [],
-      exports: [],
-      classes: [],
-      functions: [],
-      variables: []
-    };
+    ExportNamedDeclaration(path) {
+      if (path.node.declaration) {
+        if (path.node.declaration.type === 'ClassDeclaration') {
+          metadata.exports.push({
+            type: 'class',
+            name: path.node.declaration.id.name
+          });
+        } else if (path.node.declaration.type === 'FunctionDeclaration') {
+          metadata.exports.push({
+            type: 'function',
+            name: path.node.declaration.id.name
+          });
+        }
+      }
+    },
     
-    // Traverse AST to extract information
-    traverse(ast, {
-      ImportDeclaration(path) {
-        const importInfo = {
-          source: path.node.source.value,
-          specifiers: path.node.specifiers.map(spec => {
-            if (spec.type === 'ImportDefaultSpecifier') {
-              return { type: 'default', local: spec.local.name };
-            } else if (spec.type === 'ImportSpecifier') {
-              return { 
-                type: 'named', 
-                imported: spec.imported.name, 
-                local: spec.local.name 
-              };
-            }
-            return null;
-          }).filter(Boolean)
-        };
-        metadata.imports.push(importInfo);
-      },
+    ClassDeclaration(path) {
+      const classInfo = {
+        name: path.node.id.name,
+        superClass: path.node.superClass?.name || null,
+        methods: []
+      };
       
-      ExportDefaultDeclaration(path) {
-        metadata.exports.push({
-          type: 'default',
-          name: path.node.declaration.id?.name || 'anonymous'
-        });
-      },
-      
-      ExportNamedDeclaration(path) {
-        if (path.node.declaration) {
-          if (path.node.declaration.type === 'ClassDeclaration') {
-            metadata.exports.push({
-              type: 'class',
-              name: path.node.declaration.id.name
-            });
-          } else if (path.node.declaration.type === 'FunctionDeclaration') {
-            metadata.exports.push({
-              type: 'function',
-              name: path.node.declaration.id.name
-            });
+      path.node.body.body.forEach(member => {
+        if (member.type === 'ClassMethod') {
+          classInfo.methods.push({
+            name: member.key.name,
+            kind: member.kind, // 'constructor', 'method', 'get', 'set'
+            async: member.async,
+            static: member.static,
+            params: member.params.map(p => p.name || p.type)
+          });
+        } else if (member.type === 'ClassProperty') {
+          // Class properties
+          if (!classInfo.properties) {
+            classInfo.properties = [];
           }
+          classInfo.properties.push({
+            name: member.key.name,
+            static: member.static
+          });
         }
-      },
+      });
       
-      ClassDeclaration(path) {
-        const classInfo = {
+      metadata.classes.push(classInfo);
+    },
+    
+    FunctionDeclaration(path) {
+      // Skip if it's inside a class (already captured)
+      if (path.parent.type === 'Program' || path.parent.type === 'ExportNamedDeclaration') {
+        metadata.functions.push({
           name: path.node.id.name,
-          superClass: path.node.superClass?.name || null,
-          methods: []
-        };
-        
-        path.node.body.body.forEach(member => {
-          if (member.type === 'ClassMethod') {
-            classInfo.methods.push({
-              name: member.key.name,
-              kind: member.kind, // 'constructor', 'method', 'get', 'set'
-              async: member.async,
-              static: member.static,
-              params: member.params.map(p => p.name || p.type)
-            });
-          } else if (member.type === 'ClassProperty') {
-            // Class properties
-            if (!classInfo.properties) {
-              classInfo.properties = [];
-            }
-            classInfo.properties.push({
-              name: member.key.name,
-              static: member.static
-            });
-          }
+          async: path.node.async,
+          params: path.node.params.map(p => p.name || p.type)
         });
-        
-        metadata.classes.push(classInfo);
-      },
-      
-      FunctionDeclaration(path) {
-        // Skip if it's inside a class (already captured)
-        if (path.parent.type === 'Program' || path.parent.type === 'ExportNamedDeclaration') {
-          metadata.functions.push({
-            name: path.node.id.name,
-            async: path.node.async,
-            params: path.node.params.map(p => p.name || p.type)
-          });
-        }
       }
-    });
+    }
+  });
+  
+  return metadata;
+}
+
+/**
+ * Parse JavaScript file and write AST metadata
+ * @param {string} filePath - Path to JavaScript file
+ * @param {string} outputPath - Path to output file
+ * @param {string} format - 'xml' or 'json' (default: by output file extension)
+ */
+function parseJavaScriptToAST(filePath, outputPath, format) {
+  try {
+    const metadata = extractMetadata(filePath);
+    const outputFormat = format || (outputPath.endsWith('.json') ? 'json' : 'xml');
     
-    // Generate XML output
-    const xml = generateXML(metadata, path.basename(filePath));
+    // Generate output
+    const output = outputFormat === 'json'
+      ? JSON.stringify(generateJSON(metadata, filePath)) + '\n'
+      : generateXML(metadata, path.basename(filePath));
     
     // Write to output file
-    fs.writeFileSync(outputPath, xml, 'utf-8');
+    fs.writeFileSync(outputPath, output, 'utf-8');
     
     console.log(`AST generated successfully: ${outputPath}`);
     return true;
@@ -144,6 +163,53 @@ function parseJavaScriptToAST(filePath, outputPath) {
   }
 }
 
+/**
+ * Parse many JavaScript files in one process and write NDJSON
+ * Each line is the JSON document of one input file, or {file, error} if parsing failed.
+ * @param {string[]} filePaths - Paths to JavaScript files
+ * @param {string} outputPath - Path to output NDJSON file, or '-' for stdout
+ * @returns {number} Number of files that failed to parse
+ */
+function parseJavaScriptBatch(filePaths, outputPath) {
+  const lines = [];
+  let failed = 0;
+  filePaths.forEach(filePath => {
+    try {
+      lines.push(JSON.stringify(generateJSON(extractMetadata(filePath), filePath)));
+    } catch (error) {
+      failed += 1;
+      lines.push(JSON.stringify({ file: filePath, error: error.message }));
+    }
+  });
+  
+  const output = lines.length > 0 ? lines.join('\n') + '\n' : '';
+  if (outputPath === '-') {
+    process.stdout.write(output);
+  } else {
+    fs.writeFileSync(outputPath, output, 'utf-8');
+  }
+  return failed;
+}
+
+/**
+ * Generate JSON document from metadata
+ * @param {object} metadata - Extracted metadata
+ * @param {string} filePath - Original file path
+ * @returns {object} JSON document
+ */
+function generateJSON(metadata, filePath) {
+  return {
+    format: 'javascript-ast',
+    version: JSON_FORMAT_VERSION,
+    name: path.basename(filePath),
+    file: filePath,
+    imports: metadata.imports,
+    exports: metadata.exports,
+    classes: metadata.classes,
+    functions: metadata.functions
+  };
+}
+
 /**
  * Generate XML from metadata
  * @param {object} metadata - Extracted metadata
@@ -257,8 +323,25 @@ function escapeXml(str) {
 if (require.main === module) {
   const args = process.argv.slice(2);
   
-  if (args.length < 2) {
-    console.error('Usage: node js_ast_parser.js <input.js> <output.xml>');
+  if (args[0] === '--batch') {
+    if (args.length < 3) {
+      console.error('Usage: node js_ast_parser.js --batch <output.ndjson|-> <input1.js> [input2.js ...]');
+      process.exit(1);
+    }
+    parseJavaScriptBatch(args.slice(2), args[1]);
+    process.exit(0);
+  }
+  
+  let format = null;
+  const formatIndex = args.indexOf('--format');
+  if (formatIndex !== -1) {
+    format = args[formatIndex + 1];
+    args.splice(formatIndex, 2);
+  }
+  
+  if (args.length < 2 || (format && format !== 'xml' && format !== 'json')) {
+    console.error('Usage: node js_ast_parser.js <input.js> <output.xml|output.json> [--format xml|json]');
+    console.error('       node js_ast_parser.js --batch <output.ndjson|-> <input1.js> [input2.js ...]');
     process.exit(1);
   }
   
@@ -270,8 +353,8 @@ if (require.main === module) {
     process.exit(1);
   }
   
-  const success = parseJavaScriptToAST(inputFile, outputFile);
+  const success = parseJavaScriptToAST(inputFile, outputFile, format);
   process.exit(success ? 0 : 1);
 }
 
-module.exports = { parseJavaScriptToAST };
+module.exports = { extractMetadata, parseJavaScriptToAST, parseJavaScriptBatch };
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""测试 AST 打包存储（打包、按原路径读取、重新打包时保留未重新生成的条目）"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+backend_dir = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+# 设置Django环境
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'apex_graph.settings')
+
+import django
+django.setup()
+
+# 图数据的全局存储按导入时的工作目录创建（graphdata），在临时目录中导入，以免加载并改写仓库中的图数据
+_workdir = tempfile.TemporaryDirectory()
+_cwd = os.getcwd()
+os.chdir(_workdir.name)
+try:
+    from ast_api.ast_pack import AstPack, is_packed, list_entries, pack_directory, read_entry, stat_entry
+finally:
+    os.chdir(_cwd)
+
+
+def make_output(root: Path):
+    """模拟仓库的 apex 输出目录：AST 和源代码副本"""
+    apex = root / 'repo' / 'apex'
+    apex.mkdir(parents=True)
+    (apex / 'A_ast.xml').write_text('<A/>')
+    (apex / 'A.cls').write_text('public class A {}')
+    (apex / 'B_ast.xml').write_text('<B/>')
+    return apex
+
+
+def test_pack_and_read():
+    """打包后散文件被删除，按原路径透明读取包内条目"""
+    with tempfile.TemporaryDirectory() as directory:
+        apex = make_output(Path(directory))
+        stats = pack_directory(apex)
+        assert stats['files'] == 3 and stats['kept'] == 0 and stats['bytes'] == 25
+        assert not apex.exists() and is_packed(apex)
+
+        assert read_entry(apex / 'A_ast.xml') == b'<A/>'
+        assert read_entry(apex.with_name('apex.pack') / 'A.cls') == b'public class A {}'
+        assert read_entry(apex / 'Missing_ast.xml') is None
+        assert stat_entry(apex / 'B_ast.xml')[1] == 4
+        assert [p.name for p in list_entries(apex, '_ast.xml')] == ['A_ast.xml', 'B_ast.xml']
+    print("✓ 打包和读取")
+
+
+def test_repack_keeps_entries():
+    """重新打包时只替换重新生成的条目，其余条目（如本次分析失败的文件）保留"""
+    with tempfile.TemporaryDirectory() as directory:
+        apex = make_output(Path(directory))
+        pack_directory(apex)
+
+        # 第二次分析只重新生成了 A 的 AST，并新增了 C
+        apex.mkdir()
+        (apex / 'A_ast.xml').write_text('<A version="2"/>')
+        (apex / 'C_ast.xml').write_text('<C/>')
+        stats = pack_directory(apex)
+        assert stats['files'] == 2 and stats['kept'] == 2
+
+        with AstPack(apex.with_name('apex.pack')) as pack:
+            assert pack.names() == ['A.cls', 'A_ast.xml', 'B_ast.xml', 'C_ast.xml']
+        assert read_entry(apex / 'A_ast.xml') == b'<A version="2"/>'
+        assert read_entry(apex / 'B_ast.xml') == b'<B/>'
+
+        # 没有散文件时保留已有的包
+        assert pack_directory(apex)['files'] == 0
+        assert read_entry(apex / 'C_ast.xml') == b'<C/>'
+    print("✓ 重新打包保留条目")
+
+
+def test_loose_files_take_precedence():
+    """散文件和包内条目同时存在时列出和读取散文件"""
+    with tempfile.TemporaryDirectory() as directory:
+        apex = make_output(Path(directory))
+        pack_directory(apex)
+        apex.mkdir()
+        (apex / 'B_ast.xml').write_text('<B version="2"/>')
+
+        assert [p.name for p in list_entries(apex, '_ast.xml')] == ['A_ast.xml', 'B_ast.xml']
+        assert read_entry(apex / 'B_ast.xml') == b'<B version="2"/>'
+    print("✓ 散文件优先")
+
+
+if __name__ == "__main__":
+    test_pack_and_read()
+    test_repack_keeps_entries()
+    test_loose_files_take_precedence()
+    print("全部通过")
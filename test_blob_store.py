@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""测试内容寻址存储（去重、仓库清单、按原路径读取、分析结果缓存）"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+backend_dir = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+# 设置Django环境
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'apex_graph.settings')
+
+import django
+django.setup()
+
+# 图数据的全局存储按导入时的工作目录创建（graphdata），在临时目录中导入，以免加载并改写仓库中的图数据
+_workdir = tempfile.TemporaryDirectory()
+_cwd = os.getcwd()
+os.chdir(_workdir.name)
+try:
+    from ast_api import blob_store
+    from ast_api.ast_pack import is_packed, list_entries, read_entry, stat_entry
+    from ast_api.storage import DataStore
+finally:
+    os.chdir(_cwd)
+
+
+def use_store(root: Path):
+    """把内容寻址存储和清单写入指向临时目录"""
+    store = DataStore(root)
+    blob_store.ast_store = store
+    blob_store.blob_store = blob_store.BlobStore(store)
+    return store
+
+
+def make_repository(root: Path, name: str):
+    """模拟仓库输出目录：apex 下的 AST 和源代码副本，lwc 下的组件目录"""
+    apex = root / 'ast' / name / 'apex'
+    apex.mkdir(parents=True)
+    (apex / 'A_ast.xml').write_text('<A/>')
+    (apex / 'A.cls').write_text('public class A {}')
+    component = root / 'ast' / name / 'lwc' / 'list'
+    component.mkdir(parents=True)
+    (component / 'list.js').write_text('export default class List {}')
+    return root / 'ast' / name
+
+
+def test_dedupe_and_read():
+    """相同内容只保存一份；存入后散文件被删除，按原路径透明读取"""
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        use_store(root)
+        first = make_repository(root, 'first')
+        second = make_repository(root, 'second')
+
+        stats = blob_store.dedupe_directory(first / 'apex')
+        assert stats == {'files': 2, 'kept': 0, 'bytes': 21, 'new_blobs': 2}
+        assert blob_store.dedupe_directory(second / 'apex')['new_blobs'] == 0
+        assert not (first / 'apex').exists() and is_packed(first / 'apex')
+
+        assert read_entry(first / 'apex' / 'A_ast.xml') == b'<A/>'
+        assert read_entry(second / 'apex' / 'A.cls') == b'public class A {}'
+        assert read_entry(first / 'apex' / 'Missing_ast.xml') is None
+        # mtime 由内容哈希决定，内容相同则相同
+        assert stat_entry(first / 'apex' / 'A.cls') == stat_entry(second / 'apex' / 'A.cls')
+        assert [p.name for p in list_entries(first / 'apex', '_ast.xml')] == ['A_ast.xml']
+
+        # LWC 组件目录下的文件（两级）
+        blob_store.dedupe_directory(first / 'lwc')
+        assert read_entry(first / 'lwc' / 'list' / 'list.js') == b'export default class List {}'
+        assert sorted(blob_store.manifest_entries(first)) == ['apex/A.cls', 'apex/A_ast.xml', 'lwc/list/list.js']
+    print("✓ 去重和读取")
+
+
+def test_restore_keeps_entries():
+    """再次存入同一类型时只替换重新生成的条目"""
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        use_store(root)
+        repository = make_repository(root, 'repo')
+        blob_store.dedupe_directory(repository / 'apex')
+
+        (repository / 'apex').mkdir()
+        (repository / 'apex' / 'A_ast.xml').write_text('<A version="2"/>')
+        stats = blob_store.dedupe_directory(repository / 'apex')
+        assert stats['files'] == 1 and stats['kept'] == 1
+        assert read_entry(repository / 'apex' / 'A_ast.xml') == b'<A version="2"/>'
+        assert read_entry(repository / 'apex' / 'A.cls') == b'public class A {}'
+        assert blob_store.dedupe_directory(repository / 'apex')['files'] == 0
+    print("✓ 再次存入保留条目")
+
+
+def test_derived():
+    """按 (分析器, 源文件哈希) 记录生成的 AST"""
+    with tempfile.TemporaryDirectory() as directory:
+        use_store(Path(directory))
+        source_sha1 = blob_store.sha1_bytes(b'public class A {}')
+        assert blob_store.blob_store.derived('pmd-apex', source_sha1) is None
+        blob_store.blob_store.record_derived('pmd-apex', source_sha1, b'<A/>')
+        assert blob_store.blob_store.derived('pmd-apex', source_sha1) == b'<A/>'
+        assert blob_store.blob_store.derived('pmd-vf', source_sha1) is None
+    print("✓ 分析结果缓存")
+
+
+if __name__ == "__main__":
+    test_dedupe_and_read()
+    test_restore_keeps_entries()
+    test_derived()
+    print("全部通过")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""测试方法调用解析（符号索引、每次导入独立的待解析调用、之前未解析调用的重试）"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+backend_dir = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+# 设置Django环境
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'apex_graph.settings')
+
+import django
+django.setup()
+
+from ast_api.call_resolver import MethodSymbolIndex, call_key, parse_call_key
+
+# 图数据的全局存储按导入时的工作目录创建（graphdata），在临时目录中导入，以免加载并改写仓库中的图数据
+_workdir = tempfile.TemporaryDirectory()
+_cwd = os.getcwd()
+os.chdir(_workdir.name)
+try:
+    from ast_api.storage import DataStore
+    from ast_api.local_graph_service import LocalGraphService
+    from ast_api.unified_graph_service import unified_graph_service
+    from ast_api.import_service import ASTImportService
+finally:
+    os.chdir(_cwd)
+
+
+def fresh_graph_service():
+    """使用空的临时图数据替换统一图服务的本地图服务"""
+    unified_graph_service.local_service = LocalGraphService(store=DataStore(tempfile.mkdtemp(dir=_workdir.name)))
+    return unified_graph_service.local_service
+
+
+def call(full_method_name, arity=0):
+    return {'fullMethodName': full_method_name, 'methodName': full_method_name.rpartition('.')[2], 'arity': arity}
+
+
+def apex_class(name, methods):
+    """最小的类 AST 数据（见 ASTParser），methods 为 [(方法名, 参数个数, 调用列表)]"""
+    return {
+        'name': name, 'simpleName': name, 'definingType': name,
+        'public': True, 'withSharing': False, 'fileName': f'{name}.cls',
+        'methods': [
+            {
+                'name': method_name, 'returnType': 'void', 'arity': arity,
+                'public': True, 'static': True, 'constructor': False, 'method_calls': calls,
+            }
+            for method_name, arity, calls in methods
+        ],
+    }
+
+
+def test_symbol_index():
+    """无限定符/this 调用指向本类，Class.method 为静态调用；不区分大小写，按参数个数匹配"""
+    index = MethodSymbolIndex()
+    index.add('Util', 'format', 1, 'method:Util.format')
+    index.add('Util', 'format', 2, 'method:Util.format')
+    index.add('A', 'run', 0, 'method:A.run')
+
+    assert index.resolve('A', call('run')) == 'method:A.run'
+    assert index.resolve('a', call('this.RUN')) == 'method:A.run'
+    assert index.resolve('A', call('UTIL.format', 2)) == 'method:Util.format'
+    assert index.resolve('A', call('Util.format', 3)) is None
+    assert index.resolve('A', call('Util.format', None)) == 'method:Util.format'
+    # 系统类和实例变量调用无法解析
+    assert index.resolve('A', call('System.debug', 1)) is None
+    assert index.resolve('A', call('acc.save')) is None
+
+    assert parse_call_key(call_key('Util.format', 2)) == call('Util.format', 2)
+    print("✓ 符号索引")
+
+
+def test_pending_calls_per_import():
+    """待解析的调用属于各自的导入，解析一次导入不会带走另一次导入的调用"""
+    graph = fresh_graph_service().graph
+    service = ASTImportService()
+    first, second = {}, {}
+    service._import_to_graph(apex_class('A', [('run', 0, [call('B.work')])]), None, first)
+    service._import_to_graph(apex_class('B', [('work', 0, [])]), None, second)
+    assert list(first) == ['method:A.run'] and list(second) == ['method:B.work']
+
+    assert service.resolve_method_calls(None, second) == {'resolved': 0, 'unresolved': 0, 'retry_resolved': 0}
+    assert not graph.has_edge('method:A.run', 'method:B.work')
+
+    assert service.resolve_method_calls(None, first) == {'resolved': 1, 'unresolved': 0, 'retry_resolved': 0}
+    assert graph.has_edge('method:A.run', 'method:B.work')
+    print("✓ 每次导入独立的待解析调用")
+
+
+def test_retry_unresolved():
+    """之前未解析的调用在目标类导入后重试解析，计入 retry_resolved"""
+    graph = fresh_graph_service().graph
+    service = ASTImportService()
+    pending = {}
+    service._import_to_graph(apex_class('A', [('run', 0, [call('B.work'), call('System.debug', 1)])]), None, pending)
+    assert service.resolve_method_calls(None, pending) == {'resolved': 0, 'unresolved': 2, 'retry_resolved': 0}
+    assert graph.nodes['method:A.run']['unresolvedCalls'] == ['B.work/0', 'System.debug/1']
+
+    pending = {}
+    service._import_to_graph(apex_class('B', [('work', 0, [])]), None, pending)
+    assert service.resolve_method_calls(None, pending) == {'resolved': 0, 'unresolved': 0, 'retry_resolved': 1}
+    assert graph.has_edge('method:A.run', 'method:B.work')
+    assert graph.nodes['method:A.run']['unresolvedCalls'] == ['System.debug/1']
+    print("✓ 重试之前未解析的调用")
+
+
+if __name__ == "__main__":
+    test_symbol_index()
+    test_pending_calls_per_import()
+    test_retry_unresolved()
+    print("全部通过")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""测试源代码搜索（三元组候选集、逐行匹配、增量刷新和持久化）"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+backend_dir = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+# 设置Django环境
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'apex_graph.settings')
+
+import django
+django.setup()
+
+# 图数据的全局存储按导入时的工作目录创建（graphdata），在临时目录中导入，以免加载并改写仓库中的图数据
+_workdir = tempfile.TemporaryDirectory()
+_cwd = os.getcwd()
+os.chdir(_workdir.name)
+try:
+    from ast_api.code_search import CodeSearchIndex, trigrams
+finally:
+    os.chdir(_cwd)
+
+
+def make_repository(root: Path):
+    """模拟仓库输出目录：Apex 源文件、AST（不索引）、LWC 主 JS 的两个副本"""
+    (root / 'apex').mkdir()
+    (root / 'apex' / 'A.cls').write_text('public class A {\n    void getPagedList() {}\n}\n')
+    (root / 'apex' / 'B.cls').write_text('public class B { Integer abc; Integer bcd; }\n')
+    (root / 'apex' / 'A_ast.xml').write_text('<Method Image="getPagedList"/>')
+    (root / 'lwc' / 'c').mkdir(parents=True)
+    (root / 'lwc' / 'c.js').write_text('import getPagedList from x;')
+    (root / 'lwc' / 'c' / 'c.js').write_text('import getPagedList from x;')
+
+
+def test_trigrams():
+    assert trigrams('AbcD') == {'abc', 'bcd'}
+    assert trigrams('ab') == set()
+    print("✓ 三元组")
+
+
+def test_candidates_and_search():
+    """候选文件是所有三元组的交集，最终结果还需逐行匹配"""
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        make_repository(root)
+        index = CodeSearchIndex(root)
+        assert index.refresh() == {'added': 3, 'updated': 0, 'removed': 0, 'files': 3}
+
+        # 只索引源文件，LWC 主 JS 只索引组件目录中的副本
+        assert index._candidates('getpaged') == ['apex/A.cls', 'lwc/c/c.js']
+        # 不足 3 个字符时所有文件都是候选
+        assert len(index._candidates('ab')) == 3
+
+        result = index.search('GETPAGED')
+        assert [(m['file'], m['line']) for m in result['matches']] == [('apex/A.cls', 2), ('lwc/c/c.js', 1)]
+        assert result['matches'][0]['snippet'] == 'void getPagedList() {}'
+        assert index.search('GETPAGED', case_sensitive=True)['total'] == 0
+
+        # B.cls 包含 'abcd' 的所有三元组（abc、bcd），是候选文件但没有匹配行
+        result = index.search('abcd')
+        assert result['candidates'] == 1 and result['total'] == 0
+
+        result = index.search('class', limit=1)
+        assert result['truncated'] and len(result['matches']) == 1
+    print("✓ 候选集和搜索")
+
+
+def test_incremental_refresh():
+    """只重新索引变化的文件，删除的文件移出索引；索引持久化后可直接加载"""
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        make_repository(root)
+        index = CodeSearchIndex(root)
+        index.refresh()
+
+        (root / 'apex' / 'B.cls').write_text('public class B { void run() { getPagedList(); } }\n')
+        (root / 'apex' / 'A.cls').unlink()
+        assert index.refresh() == {'added': 0, 'updated': 1, 'removed': 1, 'files': 2}
+        assert index._candidates('getpaged') == ['apex/B.cls', 'lwc/c/c.js']
+        assert index.refresh() == {'added': 0, 'updated': 0, 'removed': 0, 'files': 2}
+
+        reloaded = CodeSearchIndex(root)
+        assert reloaded._candidates('getpaged') == ['apex/B.cls', 'lwc/c/c.js']
+    print("✓ 增量刷新和持久化")
+
+
+if __name__ == "__main__":
+    test_trigrams()
+    test_candidates_and_search()
+    test_incremental_refresh()
+    print("全部通过")
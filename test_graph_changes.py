@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""测试图变更日志（增量同步）和批量写入"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+backend_dir = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+# 设置Django环境
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'apex_graph.settings')
+
+import django
+django.setup()
+
+# 图数据的全局存储按导入时的工作目录创建（graphdata），在临时目录中导入，以免加载并改写仓库中的图数据
+_workdir = tempfile.TemporaryDirectory()
+_cwd = os.getcwd()
+os.chdir(_workdir.name)
+try:
+    from ast_api.storage import DataStore
+    from ast_api.local_graph_service import LocalGraphService
+finally:
+    os.chdir(_cwd)
+
+
+def count_writes(service):
+    """统计实体/关系文件的写入次数"""
+    writes = {'entities': 0, 'relations': 0}
+    write_entities, write_relations = service._write_entities, service._write_relations
+
+    def entities(data):
+        writes['entities'] += 1
+        write_entities(data)
+
+    def relations(data):
+        writes['relations'] += 1
+        write_relations(data)
+
+    service._write_entities, service._write_relations = entities, relations
+    return writes
+
+
+def ids(items):
+    return sorted(item['id'] for item in items)
+
+
+def edges(items):
+    return sorted((item['source'], item['target'], item['type']) for item in items)
+
+
+def test_changes_since():
+    """同一元素多次变更只返回最后一次；删除节点时连带删除的边也返回"""
+    with tempfile.TemporaryDirectory() as directory:
+        service = LocalGraphService(store=DataStore(directory))
+        service.add_node('class:A', {'type': 'ApexClass', 'name': 'A'})
+        start = service.version
+
+        service.add_node('method:A.run', {'type': 'ApexMethod', 'name': 'run'})
+        service.add_node('method:A.stop', {'type': 'ApexMethod', 'name': 'stop'})
+        service.create_relationship('class:A', 'method:A.run', 'HAS_METHOD')
+        service.create_relationship('class:A', 'method:A.stop', 'HAS_METHOD')
+        service.update_node_attributes({'method:A.run': {'unresolvedCalls': ['X.y/0']}})
+
+        changes = service.get_changes_since(start)
+        assert changes['version'] == service.version
+        assert ids(changes['nodes']['upserted']) == ['method:A.run', 'method:A.stop']
+        run, = [node for node in changes['nodes']['upserted'] if node['id'] == 'method:A.run']
+        assert run['properties']['unresolvedCalls'] == ['X.y/0']
+        assert edges(changes['edges']['upserted']) == [
+            ('class:A', 'method:A.run', 'HAS_METHOD'), ('class:A', 'method:A.stop', 'HAS_METHOD')
+        ]
+
+        middle = service.version
+        service.remove_node('method:A.stop')
+        changes = service.get_changes_since(middle)
+        assert changes['nodes'] == {'upserted': [], 'removed': ['method:A.stop']}
+        assert changes['edges']['upserted'] == []
+        assert edges(changes['edges']['removed']) == [('class:A', 'method:A.stop', 'HAS_METHOD')]
+
+        # 添加后又删除的节点只作为删除返回
+        changes = service.get_changes_since(start)
+        assert ids(changes['nodes']['upserted']) == ['method:A.run']
+        assert changes['nodes']['removed'] == ['method:A.stop']
+
+        assert service.get_changes_since(service.version)['nodes'] == {'upserted': [], 'removed': []}
+        assert service.get_changes_since(service.version + 1) is None
+    print("✓ 增量变更")
+
+
+def test_changes_after_reset():
+    """清空数据库后旧版本的客户端需要全量重新加载"""
+    with tempfile.TemporaryDirectory() as directory:
+        service = LocalGraphService(store=DataStore(directory))
+        service.add_node('class:A', {'type': 'ApexClass', 'name': 'A'})
+        version = service.version
+        service.clear_database()
+        assert service.get_changes_since(version) is None
+        assert service.get_changes_since(service.version) is not None
+    print("✓ 重置变更日志")
+
+
+def test_batch_writes():
+    """批量写入期间删除多个节点只在退出时写一次实体/关系文件，重新加载后与内存一致"""
+    with tempfile.TemporaryDirectory() as directory:
+        service = LocalGraphService(store=DataStore(directory))
+        with service.batch():
+            service.add_node('class:A', {'type': 'ApexClass', 'name': 'A'})
+            for i in range(5):
+                service.add_node(f'method:A.m{i}', {'type': 'ApexMethod', 'name': f'm{i}'})
+                service.create_relationship('class:A', f'method:A.m{i}', 'HAS_METHOD')
+
+        writes = count_writes(service)
+        with service.batch():
+            for i in range(4):
+                service.remove_node(f'method:A.m{i}')
+            assert writes == {'entities': 0, 'relations': 0}
+        assert writes == {'entities': 1, 'relations': 1}
+
+        # 批量写入之外每次删除都会写文件
+        service.remove_node('method:A.m4')
+        assert writes == {'entities': 2, 'relations': 2}
+
+        reloaded = LocalGraphService(store=DataStore(directory))
+        assert sorted(reloaded.graph.nodes) == ['class:A']
+        assert reloaded.graph.number_of_edges() == 0
+    print("✓ 批量写入")
+
+
+if __name__ == "__main__":
+    test_changes_since()
+    test_changes_after_reset()
+    test_batch_writes()
+    print("全部通过")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""测试图数据的存储位置（相对目录、已提交的图数据加载、布局文件位置）"""
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+backend_dir = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+# 设置Django环境
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'apex_graph.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+
+
+def test_load_committed_graph():
+    """以相对目录 graphdata 加载仓库中已提交的图数据（在临时副本中，避免改写提交的文件）"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        shutil.copytree(backend_dir / 'graphdata', Path(directory) / 'graphdata')
+        os.chdir(directory)
+        try:
+            from ast_api.storage import DataStore
+            from ast_api.local_graph_service import LocalGraphService
+
+            service = LocalGraphService(store=DataStore(Path('graphdata')))
+            assert service.graph.number_of_nodes() == 214
+            assert service.graph.number_of_edges() == 239
+            assert service.store.path('entities.json') == Path(directory).resolve() / 'graphdata' / 'entities.json'
+            # 不会在存储目录下再嵌套一层 graphdata
+            assert not (Path(directory) / 'graphdata' / 'graphdata').exists()
+        finally:
+            os.chdir(cwd)
+    print("✓ 加载已提交的图数据")
+
+
+def test_layout_location():
+    """本地模式下布局文件保持在 <项目根>/graphdata/graphs/layout.json"""
+    from ast_api.storage import layout_store
+
+    if not settings.USE_CLOUD_STORAGE:
+        expected = Path(settings.BASE_DIR).parent / 'graphdata' / 'graphs' / 'layout.json'
+        assert layout_store.path('graphs/layout.json') == expected.absolute()
+    print("✓ 布局文件位置")
+
+
+if __name__ == "__main__":
+    test_load_committed_graph()
+    test_layout_location()
+    print("全部通过")
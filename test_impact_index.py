@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""测试影响分析索引（强连通分量、入口点、缓存失效和并发修改）"""
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+backend_dir = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+# 设置Django环境
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'apex_graph.settings')
+
+import django
+django.setup()
+
+from ast_api.impact_index import ImpactIndex, is_entry_point
+
+# 图数据的全局存储按导入时的工作目录创建（graphdata），在临时目录中导入，以免加载并改写仓库中的图数据
+_workdir = tempfile.TemporaryDirectory()
+_cwd = os.getcwd()
+os.chdir(_workdir.name)
+try:
+    from ast_api.storage import DataStore
+    from ast_api.local_graph_service import LocalGraphService
+finally:
+    os.chdir(_cwd)
+
+
+def build_graph(directory):
+    """
+    LWC -> A.run -> B.work <-> C.help（环），B.work -> SOQL
+    """
+    service = LocalGraphService(store=DataStore(directory))
+    with service.batch():
+        service.add_node('lwc:list', {'type': 'LWCComponent', 'name': 'list'})
+        for node_id, name in (('method:A.run', 'run'), ('method:B.work', 'work'), ('method:C.help', 'help')):
+            service.add_node(node_id, {'type': 'ApexMethod', 'name': name})
+        service.add_node('soql:B.work.0', {'type': 'SOQLQuery', 'name': 'SOQL'})
+        service.create_relationships([
+            ('lwc:list', 'method:A.run', 'CALLS_APEX', {}),
+            ('method:A.run', 'method:B.work', 'CALLS', {}),
+            ('method:B.work', 'method:C.help', 'CALLS', {}),
+            ('method:C.help', 'method:B.work', 'CALLS', {}),
+            ('method:B.work', 'soql:B.work.0', 'CONTAINS_SOQL', {}),
+        ])
+    return service
+
+
+def ids(result):
+    return [node['id'] for node in result['affected']]
+
+
+def test_upstream_and_downstream():
+    """同一强连通分量内的节点互相影响；上游中的 LWC 是入口点"""
+    with tempfile.TemporaryDirectory() as directory:
+        index = ImpactIndex(build_graph(directory))
+
+        result = index.query('soql:B.work.0')
+        assert ids(result) == ['method:A.run', 'method:B.work', 'method:C.help', 'lwc:list']
+        assert [node['id'] for node in result['entryPoints']] == ['lwc:list']
+        assert result['counts'] == {'ApexMethod': 3, 'LWCComponent': 1}
+
+        result = index.query('method:C.help', direction='downstream')
+        assert ids(result) == ['method:B.work', 'soql:B.work.0']
+
+        result = index.query('soql:B.work.0', node_types=['ApexMethod'], limit=1)
+        assert result['total'] == 3 and result['truncated'] and len(result['affected']) == 1
+        assert index.query('method:Missing.run') is None
+    print("✓ 上游/下游")
+
+
+def test_entry_points():
+    assert is_entry_point({'type': 'ApexTrigger'})
+    assert is_entry_point({'type': 'ApexMethod', 'annotations': ['auraenabled']})
+    assert not is_entry_point({'type': 'ApexMethod', 'annotations': ['TestVisible']})
+    print("✓ 入口点")
+
+
+def test_cache_invalidation():
+    """只修改节点属性时保留 condensation DAG 和缓存，添加节点或边时重建"""
+    with tempfile.TemporaryDirectory() as directory:
+        service = build_graph(directory)
+        index = ImpactIndex(service)
+
+        assert not index.query('soql:B.work.0')['cached']
+        assert index.query('soql:B.work.0')['cached']
+        dag = index._dag
+
+        service.update_node_attributes({'method:A.run': {'unresolvedCalls': ['X.y/0']}})
+        service.add_node('method:A.run', {'type': 'ApexMethod', 'name': 'run'})
+        result = index.query('soql:B.work.0')
+        assert result['cached'] and index._dag is dag
+        assert result['version'] == service.version
+
+        service.add_node('method:D.go', {'type': 'ApexMethod', 'name': 'go'})
+        service.create_relationship('method:D.go', 'method:A.run', 'CALLS')
+        result = index.query('soql:B.work.0')
+        assert not result['cached'] and index._dag is not dag
+        assert 'method:D.go' in ids(result)
+    print("✓ 缓存失效")
+
+
+def test_concurrent_modification():
+    """导入线程修改图结构的同时查询不抛出异常"""
+    with tempfile.TemporaryDirectory() as directory:
+        service = build_graph(directory)
+        index = ImpactIndex(service)
+        stop = threading.Event()
+
+        def writer():
+            with service.batch():
+                i = 0
+                while not stop.is_set():
+                    n = i % 500
+                    service.add_node(f'method:G.m{n}', {'type': 'ApexMethod', 'name': f'm{n}'})
+                    service.create_relationship(f'method:G.m{n}', 'method:A.run', 'CALLS')
+                    if i % 7 == 0:
+                        service.remove_node(f'method:G.m{n // 2}')
+                    i += 1
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            for _ in range(100):
+                assert index.query('soql:B.work.0') is not None
+        finally:
+            stop.set()
+            thread.join()
+    print("✓ 并发修改")
+
+
+if __name__ == "__main__":
+    test_upstream_and_downstream()
+    test_entry_points()
+    test_cache_invalidation()
+    test_concurrent_modification()
+    print("全部通过")
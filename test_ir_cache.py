@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""测试解析结果缓存（命中/未命中、解析器版本失效、编解码、缓存不可用）"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+backend_dir = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+# 设置Django环境
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'apex_graph.settings')
+
+import django
+django.setup()
+
+from ast_api.ir_cache import IRCache, decode, encode
+
+AST_DATA = {
+    'name': 'A',
+    'methods': [{'name': 'run', 'arity': 0, 'static': True, 'returnType': None, 'method_calls': []}],
+}
+
+
+class Parser:
+    """记录调用次数的解析函数"""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def test_hit_and_miss():
+    """相同内容第二次解析命中缓存；不同内容或不同解析器不命中"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = IRCache(directory)
+        parser = Parser(AST_DATA)
+        assert cache.parse('apex', b'<A/>', parser) == AST_DATA
+        assert cache.parse('apex', b'<A/>', parser) == AST_DATA
+        assert parser.calls == 1
+        assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+        cache.parse('apex', b'<B/>', parser)
+        cache.parse('js', b'<A/>', parser)
+        assert parser.calls == 3
+
+        # 缓存保存在文件中，新实例同样命中
+        assert IRCache(directory).parse('apex', b'<A/>', parser) == AST_DATA
+        assert parser.calls == 3
+
+        cache.clear()
+        cache.parse('apex', b'<A/>', parser)
+        assert parser.calls == 4 and cache.stats()['misses'] == 1
+    print("✓ 命中和未命中")
+
+
+def test_parser_version():
+    """解析器模块修改（版本变化）后旧缓存失效"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = IRCache(directory)
+        parser = Parser(AST_DATA)
+        cache.parse('apex', b'<A/>', parser)
+
+        cache.versions = dict(cache.versions, apex='changed')
+        cache.parse('apex', b'<A/>', parser)
+        assert parser.calls == 2
+    print("✓ 解析器版本")
+
+
+def test_codec():
+    codec, data = encode(AST_DATA)
+    assert decode(codec, data) == AST_DATA
+    assert decode('unknown', data) is None
+    print("✓ 编解码")
+
+
+def test_unavailable_cache():
+    """缓存目录不可用时照常解析"""
+    with tempfile.TemporaryDirectory() as directory:
+        blocker = Path(directory) / 'file'
+        blocker.write_text('')
+        cache = IRCache(blocker / 'cache')
+        parser = Parser(AST_DATA)
+        assert cache.parse('apex', b'<A/>', parser) == AST_DATA
+        assert cache.parse('apex', b'<A/>', parser) == AST_DATA
+        assert parser.calls == 2
+    print("✓ 缓存不可用")
+
+
+if __name__ == "__main__":
+    test_hit_and_miss()
+    test_parser_version()
+    test_codec()
+    test_unavailable_cache()
+    print("全部通过")
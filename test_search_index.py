@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""测试节点搜索索引（分词、前缀匹配、排序、增量删除和并发）"""
+import sys
+import threading
+from pathlib import Path
+
+backend_dir = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+from ast_api.search_index import SearchIndex, tokenize
+
+
+def build_index():
+    index = SearchIndex()
+    index.index_node('class:PropertyController', {'type': 'ApexClass', 'name': 'PropertyController'})
+    index.index_node('method:PropertyController.getPagedPropertyList', {
+        'type': 'ApexMethod', 'name': 'getPagedPropertyList', 'className': 'PropertyController'
+    })
+    index.index_node('method:Util.getPaged', {'type': 'ApexMethod', 'name': 'getPaged', 'className': 'Util'})
+    index.index_node('soql:Util.getPaged.0', {
+        'type': 'SOQLQuery', 'name': 'SOQL', 'query': 'SELECT Id FROM Property__c', 'sObject': 'Property__c'
+    })
+    # 不参与搜索的节点类型
+    index.index_node('dml:Util.getPaged.UPDATE.0', {'type': 'DMLOperation', 'name': 'getPaged'})
+    return index
+
+
+def ids(result):
+    return [item['id'] for item in result['results']]
+
+
+def test_tokenize():
+    """完整标识符 + 下划线/驼峰子词，统一小写"""
+    assert tokenize('Property__c.getPagedPropertyList') == [
+        'property__c', 'property', 'c', 'getpagedpropertylist', 'get', 'paged', 'property', 'list'
+    ]
+    assert tokenize('HTTPRequest') == ['httprequest', 'http', 'request']
+    assert tokenize('') == []
+    print("✓ 分词")
+
+
+def test_prefix_ranking():
+    """名称完全匹配优先于前缀匹配，前缀匹配优先于只命中子词/查询文本"""
+    index = build_index()
+    assert ids(index.search('getPaged')) == [
+        'method:Util.getPaged', 'method:PropertyController.getPagedPropertyList'
+    ]
+    # 查询不区分大小写
+    assert ids(index.search('getpaged')) == ids(index.search('getPaged'))
+    assert ids(index.search('prop')) == [
+        'class:PropertyController',
+        'method:PropertyController.getPagedPropertyList',
+        'soql:Util.getPaged.0',
+    ]
+    print("✓ 前缀匹配和排序")
+
+
+def test_terms_and_filters():
+    """每个查询词都必须命中；完整标识符整体匹配；按类型过滤和 limit"""
+    index = build_index()
+    assert ids(index.search('property list')) == ['method:PropertyController.getPagedPropertyList']
+    assert ids(index.search('Property__c')) == ['soql:Util.getPaged.0']
+    assert ids(index.search('prop', node_types=['ApexClass'])) == ['class:PropertyController']
+    result = index.search('prop', limit=1)
+    assert result['total'] == 3 and len(result['results']) == 1
+    assert index.search('zzz') == {'total': 0, 'results': []}
+    assert index.search('') == {'total': 0, 'results': []}
+    print("✓ 多词查询和过滤")
+
+
+def test_remove_and_reindex():
+    """删除节点后不再命中；重新索引替换旧的词"""
+    index = build_index()
+    index.remove_node('method:Util.getPaged')
+    assert ids(index.search('getPaged')) == ['method:PropertyController.getPagedPropertyList']
+
+    index.index_node('class:PropertyController', {'type': 'ApexClass', 'name': 'ListingController'})
+    assert 'class:PropertyController' not in ids(index.search('prop'))
+    assert ids(index.search('listing')) == ['class:PropertyController']
+    print("✓ 删除和重新索引")
+
+
+def test_concurrent_search():
+    """导入线程更新索引的同时搜索不抛出异常"""
+    index = SearchIndex()
+    stop = threading.Event()
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            n = i % 500
+            index.index_node(f'method:C{n}.getPaged{n}', {
+                'type': 'ApexMethod', 'name': f'getPaged{n}', 'className': f'C{n}'
+            })
+            if i % 7 == 0:
+                index.remove_node(f'method:C{n // 2}.getPaged{n // 2}')
+            i += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for _ in range(200):
+            index.search('get')
+    finally:
+        stop.set()
+        thread.join()
+    print("✓ 并发搜索")
+
+
+if __name__ == "__main__":
+    test_tokenize()
+    test_prefix_ranking()
+    test_terms_and_filters()
+    test_remove_and_reindex()
+    test_concurrent_search()
+    print("全部通过")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""测试 sObject 索引（字段查找、读写方法、引用计数和增量删除）"""
+import sys
+from pathlib import Path
+
+backend_dir = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+from ast_api.soql_parser import soql_node_attributes
+from ast_api.sobject_index import SObjectIndex
+
+
+def soql_node(query, **owner):
+    return {'type': 'SOQLQuery', 'query': query, **soql_node_attributes(query), **owner}
+
+
+def dml_node(sobject, **owner):
+    return {'type': 'DMLOperation', 'sObject': sobject, 'operationType': 'UPDATE', **owner}
+
+
+def test_lookup():
+    """对象和字段查找不区分大小写，对象名保留首次出现的写法"""
+    index = SObjectIndex()
+    index.index_node('soql:A.m.0', soql_node(
+        'SELECT Id, StageName FROM Opportunity WHERE AccountId = :id', className='A', methodName='m'
+    ))
+    index.index_node('soql:B.n.0', soql_node('SELECT Id FROM opportunity', className='B', methodName='n'))
+
+    assert index.lookup('OPPORTUNITY') == ['soql:A.m.0', 'soql:B.n.0']
+    assert index.lookup('Opportunity', 'stagename') == ['soql:A.m.0']
+    assert index.lookup('Opportunity', 'AccountId') == ['soql:A.m.0']
+    assert index.object_name('opportunity') == 'Opportunity'
+    assert index.fields('Opportunity') == {'AccountId': 1, 'Id': 2, 'StageName': 1}
+    print("✓ 对象/字段查找")
+
+
+def test_readers_and_writers():
+    """读写方法按方法节点计数：同一方法的多个查询只算一个读取方"""
+    index = SObjectIndex()
+    index.index_node('soql:A.m.0', soql_node('SELECT Id FROM Account', className='A', methodName='m'))
+    index.index_node('soql:A.m.1', soql_node('SELECT Name FROM Account', className='A', methodName='m'))
+    index.index_node('dml:A.m.UPDATE.0', dml_node('Account', className='A', methodName='m'))
+
+    assert index.readers('Account') == ['method:A.m']
+    assert index.writers('Account') == ['method:A.m']
+    summary, = index.objects()
+    assert summary == {
+        'name': 'Account', 'queries': 2, 'fields': 2, 'dmlOperations': 1, 'readers': 1, 'writers': 1
+    }
+
+    # 引用计数：删除一个查询后方法仍是读取方，全部删除后对象从索引中消失
+    index.remove_node('soql:A.m.0')
+    assert index.readers('Account') == ['method:A.m']
+    assert index.fields('Account') == {'Name': 1}
+    index.remove_node('soql:A.m.1')
+    index.remove_node('dml:A.m.UPDATE.0')
+    assert index.readers('Account') == [] and index.writers('Account') == []
+    assert index.objects() == []
+    print("✓ 读写方法和引用计数")
+
+
+def test_trigger_owner():
+    """触发器体中的 SOQL/DML 属于触发器节点"""
+    index = SObjectIndex()
+    index.index_node('soql:AccountTrigger.0', soql_node(
+        'SELECT Id FROM Contact WHERE AccountId IN :ids', triggerName='AccountTrigger'
+    ))
+    index.index_node('dml:AccountTrigger.UPDATE.0', dml_node('Contact', triggerName='AccountTrigger'))
+    index.index_node('dml:ContactTrigger.UPDATE.0', dml_node('Contact', triggerName='ContactTrigger'))
+
+    assert index.readers('Contact') == ['trigger:AccountTrigger']
+    assert index.writers('Contact') == ['trigger:AccountTrigger', 'trigger:ContactTrigger']
+    print("✓ 触发器")
+
+
+def test_reindex():
+    """重新索引同一节点时替换旧的键"""
+    index = SObjectIndex()
+    index.index_node('soql:A.m.0', soql_node('SELECT Id FROM Account', className='A', methodName='m'))
+    index.index_node('soql:A.m.0', soql_node('SELECT Id FROM Case', className='A', methodName='m'))
+    assert index.lookup('Account') == []
+    assert index.lookup('Case') == ['soql:A.m.0']
+
+    # 非 SOQL/DML 节点和无法解析的查询不进入索引
+    index.index_node('soql:A.m.0', soql_node('not soql', className='A', methodName='m'))
+    index.index_node('class:A', {'type': 'ApexClass', 'name': 'A'})
+    assert index.objects() == []
+    print("✓ 重新索引")
+
+
+if __name__ == "__main__":
+    test_lookup()
+    test_readers_and_writers()
+    test_trigger_owner()
+    test_reindex()
+    print("全部通过")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""测试 SOQL 解析（FROM 对象、SELECT / WHERE 字段、子查询）"""
+import sys
+from pathlib import Path
+
+backend_dir = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+from ast_api.soql_parser import parse_soql, soql_node_attributes, iter_field_refs
+
+
+def test_simple_query():
+    """基本查询：PMD 的 Query 属性带方括号，字段路径和绑定变量"""
+    parsed = parse_soql(
+        '[SELECT Id, Name, Account.Owner.Name FROM Contact '
+        'WHERE AccountId IN :ids AND Email != null LIMIT 10]'
+    )
+    assert parsed['sObject'] == 'Contact'
+    assert parsed['fields'] == ['Id', 'Name', 'Account.Owner.Name']
+    assert parsed['whereFields'] == ['AccountId', 'Email']
+    assert parsed['subqueries'] == []
+    print("✓ 基本查询")
+
+
+def test_subqueries():
+    """父子关系子查询（relationship=True）和半连接子查询"""
+    parsed = parse_soql(
+        "SELECT Id, (SELECT LastName FROM Contacts) FROM Account "
+        "WHERE Id IN (SELECT AccountId FROM Opportunity WHERE StageName = 'Closed Won')"
+    )
+    assert parsed['sObject'] == 'Account'
+    assert parsed['fields'] == ['Id']
+    relationship, semi_join = parsed['subqueries']
+    assert relationship['sObject'] == 'Contacts' and relationship.get('relationship')
+    assert relationship['fields'] == ['LastName']
+    assert semi_join['sObject'] == 'Opportunity' and not semi_join.get('relationship')
+    assert semi_join['whereFields'] == ['StageName']
+
+    refs = list(iter_field_refs(parsed))
+    assert ('Contacts', 'LastName') in refs
+    assert ('Opportunity', 'AccountId') in refs
+    print("✓ 子查询")
+
+
+def test_functions_and_alias():
+    """聚合函数参数中的字段、对象别名、HTML 转义"""
+    parsed = parse_soql('SELECT COUNT(Id), CALENDAR_YEAR(CreatedDate) FROM Lead GROUP BY CALENDAR_YEAR(CreatedDate)')
+    assert parsed['sObject'] == 'Lead'
+    assert parsed['fields'] == ['Id', 'CreatedDate']
+
+    parsed = parse_soql('SELECT Id FROM Property__c p WHERE p.Price__c &gt; :minPrice ORDER BY p.Price__c')
+    assert parsed['sObject'] == 'Property__c'
+    assert parsed['whereFields'] == ['Price__c']
+    print("✓ 函数、别名和转义")
+
+
+def test_invalid_query():
+    """无法解析的文本返回 None，节点属性中 sObject 为 None"""
+    assert parse_soql('') is None
+    assert parse_soql('not soql') is None
+    assert soql_node_attributes('not soql') == {'sObject': None}
+
+    attributes = soql_node_attributes('SELECT Id FROM Account')
+    assert attributes == {'sObject': 'Account', 'fields': ['Id'], 'whereFields': []}
+    print("✓ 无效查询")
+
+
+if __name__ == "__main__":
+    test_simple_query()
+    test_subqueries()
+    test_functions_and_alias()
+    test_invalid_query()
+    print("全部通过")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""测试 Visualforce 页面（AST 解析、控制器/扩展关系、表达式引用解析）"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+backend_dir = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+# 设置Django环境
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'apex_graph.settings')
+
+import django
+django.setup()
+
+# 图数据的全局存储按导入时的工作目录创建（graphdata），在临时目录中导入，以免加载并改写仓库中的图数据
+_workdir = tempfile.TemporaryDirectory()
+_cwd = os.getcwd()
+os.chdir(_workdir.name)
+try:
+    from ast_api.vf_ast_parser import parse_vf_ast_file
+    from ast_api.storage import DataStore
+    from ast_api.local_graph_service import LocalGraphService
+    from ast_api.unified_graph_service import unified_graph_service
+    from ast_api.import_service import ASTImportService
+finally:
+    os.chdir(_cwd)
+
+PAGE_AST = b"""<?xml version="1.0" encoding="UTF-8"?>
+<CompilationUnit>
+ <Content>
+  <Element Name="apex:page" Namespace="apex" LocalName="page">
+   <Attribute Name="controller"><AttributeValue><Text Image="accountctrl"/></AttributeValue></Attribute>
+   <Attribute Name="extensions"><AttributeValue><Text Image="accountEXT, Missing"/></AttributeValue></Attribute>
+   <Content>
+    <Element Name="apex:form"><Content>
+     <Element Name="apex:commandButton">
+      <Attribute Name="action"><ElExpression><Expression><Identifier Image="save"/></Expression></ElExpression></Attribute>
+     </Element>
+     <Element Name="apex:outputText">
+      <Attribute Name="value"><ElExpression><Expression><Identifier Image="account"/><DotExpression><Identifier Image="Name"/></DotExpression></Expression></ElExpression></Attribute>
+     </Element>
+     <Element Name="apex:outputText">
+      <Attribute Name="value"><ElExpression><Expression><Identifier Image="$Page"/><DotExpression><Identifier Image="Home"/></DotExpression></Expression></ElExpression></Attribute>
+     </Element>
+     <Element Name="apex:commandButton">
+      <Attribute Name="action"><ElExpression><Expression><Identifier Image="extAction"/></Expression></ElExpression></Attribute>
+     </Element>
+    </Content></Element>
+   </Content>
+  </Element>
+ </Content>
+</CompilationUnit>
+"""
+
+
+def fresh_graph_service():
+    """使用空的临时图数据替换统一图服务的本地图服务"""
+    unified_graph_service.local_service = LocalGraphService(store=DataStore(tempfile.mkdtemp(dir=_workdir.name)))
+    return unified_graph_service.local_service
+
+
+def apex_class(name, methods):
+    """最小的类 AST 数据（见 ASTParser），methods 为 [(方法名, 参数个数)]"""
+    return {
+        'name': name, 'simpleName': name, 'definingType': name,
+        'public': True, 'withSharing': False, 'fileName': f'{name}.cls',
+        'methods': [
+            {
+                'name': method_name, 'returnType': 'void', 'arity': arity,
+                'public': True, 'static': False, 'constructor': False, 'method_calls': [],
+            }
+            for method_name, arity in methods
+        ],
+    }
+
+
+def test_parse():
+    """根标签的 controller / extensions、组件计数和表达式引用链"""
+    ast_data = parse_vf_ast_file('AccountPage_ast.xml', PAGE_AST)
+    assert ast_data['name'] == 'AccountPage' and ast_data['kind'] == 'page'
+    assert ast_data['controller'] == 'accountctrl'
+    assert ast_data['extensions'] == ['accountEXT', 'Missing']
+    assert ast_data['components'] == {
+        'apex:page': 1, 'apex:form': 1, 'apex:commandButton': 2, 'apex:outputText': 2
+    }
+    assert ast_data['references'] == [['save'], ['account', 'Name'], ['$Page', 'Home'], ['extAction']]
+    print("✓ 解析")
+
+
+def test_import_page():
+    """控制器/扩展按类名不区分大小写连接；引用解析为控制器方法，扩展优先"""
+    graph = fresh_graph_service().graph
+    service = ASTImportService()
+    service._import_to_graph(apex_class('AccountCtrl', [('save', 0), ('getAccount', 0), ('extAction', 0)]))
+    service._import_to_graph(apex_class('AccountExt', [('extAction', 0)]))
+
+    result = service._import_vf_page(parse_vf_ast_file('AccountPage_ast.xml', PAGE_AST))
+    assert result['success'] and result['created'] and result['apex_references'] == 3
+    assert result['component_type'] == 'VisualforcePage'
+
+    edges = sorted((target, key) for _, target, key in graph.out_edges('vfpage:AccountPage', keys=True))
+    assert edges == [
+        ('class:AccountCtrl', 'USES_CONTROLLER'),
+        ('class:AccountExt', 'USES_EXTENSION'),
+        ('method:AccountCtrl.getAccount', 'REFERENCES_APEX_METHOD'),
+        ('method:AccountCtrl.save', 'REFERENCES_APEX_METHOD'),
+        ('method:AccountExt.extAction', 'REFERENCES_APEX_METHOD'),
+    ]
+    assert graph.nodes['vfpage:AccountPage']['controller'] == 'accountctrl'
+
+    # 重新导入时替换原有的关系
+    page = parse_vf_ast_file('AccountPage_ast.xml', PAGE_AST)
+    page['extensions'] = []
+    result = service._import_vf_page(page)
+    assert not result['created'] and result['apex_references'] == 3
+    edges = sorted(target for _, target in graph.out_edges('vfpage:AccountPage'))
+    assert edges == [
+        'class:AccountCtrl', 'method:AccountCtrl.extAction', 'method:AccountCtrl.getAccount', 'method:AccountCtrl.save'
+    ]
+    print("✓ 导入页面")
+
+
+if __name__ == "__main__":
+    test_parse()
+    test_import_page()
+    print("全部通过")